@@ -3,30 +3,149 @@
 
 import ast
 import json
+import os
+import re
 import sqlite3
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 # Configuration: which dependencies to index
 DEPENDENCIES_TO_INDEX = ["runpod_flash"]
 
+# Directories never descended into while collecting files, in addition to hidden
+# ones (.git, .venv, tool caches). build/dist are not pruned because real
+# packages use those names (e.g. pip._internal.operations.build).
+PRUNED_DIRS = frozenset({"__pycache__", "node_modules"})
+
+# Directories with at least this many files are parsed in a process pool
+PARALLEL_PARSE_MIN_FILES = 256
+
+# The database is rebuilt in memory on every run, so no rollback journal is kept
+BULK_LOAD_PRAGMAS = """
+    PRAGMA journal_mode=OFF;
+    PRAGMA synchronous=OFF;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA locking_mode=EXCLUSIVE;
+    PRAGMA cache_size=-262144;
+"""
+
+INSERT_SYMBOL_SQL = """
+    INSERT INTO symbols (
+        file_path, symbol_name, kind, signature, docstring,
+        start_line, end_line, parent_symbol, decorators,
+        type_hints, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+# Joins decorators in the decorators column; ast.unparse escapes control
+# characters inside string literals, so it never occurs in decorator text
+DECORATOR_SEPARATOR = "\x1f"
+
+# Encoder behind json.dumps with default arguments, called without its per-call setup
+_encode_json = json.JSONEncoder().encode
+
+
+def to_json(value: list[str] | dict[str, str]) -> str:
+    """Encode type hints, skipping the encoder for the common empty case."""
+    if not value:
+        return "{}" if isinstance(value, dict) else "[]"
+    return _encode_json(value)
+
+
+def _simple_unparse(node: ast.expr) -> Optional[str]:
+    """Render names, dotted names, plain constants and simple subscripts, or return None."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = node.value
+        if isinstance(value, (ast.Name, ast.Attribute)):
+            prefix = _simple_unparse(value)
+            return None if prefix is None else f"{prefix}.{node.attr}"
+        return None
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if value is None or isinstance(value, bool):
+            return repr(value)
+        # repr matches ast.unparse only while no quote choice or escaping is involved
+        if (
+            isinstance(value, str)
+            and node.kind is None
+            and value.isprintable()
+            and "'" not in value
+            and "\\" not in value
+        ):
+            return repr(value)
+        return None
+    if isinstance(node, ast.Subscript):
+        base = _simple_unparse(node.value)
+        if base is None:
+            return None
+        index = node.slice
+        if isinstance(index, ast.Tuple):
+            if len(index.elts) < 2:
+                return None
+            parts = []
+            for elt in index.elts:
+                part = _simple_unparse(elt)
+                if part is None:
+                    return None
+                parts.append(part)
+            return f"{base}[{', '.join(parts)}]"
+        inner = _simple_unparse(index)
+        return None if inner is None else f"{base}[{inner}]"
+    return None
+
+
+def _fast_unparse(node: ast.expr) -> str:
+    """Same output as ast.unparse, skipping its visitor for the common simple forms."""
+    text = _simple_unparse(node)
+    return ast.unparse(node) if text is None else text
+
+
+# Nodes whose children may contain class or function definitions; expression
+# subtrees cannot, so the walk never descends into them
+_DEF_CONTAINERS = (ast.stmt, ast.excepthandler, ast.match_case)
+
 
-class ASTIndexer(ast.NodeVisitor):
+class ASTIndexer:
     """Walks AST and extracts class, function, and method definitions."""
 
-    def __init__(self, file_path: str, source: str) -> None:
+    def __init__(self, file_path: str) -> None:
         self.file_path = file_path
-        self.source = source
-        self.lines = source.split("\n")
         self.symbols: list[dict[str, Any]] = []
-        self.current_class: Optional[str] = None
 
-    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+    def index(self, tree: ast.AST) -> None:
+        """Extract all definitions in source order.
+
+        An explicit stack replaces NodeVisitor's recursive dispatch, carrying the
+        enclosing class name alongside each node and skipping expression subtrees.
+        """
+        stack: list[tuple[ast.AST, Optional[str]]] = [(tree, None)]
+        while stack:
+            node, current_class = stack.pop()
+            if isinstance(node, ast.ClassDef):
+                self._add_class(node)
+                current_class = node.name
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._add_function(node, current_class)
+
+            children = [
+                (child, current_class)
+                for child in ast.iter_child_nodes(node)
+                if isinstance(child, _DEF_CONTAINERS)
+            ]
+            stack.extend(reversed(children))
+
+    def _add_class(self, node: ast.ClassDef) -> None:
         """Extract class definition."""
         signature = self._build_class_signature(node)
-        decorators = [ast.unparse(d) for d in node.decorator_list]
+        decorators = [_fast_unparse(d) for d in node.decorator_list]
 
         self.symbols.append(
             {
@@ -43,125 +162,85 @@ class ASTIndexer(ast.NodeVisitor):
             }
         )
 
-        prev_class = self.current_class
-        self.current_class = node.name
-        self.generic_visit(node)
-        self.current_class = prev_class
-
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+    def _add_function(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef, current_class: Optional[str]
+    ) -> None:
         """Extract function or method definition."""
-        signature = self._build_function_signature(node)
-        decorators = [ast.unparse(d) for d in node.decorator_list]
-        type_hints = self._extract_type_hints(node)
-
-        self.symbols.append(
-            {
-                "file_path": self.file_path,
-                "symbol_name": node.name,
-                "kind": "method" if self.current_class else "function",
-                "signature": signature,
-                "docstring": ast.get_docstring(node),
-                "start_line": node.lineno,
-                "end_line": node.end_lineno or node.lineno,
-                "parent_symbol": self.current_class,
-                "decorators": decorators,
-                "type_hints": type_hints,
-            }
-        )
-
-        self.generic_visit(node)
-
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
-        """Extract async function or method definition."""
-        signature = f"async {self._build_function_signature(node)}"
-        decorators = [ast.unparse(d) for d in node.decorator_list]
-        type_hints = self._extract_type_hints(node)
+        signature, type_hints = self._build_function_signature(node)
+        if isinstance(node, ast.AsyncFunctionDef):
+            signature = f"async {signature}"
+        decorators = [_fast_unparse(d) for d in node.decorator_list]
 
         self.symbols.append(
             {
                 "file_path": self.file_path,
                 "symbol_name": node.name,
-                "kind": "method" if self.current_class else "function",
+                "kind": "method" if current_class else "function",
                 "signature": signature,
                 "docstring": ast.get_docstring(node),
                 "start_line": node.lineno,
                 "end_line": node.end_lineno or node.lineno,
-                "parent_symbol": self.current_class,
+                "parent_symbol": current_class,
                 "decorators": decorators,
                 "type_hints": type_hints,
             }
         )
 
-        self.generic_visit(node)
-
     def _build_class_signature(self, node: ast.ClassDef) -> str:
         """Build class signature with bases."""
-        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        bases = ", ".join(_fast_unparse(base) for base in node.bases)
         if bases:
             return f"class {node.name}({bases})"
         return f"class {node.name}"
 
-    def _build_function_signature(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> str:
-        """Build function signature with arguments and return type."""
-        args = self._format_arguments(node.args)
-        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
-        return f"def {node.name}({args}){returns}"
+    def _build_function_signature(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef
+    ) -> tuple[str, dict[str, str]]:
+        """Build function signature and type hints, unparsing each annotation once.
 
-    def _format_arguments(self, args: ast.arguments) -> str:
-        """Format function arguments with type hints."""
+        Returns:
+            Tuple of (signature with arguments and return type, type hints by name)
+        """
+        args = node.args
         formatted: list[str] = []
-
-        # Positional arguments
-        for i, arg in enumerate(args.args):
-            annotation = f": {ast.unparse(arg.annotation)}" if arg.annotation else ""
-            formatted.append(f"{arg.arg}{annotation}")
-
-        # Keyword-only arguments
-        for arg in args.kwonlyargs:
-            annotation = f": {ast.unparse(arg.annotation)}" if arg.annotation else ""
-            formatted.append(f"{arg.arg}{annotation}")
-
-        # *args
-        if args.vararg:
-            annotation = (
-                f": {ast.unparse(args.vararg.annotation)}" if args.vararg.annotation else ""
-            )
-            formatted.append(f"*{args.vararg.arg}{annotation}")
-
-        # **kwargs
-        if args.kwarg:
-            annotation = f": {ast.unparse(args.kwarg.annotation)}" if args.kwarg.annotation else ""
-            formatted.append(f"**{args.kwarg.arg}{annotation}")
-
-        return ", ".join(formatted)
-
-    def _extract_type_hints(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> dict[str, str]:
-        """Extract type hints from function arguments."""
         hints: dict[str, str] = {}
 
-        for arg in node.args.args + node.args.kwonlyargs:
+        # Positional and keyword-only arguments
+        for arg in args.args + args.kwonlyargs:
             if arg.annotation:
-                hints[arg.arg] = ast.unparse(arg.annotation)
-
-        if node.args.vararg and node.args.vararg.annotation:
-            hints[f"*{node.args.vararg.arg}"] = ast.unparse(node.args.vararg.annotation)
+                hint = _fast_unparse(arg.annotation)
+                hints[arg.arg] = hint
+                formatted.append(f"{arg.arg}: {hint}")
+            else:
+                formatted.append(arg.arg)
 
-        if node.args.kwarg and node.args.kwarg.annotation:
-            hints[f"**{node.args.kwarg.arg}"] = ast.unparse(node.args.kwarg.annotation)
+        # *args and **kwargs
+        for prefix, arg in (("*", args.vararg), ("**", args.kwarg)):
+            if arg is None:
+                continue
+            if arg.annotation:
+                hint = _fast_unparse(arg.annotation)
+                hints[f"{prefix}{arg.arg}"] = hint
+                formatted.append(f"{prefix}{arg.arg}: {hint}")
+            else:
+                formatted.append(f"{prefix}{arg.arg}")
 
+        returns = ""
         if node.returns:
-            hints["return"] = ast.unparse(node.returns)
-
-        return hints
+            hints["return"] = _fast_unparse(node.returns)
+            returns = f" -> {hints['return']}"
 
+        return f"def {node.name}({', '.join(formatted)}){returns}", hints
 
-def create_database(db_path: Path) -> None:
-    """Create SQLite database with schema."""
-    db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
+def create_database(conn: sqlite3.Connection) -> None:
+    """Create the symbols tables (indexes are added by create_indexes)."""
+    conn.executescript(BULK_LOAD_PRAGMAS)
     cursor = conn.cursor()
 
+    # Page size only takes effect before the first table is created
+    cursor.execute("PRAGMA page_size=32768")
+
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS symbols (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -173,19 +252,154 @@ def create_database(db_path: Path) -> None:
             start_line INTEGER NOT NULL,
             end_line INTEGER,
             parent_symbol TEXT,
-            decorator_json TEXT,
+            decorators TEXT,
             type_hints TEXT,
             created_at INTEGER
         )
     """)
 
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbol_name ON symbols(symbol_name)")
+    # Trigram full-text index over the columns searched with substring LIKE
+    # patterns, filled by create_indexes. Trigram tokens let those patterns use
+    # the index instead of scanning every row.
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts USING fts5(
+            symbol_name, file_path,
+            content='symbols', content_rowid='id', tokenize='trigram'
+        )
+    """)
+
+    # One row per decorator: its dotted name without call arguments
+    # ("app.command" for "@app.command()") and the name's last component
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symbol_decorators (
+            symbol_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            attr TEXT NOT NULL
+        )
+    """)
+
+    conn.commit()
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Fill symbol_decorators and create the lookup indexes once all symbols are inserted.
+
+    Building each index in one pass over the loaded table is cheaper than
+    updating the btrees and the full-text index on every insert. The
+    composite indexes match the exact-match lookups: classes by name,
+    methods by parent in line order, and symbols by decorator name.
+    idx_kind_file stores each kind's symbols already in listing order, so
+    a listing reads its first rows straight from the index without sorting.
+    """
+    cursor = conn.cursor()
+
+    decorated = cursor.execute("SELECT id, decorators FROM symbols WHERE decorators != ''")
+    cursor.executemany(
+        "INSERT INTO symbol_decorators (symbol_id, name, attr) VALUES (?, ?, ?)",
+        list(iter_decorator_rows(decorated.fetchall())),
+    )
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_kind_name ON symbols(kind, symbol_name)")
+    # Covering and presorted for the per-kind listings (list_classes, list-all --kind)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_kind_file"
+        " ON symbols(kind, file_path, symbol_name, start_line)"
+    )
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_path ON symbols(file_path)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_kind ON symbols(kind)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_parent ON symbols(parent_symbol)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_parent ON symbols(parent_symbol, kind, start_line)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_decorator_name ON symbol_decorators(name, symbol_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_decorator_attr ON symbol_decorators(attr, symbol_id)"
+    )
+    cursor.execute("INSERT INTO symbols_fts(symbols_fts) VALUES('rebuild')")
 
     conn.commit()
-    conn.close()
+
+
+def decorator_name(decorator: str) -> str:
+    """Strip call arguments from decorator text: "app.command()" -> "app.command"."""
+    return decorator.split("(", 1)[0]
+
+
+def iter_decorator_rows(rows: list[tuple[int, str]]) -> Iterator[tuple[int, str, str]]:
+    """Expand (symbol id, joined decorators) rows into symbol_decorators rows."""
+    for symbol_id, decorators in rows:
+        for decorator in decorators.split(DECORATOR_SEPARATOR):
+            name = decorator_name(decorator)
+            yield symbol_id, name, name.rpartition(".")[2]
+
+
+def iter_py_files(directory: Path) -> Iterator[Path]:
+    """Yield Python files under directory recursively, in sorted path order.
+
+    Uses os.scandir so non-Python entries never become Path objects and file
+    types come from the directory listing instead of extra stat calls. Hidden
+    directories and PRUNED_DIRS are skipped without being listed.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name in PRUNED_DIRS or entry.name.startswith("."):
+                continue
+            yield from iter_py_files(Path(entry.path))
+        elif entry.name.endswith(".py") and entry.is_file():
+            yield Path(entry.path)
+
+
+def symbol_to_row(symbol: dict[str, Any], now: int) -> tuple[Any, ...]:
+    """Convert an extracted symbol into a row in INSERT_SYMBOL_SQL column order."""
+    return (
+        symbol["file_path"],
+        symbol["symbol_name"],
+        symbol["kind"],
+        symbol["signature"],
+        symbol["docstring"],
+        symbol["start_line"],
+        symbol["end_line"],
+        symbol["parent_symbol"],
+        DECORATOR_SEPARATOR.join(symbol["decorators"]),
+        to_json(symbol["type_hints"]),
+        now,
+    )
+
+
+def parse_file(py_file: Path, base_path: Path, now: int) -> list[tuple[Any, ...]]:
+    """Parse one Python file into symbol rows ready for insertion.
+
+    Top-level so it can run in worker processes.
+
+    Args:
+        py_file: The file to parse
+        base_path: The base path for relative path calculation
+        now: Timestamp stored in created_at
+
+    Returns:
+        One row per symbol, in INSERT_SYMBOL_SQL column order
+    """
+    try:
+        # compile decodes bytes itself, honouring PEP 263 coding cookies; with
+        # PyCF_ONLY_AST it stops at the tree, and docstrings stay in it as
+        # plain Expr nodes whatever the optimize level
+        source = py_file.read_bytes()
+        tree = compile(source, str(py_file), "exec", flags=ast.PyCF_ONLY_AST, optimize=2)
+    except SyntaxError as e:
+        print(f"⚠️  Syntax error in {py_file}: {e}")
+        return []
+
+    rel_path = str(py_file.relative_to(base_path))
+    indexer = ASTIndexer(rel_path)
+    indexer.index(tree)
+
+    return [symbol_to_row(symbol, now) for symbol in indexer.symbols]
 
 
 def index_directory(
@@ -193,6 +407,9 @@ def index_directory(
 ) -> int:
     """Index all Python files in a directory recursively.
 
+    Files are parsed in a process pool when there are at least
+    PARALLEL_PARSE_MIN_FILES of them; the calling process only inserts.
+
     Args:
         directory: The directory to scan
         base_path: The base path for relative path calculation
@@ -205,82 +422,88 @@ def index_directory(
         Number of symbols indexed
     """
     total_symbols = 0
+    now = int(time.time())
+
+    py_files = [
+        py_file
+        for py_file in iter_py_files(directory)
+        if not (skip_private and py_file.name.startswith("_"))
+    ]
+
+    with ExitStack() as stack:
+        if len(py_files) >= PARALLEL_PARSE_MIN_FILES:
+            executor = stack.enter_context(ProcessPoolExecutor())
+            parsed = executor.map(
+                parse_file,
+                py_files,
+                repeat(base_path),
+                repeat(now),
+                chunksize=16,
+            )
+        else:
+            parsed = map(parse_file, py_files, repeat(base_path), repeat(now))
+
+        def rows() -> Iterator[tuple[Any, ...]]:
+            nonlocal total_symbols
+            for file_rows in parsed:
+                total_symbols += len(file_rows)
+                yield from file_rows
 
-    for py_file in sorted(directory.rglob("*.py")):
-        if skip_private and py_file.name.startswith("_"):
-            continue
-
-        try:
-            source = py_file.read_text()
-            tree = ast.parse(source)
-
-            rel_path = str(py_file.relative_to(base_path))
-            indexer = ASTIndexer(rel_path, source)
-            indexer.visit(tree)
-
-            for symbol in indexer.symbols:
-                cursor.execute(
-                    """
-                    INSERT INTO symbols (
-                        file_path, symbol_name, kind, signature, docstring,
-                        start_line, end_line, parent_symbol, decorator_json,
-                        type_hints, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        symbol["file_path"],
-                        symbol["symbol_name"],
-                        symbol["kind"],
-                        symbol["signature"],
-                        symbol["docstring"],
-                        symbol["start_line"],
-                        symbol["end_line"],
-                        symbol["parent_symbol"],
-                        json.dumps(symbol["decorators"]),
-                        json.dumps(symbol["type_hints"]),
-                        int(time.time()),
-                    ),
-                )
-
-            total_symbols += len(indexer.symbols)
-
-        except SyntaxError as e:
-            print(f"⚠️  Syntax error in {py_file}: {e}")
+        # executemany consumes the generator row by row, reusing one prepared
+        # statement without buffering the whole directory in memory
+        cursor.executemany(INSERT_SYMBOL_SQL, rows())
 
     return total_symbols
 
 
-def index_files(src_dir: Path, db_path: Path) -> int:
+def index_files(src_dir: Path, conn: sqlite3.Connection) -> int:
     """Index all Python files in src directory."""
-    create_database(db_path)
-
-    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    # One explicit transaction for the whole scan, committed once below
+    conn.execute("BEGIN")
 
     total_symbols = index_directory(src_dir, src_dir.parent, cursor, skip_private=True)
 
     conn.commit()
-    conn.close()
 
     return total_symbols
 
 
-def get_dependency_path(dep_name: str, site_packages: Path) -> Optional[Path]:
+def normalize_dist_name(name: str) -> str:
+    """Normalize a distribution name the way PEP 503 does."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def find_dist_infos(site_packages: Path) -> dict[str, Path]:
+    """Map normalized distribution names to their .dist-info directories in one scan."""
+    dist_infos: dict[str, Path] = {}
+    with os.scandir(site_packages) as it:
+        for entry in it:
+            if entry.name.endswith(".dist-info"):
+                # "<name>-<version>.dist-info"; versions never contain a hyphen
+                name = entry.name.removesuffix(".dist-info").rsplit("-", 1)[0]
+                dist_infos[normalize_dist_name(name)] = Path(entry.path)
+    return dist_infos
+
+
+def get_dependency_path(
+    dep_name: str, site_packages: Path, dist_infos: dict[str, Path]
+) -> Optional[Path]:
     """Get the actual path to a dependency, handling editable installs.
 
     Args:
         dep_name: The dependency package name (e.g., "runpod_flash")
         site_packages: The site-packages directory path
+        dist_infos: Result of find_dist_infos for site_packages
 
     Returns:
         Path to the dependency, or None if not found
     """
     # First check for editable install via direct_url.json
-    dist_info_pattern = f"{dep_name.replace('_', '-')}-*.dist-info"
-    dist_info_dirs = list(site_packages.glob(dist_info_pattern))
+    dist_info_dir = dist_infos.get(normalize_dist_name(dep_name))
 
-    if dist_info_dirs:
-        direct_url_file = dist_info_dirs[0] / "direct_url.json"
+    if dist_info_dir:
+        direct_url_file = dist_info_dir / "direct_url.json"
         if direct_url_file.exists():
             with open(direct_url_file) as f:
                 data = json.load(f)
@@ -306,12 +529,12 @@ def get_dependency_path(dep_name: str, site_packages: Path) -> Optional[Path]:
     return None
 
 
-def index_dependencies(venv_dir: Path, db_path: Path) -> int:
+def index_dependencies(venv_dir: Path, conn: sqlite3.Connection) -> int:
     """Index configured dependency packages from site-packages or editable installs.
 
     Args:
         venv_dir: Path to the virtual environment
-        db_path: Path to the database file
+        conn: Connection to the database being built
 
     Returns:
         Total number of symbols indexed from dependencies
@@ -326,12 +549,14 @@ def index_dependencies(venv_dir: Path, db_path: Path) -> int:
     if not site_packages.exists():
         return 0
 
-    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    # One explicit transaction for the whole scan, committed once below
+    conn.execute("BEGIN")
     total_symbols = 0
+    dist_infos = find_dist_infos(site_packages)
 
     for dep_name in DEPENDENCIES_TO_INDEX:
-        dep_path = get_dependency_path(dep_name, site_packages)
+        dep_path = get_dependency_path(dep_name, site_packages, dist_infos)
         if dep_path:
             # Determine base path for relative path calculation
             # For editable installs, use the editable root; for regular, use site-packages
@@ -348,7 +573,6 @@ def index_dependencies(venv_dir: Path, db_path: Path) -> int:
             print(f"  ⚠️  Dependency not found: {dep_name}")
 
     conn.commit()
-    conn.close()
     return total_symbols
 
 
@@ -367,11 +591,24 @@ def main() -> None:
 
     start_time = time.time()
 
+    # Build the whole database in memory so table and index pages never hit the disk
+    conn = sqlite3.connect(":memory:")
+    create_database(conn)
+
     # Index project source
-    total = index_files(src_dir, db_path)
+    total = index_files(src_dir, conn)
 
     # Index dependencies
-    dep_total = index_dependencies(venv_dir, db_path)
+    dep_total = index_dependencies(venv_dir, conn)
+
+    create_indexes(conn)
+
+    # Write the finished database out in one sequential copy
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    disk = sqlite3.connect(db_path)
+    conn.backup(disk)
+    disk.close()
+    conn.close()
 
     elapsed = time.time() - start_time
 
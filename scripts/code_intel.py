@@ -1,18 +1,29 @@
 #!/usr/bin/env python3
 """CLI tool for querying code intelligence database."""
 
-import json
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import typer
-from rich.console import Console
-from rich.table import Table
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+# Separator between entries of the decorators column, as written by ast_to_sqlite.py
+DECORATOR_SEPARATOR = "\x1f"
 
 app = typer.Typer(help="Query code intelligence database for worker-flash")
-console = Console()
+
+
+@lru_cache(maxsize=None)
+def _console() -> "Console":
+    """Create the shared console on first output, keeping rich off the import path."""
+    from rich.console import Console
+
+    return Console()
 
 
 def get_db_path() -> Path:
@@ -25,7 +36,7 @@ def check_db_exists() -> Path:
     """Check if database exists and return path."""
     db_path = get_db_path()
     if not db_path.exists():
-        console.print(
+        _console().print(
             f"[red]Error:[/red] Database not found at {db_path}\n"
             "Run [cyan]make index[/cyan] to generate it.",
             style="bold",
@@ -38,35 +49,50 @@ def get_connection(db_path: Path) -> sqlite3.Connection:
     """Get database connection."""
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    # Read pages straight from the mapped file instead of copying them into the page cache
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
+def get_db(ctx: typer.Context) -> sqlite3.Connection:
+    """Get the connection shared through the root context, opening it on first use.
+
+    Opening lazily keeps ``COMMAND --help`` working when no database exists.
+    """
+    root = ctx.find_root()
+    if root.obj is None:
+        conn = get_connection(check_db_exists())
+        root.call_on_close(conn.close)
+        root.obj = conn
+    return root.obj
+
+
 @app.command()
-def find(symbol: str) -> None:
+def find(ctx: typer.Context, symbol: str) -> None:
     """Find classes, functions, or methods by name (partial match).
 
     Returns up to 50 results. If you need more results, use a more specific search term.
     """
-    db_path = check_db_exists()
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    from rich.table import Table
+
+    cursor = get_db(ctx).cursor()
 
     cursor.execute(
         """
-        SELECT file_path, symbol_name, kind, signature, start_line, docstring
-        FROM symbols
-        WHERE symbol_name LIKE ?
-        ORDER BY kind, symbol_name
+        SELECT s.file_path, s.symbol_name, s.kind, s.signature, s.start_line, s.docstring
+        FROM symbols_fts f
+        JOIN symbols s ON s.id = f.rowid
+        WHERE f.symbol_name LIKE ?
+        ORDER BY s.kind, s.symbol_name
         LIMIT 50
     """,
         (f"%{symbol}%",),
     )
 
     rows = cursor.fetchall()
-    conn.close()
 
     if not rows:
-        console.print(f"[yellow]No symbols found matching[/yellow] '{symbol}'")
+        _console().print(f"[yellow]No symbols found matching[/yellow] '{symbol}'")
         return
 
     title = f"Symbols matching '{symbol}'"
@@ -83,17 +109,18 @@ def find(symbol: str) -> None:
         sig = row["signature"] or ""
         table.add_row(row["symbol_name"], row["kind"], location, sig)
 
-    console.print(table)
+    _console().print(table)
 
 
 @app.command("list-all")
 def list_all(
+    ctx: typer.Context,
     kind: Optional[str] = typer.Option(None, help="Filter by kind (class/function/method)"),
 ) -> None:
     """List all symbols in the codebase."""
-    db_path = check_db_exists()
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    from rich.table import Table
+
+    cursor = get_db(ctx).cursor()
 
     if kind:
         cursor.execute(
@@ -117,10 +144,9 @@ def list_all(
         title = "All Symbols"
 
     rows = cursor.fetchall()
-    conn.close()
 
     if not rows:
-        console.print("[yellow]No symbols found[/yellow]")
+        _console().print("[yellow]No symbols found[/yellow]")
         return
 
     table = Table(title=title)
@@ -132,15 +158,15 @@ def list_all(
     for row in rows:
         table.add_row(row["symbol_name"], row["kind"], row["file_path"], str(row["start_line"]))
 
-    console.print(table)
+    _console().print(table)
 
 
 @app.command()
-def interface(class_name: str) -> None:
+def interface(ctx: typer.Context, class_name: str) -> None:
     """Get the interface of a class (methods without implementations)."""
-    db_path = check_db_exists()
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    from rich.table import Table
+
+    cursor = get_db(ctx).cursor()
 
     # Get class definition
     cursor.execute(
@@ -156,14 +182,13 @@ def interface(class_name: str) -> None:
     class_row = cursor.fetchone()
 
     if not class_row:
-        console.print(f"[red]Class '{class_name}' not found[/red]")
-        conn.close()
+        _console().print(f"[red]Class '{class_name}' not found[/red]")
         raise typer.Exit(1)
 
     # Get all methods
     cursor.execute(
         """
-        SELECT symbol_name, signature, docstring, start_line, decorator_json
+        SELECT symbol_name, signature, docstring, start_line, decorators
         FROM symbols
         WHERE parent_symbol = ? AND kind = 'method'
         ORDER BY start_line
@@ -172,15 +197,14 @@ def interface(class_name: str) -> None:
     )
 
     methods = cursor.fetchall()
-    conn.close()
 
     # Print class info
-    console.print(f"\n[bold cyan]Class: {class_row['symbol_name']}[/bold cyan]")
-    console.print(f"[dim]File: {class_row['file_path']}:{class_row['start_line']}[/dim]\n")
+    _console().print(f"\n[bold cyan]Class: {class_row['symbol_name']}[/bold cyan]")
+    _console().print(f"[dim]File: {class_row['file_path']}:{class_row['start_line']}[/dim]\n")
 
     if class_row["docstring"]:
-        console.print("[bold]Docstring:[/bold]")
-        console.print(f"[dim]{class_row['docstring']}[/dim]\n")
+        _console().print("[bold]Docstring:[/bold]")
+        _console().print(f"[dim]{class_row['docstring']}[/dim]\n")
 
     # Print methods table
     table = Table(title=f"Methods ({len(methods)})")
@@ -189,36 +213,38 @@ def interface(class_name: str) -> None:
     table.add_column("Decorators", style="yellow")
 
     for method in methods:
-        decorators = json.loads(method["decorator_json"] or "[]")
-        dec_str = ", ".join(f"@{d}" for d in decorators) if decorators else ""
+        decorators = method["decorators"]
+        dec_str = (
+            ", ".join(f"@{d}" for d in decorators.split(DECORATOR_SEPARATOR)) if decorators else ""
+        )
         table.add_row(method["symbol_name"], method["signature"] or "", dec_str)
 
-    console.print(table)
+    _console().print(table)
 
 
 @app.command()
-def file(file_path: str) -> None:
+def file(ctx: typer.Context, file_path: str) -> None:
     """List all symbols in a specific file."""
-    db_path = check_db_exists()
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    from rich.table import Table
+
+    cursor = get_db(ctx).cursor()
 
     cursor.execute(
         """
-        SELECT symbol_name, kind, signature, start_line, parent_symbol
-        FROM symbols
-        WHERE file_path LIKE ?
-        ORDER BY start_line
+        SELECT s.symbol_name, s.kind, s.signature, s.start_line, s.parent_symbol
+        FROM symbols_fts f
+        JOIN symbols s ON s.id = f.rowid
+        WHERE f.file_path LIKE ?
+        ORDER BY s.start_line
         LIMIT 100
     """,
         (f"%{file_path}%",),
     )
 
     rows = cursor.fetchall()
-    conn.close()
 
     if not rows:
-        console.print(f"[yellow]No symbols found in '{file_path}'[/yellow]")
+        _console().print(f"[yellow]No symbols found in '{file_path}'[/yellow]")
         return
 
     # Group symbols by type
@@ -226,8 +252,8 @@ def file(file_path: str) -> None:
     functions = [r for r in rows if r["kind"] == "function"]
     methods = [r for r in rows if r["kind"] == "method"]
 
-    console.print(f"\n[bold cyan]File: {file_path}[/bold cyan]")
-    console.print(f"[dim]Total symbols: {len(rows)}[/dim]\n")
+    _console().print(f"\n[bold cyan]File: {file_path}[/bold cyan]")
+    _console().print(f"[dim]Total symbols: {len(rows)}[/dim]\n")
 
     # Classes table
     if classes:
@@ -238,7 +264,7 @@ def file(file_path: str) -> None:
         for row in classes:
             table.add_row(row["symbol_name"], str(row["start_line"]))
 
-        console.print(table)
+        _console().print(table)
 
     # Functions table
     if functions:
@@ -249,7 +275,7 @@ def file(file_path: str) -> None:
         for row in functions:
             table.add_row(row["symbol_name"], str(row["start_line"]))
 
-        console.print(table)
+        _console().print(table)
 
     # Methods table
     if methods:
@@ -261,7 +287,7 @@ def file(file_path: str) -> None:
         for row in methods:
             table.add_row(row["symbol_name"], row["parent_symbol"] or "", str(row["start_line"]))
 
-        console.print(table)
+        _console().print(table)
 
 
 def main() -> None:
@@ -1,18 +1,44 @@
 #!/usr/bin/env python3
 """MCP server for code intelligence queries."""
 
-import json
 import re
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import anyio
 from mcp.server import Server
-from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, CallToolResult
 
 
+# Separator between entries of the decorators column, as written by ast_to_sqlite.py
+DECORATOR_SEPARATOR = "\x1f"
+
+# Database-backed tool results are cached per (tool, arguments) for a short time
+TOOL_CACHE_MAX_ENTRIES = 256
+TOOL_CACHE_TTL = 60.0
+CACHED_TOOLS = frozenset(
+    {"find_symbol", "list_classes", "get_class_interface", "list_file_symbols", "find_by_decorator"}
+)
+
+# pytest output patterns, compiled once. The summary counts share one
+# alternation so a single scan of the log finds all of them.
+COUNT_KINDS = ("passed", "failed", "error", "deselected", "skipped")
+COUNT_RE = re.compile(rf"(\d+)\s+({'|'.join(COUNT_KINDS)})")
+# One failed/errored test per line; [^\S\n] is \s without crossing into the next line
+FAILED_TEST_RE = re.compile(
+    r"(FAILED|ERROR)[^\S\n]+([\w/\-\.]+::\w+)[^\S\n]*(?:-[^\S\n]+(.+))?$", re.MULTILINE
+)
+COVERAGE_TOTAL_RE = re.compile(r"^TOTAL\s+.*?(\d+\.\d+)%", re.MULTILINE)
+COVERAGE_RE = re.compile(r"coverage:\s*(\d+\.\d+)%")
+THRESHOLD_RE = re.compile(r"Required test coverage of (\d+(?:\.\d+)?)%")
+
+# Heading shared by the symbol search results, filled positionally per row
+SYMBOL_HEADING = "**{}** ({})\n  File: {}:{}\n"
+
 # Initialize MCP server
 server = Server("worker-flash-code-intel")
 
@@ -23,16 +49,75 @@ def get_db_path() -> Path:
     return project_root / ".code-intel" / "flash.db"
 
 
+def get_db_signature() -> Optional[tuple[int, int]]:
+    """Get (inode, mtime) of the database file, or None if it does not exist.
+
+    ``make index`` replaces the file, so a changed signature means a rebuilt index.
+    """
+    try:
+        stat = get_db_path().stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns)
+
+
+# Connection shared by all tool calls, with the (inode, mtime) of the file it was opened on
+_conn: Optional[sqlite3.Connection] = None
+_conn_signature: Optional[tuple[int, int]] = None
+# Serializes worker threads on the shared connection, including reopening it
+_conn_lock = threading.Lock()
+
+
 def get_connection() -> sqlite3.Connection:
-    """Get database connection."""
+    """Get the shared database connection, reopening it after the index is rebuilt.
+
+    Reusing one connection keeps SQLite's page cache and compiled statements
+    warm across tool calls.
+    """
+    global _conn, _conn_signature
+
     db_path = get_db_path()
-    if not db_path.exists():
+    signature = get_db_signature()
+    if signature is None:
         raise FileNotFoundError(
             f"Database not found at {db_path}. Run 'make index' to generate it."
         )
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+
+    if _conn is None or signature != _conn_signature:
+        if _conn is not None:
+            _conn.close()
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA query_only=ON;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+        """)
+        _conn, _conn_signature = conn, signature
+    return _conn
+
+
+def _run_query(sql: str, params: tuple[Any, ...]) -> list[sqlite3.Row]:
+    """Run one query on the shared connection; called from a worker thread."""
+    with _conn_lock:
+        return get_connection().execute(sql, params).fetchall()
+
+
+async def fetch_all(sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
+    """Run a query in a worker thread so the event loop keeps serving other calls."""
+    return await anyio.to_thread.run_sync(_run_query, sql, params)
+
+
+async def fetch_one(sql: str, params: tuple[Any, ...] = ()) -> Optional[sqlite3.Row]:
+    """Run a query in a worker thread and return its first row, if any."""
+    rows = await fetch_all(sql, params)
+    return rows[0] if rows else None
+
+
+def text_result(text: str, is_error: bool = False) -> CallToolResult:
+    """Wrap text as a single-item tool result."""
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error)
 
 
 @server.list_tools()
@@ -111,9 +196,43 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+# Cached tool results by (name, sorted arguments), oldest first, with their expiry time
+_tool_cache: OrderedDict[tuple[Any, ...], tuple[float, CallToolResult]] = OrderedDict()
+_tool_cache_signature: Optional[tuple[int, int]] = None
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
-    """Handle tool calls."""
+    """Handle tool calls, serving repeated database queries from a short-lived cache."""
+    global _tool_cache_signature
+
+    if name not in CACHED_TOOLS:
+        return await dispatch_tool(name, arguments)
+
+    # A rebuilt index invalidates every cached answer
+    signature = get_db_signature()
+    if signature != _tool_cache_signature:
+        _tool_cache.clear()
+        _tool_cache_signature = signature
+
+    key = (name, tuple(sorted(arguments.items())))
+    now = time.monotonic()
+    cached = _tool_cache.get(key)
+    if cached is not None and cached[0] > now:
+        _tool_cache.move_to_end(key)
+        return cached[1]
+
+    result = await dispatch_tool(name, arguments)
+    if not result.isError:
+        _tool_cache[key] = (now + TOOL_CACHE_TTL, result)
+        _tool_cache.move_to_end(key)
+        while len(_tool_cache) > TOOL_CACHE_MAX_ENTRIES:
+            _tool_cache.popitem(last=False)
+    return result
+
+
+async def dispatch_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    """Run the handler for a tool call."""
     if name == "find_symbol":
         return await find_symbol(arguments["symbol"])
     elif name == "list_classes":
@@ -127,300 +246,245 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
     elif name == "parse_test_output":
         return await parse_test_output(arguments["output"])
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Unknown tool: {name}")], isError=True
-        )
+        return text_result(f"Unknown tool: {name}", is_error=True)
 
 
 async def find_symbol(symbol: str) -> CallToolResult:
     """Find symbols by name (partial match)."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
+        # Only the docstring's first line is shown, so only that is read out
+        rows = await fetch_all(
             """
-            SELECT file_path, symbol_name, kind, signature, start_line, docstring
-            FROM symbols
-            WHERE symbol_name LIKE ?
-            ORDER BY kind, symbol_name
+            SELECT s.file_path, s.symbol_name, s.kind, s.signature, s.start_line,
+                   substr(s.docstring, 1, instr(s.docstring || char(10), char(10)) - 1) AS doc_line
+            FROM symbols_fts f
+            JOIN symbols s ON s.id = f.rowid
+            WHERE f.symbol_name LIKE ?
+            ORDER BY s.kind, s.symbol_name
             LIMIT 50
         """,
             (f"%{symbol}%",),
         )
 
-        rows = cursor.fetchall()
-        conn.close()
-
         if not rows:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"No symbols found matching '{symbol}'")],
-                isError=False,
-            )
+            return text_result(f"No symbols found matching '{symbol}'")
 
-        result_text = f"Found {len(rows)} symbol(s) matching '{symbol}'"
+        parts = [f"Found {len(rows)} symbol(s) matching '{symbol}'"]
         if len(rows) == 50:
-            result_text += " (showing first 50 results, there may be more)"
-        result_text += ":\n\n"
-        for row in rows:
-            result_text += f"**{row['symbol_name']}** ({row['kind']})\n"
-            result_text += f"  File: {row['file_path']}:{row['start_line']}\n"
-            if row["signature"]:
-                result_text += f"  Signature: `{row['signature']}`\n"
-            if row["docstring"]:
-                first_line = row["docstring"].split("\n")[0]
-                result_text += f"  Doc: {first_line}\n"
-            result_text += "\n"
-
-        return CallToolResult(content=[TextContent(type="text", text=result_text)], isError=False)
+            parts.append(" (showing first 50 results, there may be more)")
+        parts.append(":\n\n")
+        # Rows unpack in SELECT order, avoiding a keyed lookup per column
+        for file_path, name, kind, signature, start_line, doc_line in rows:
+            parts.append(SYMBOL_HEADING.format(name, kind, file_path, start_line))
+            if signature:
+                parts.append(f"  Signature: `{signature}`\n")
+            if doc_line:
+                parts.append(f"  Doc: {doc_line}\n")
+            parts.append("\n")
+
+        return text_result("".join(parts))
 
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {str(e)}")], isError=True
-        )
+        return text_result(f"Error: {str(e)}", is_error=True)
 
 
 async def list_classes() -> CallToolResult:
     """List all classes in the codebase."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT file_path, symbol_name, signature, start_line
+        rows = await fetch_all("""
+            SELECT file_path, symbol_name, start_line
             FROM symbols
             WHERE kind = 'class'
             ORDER BY file_path, symbol_name
             LIMIT 100
         """)
 
-        rows = cursor.fetchall()
-        conn.close()
-
         if not rows:
-            return CallToolResult(
-                content=[TextContent(type="text", text="No classes found")], isError=False
-            )
+            return text_result("No classes found")
 
-        result_text = f"Found {len(rows)} class(es):\n\n"
+        parts = [f"Found {len(rows)} class(es):\n\n"]
         current_file = None
 
-        for row in rows:
-            if row["file_path"] != current_file:
-                current_file = row["file_path"]
-                result_text += f"**{current_file}**\n"
+        for file_path, name, start_line in rows:
+            if file_path != current_file:
+                current_file = file_path
+                parts.append(f"**{current_file}**\n")
 
-            result_text += f"  - `{row['symbol_name']}` (line {row['start_line']})\n"
+            parts.append(f"  - `{name}` (line {start_line})\n")
 
-        return CallToolResult(content=[TextContent(type="text", text=result_text)], isError=False)
+        return text_result("".join(parts))
 
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {str(e)}")], isError=True
-        )
+        return text_result(f"Error: {str(e)}", is_error=True)
 
 
 async def get_class_interface(class_name: str) -> CallToolResult:
     """Get the interface of a class (methods without implementations)."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Get class definition
-        cursor.execute(
+        # The class row and its methods in one statement: the class row sorts
+        # first, then methods in line order. Columns after the flag are
+        # (file_path, docstring, NULL) for the class and (signature, first
+        # docstring line, decorators) for methods.
+        rows = await fetch_all(
             """
-            SELECT symbol_name, file_path, signature, docstring, start_line
-            FROM symbols
-            WHERE symbol_name = ? AND kind = 'class'
-            LIMIT 1
-        """,
-            (class_name,),
-        )
-
-        class_row = cursor.fetchone()
-
-        if not class_row:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Class '{class_name}' not found")],
-                isError=False,
+            SELECT * FROM (
+                SELECT 0 AS is_method, file_path, docstring, NULL, start_line
+                FROM symbols
+                WHERE symbol_name = ? AND kind = 'class'
+                LIMIT 1
             )
-
-        # Get all methods
-        cursor.execute(
-            """
-            SELECT symbol_name, signature, docstring, start_line, decorator_json
+            UNION ALL
+            SELECT 1, signature,
+                   substr(docstring, 1, instr(docstring || char(10), char(10)) - 1),
+                   decorators, start_line
             FROM symbols
             WHERE parent_symbol = ? AND kind = 'method'
-            ORDER BY start_line
+            ORDER BY is_method, start_line
         """,
-            (class_name,),
+            (class_name, class_name),
         )
 
-        methods = cursor.fetchall()
-        conn.close()
+        if not rows or rows[0][0]:
+            return text_result(f"Class '{class_name}' not found")
 
-        result_text = f"**Class: {class_row['symbol_name']}**\n"
-        result_text += f"File: {class_row['file_path']}:{class_row['start_line']}\n\n"
+        _, file_path, docstring, _, start_line = rows[0]
+        methods = rows[1:]
 
-        if class_row["docstring"]:
-            result_text += f"Docstring:\n```\n{class_row['docstring']}\n```\n\n"
+        parts = [f"**Class: {class_name}**\n"]
+        parts.append(f"File: {file_path}:{start_line}\n\n")
 
-        result_text += f"**Methods ({len(methods)}):**\n\n"
+        if docstring:
+            parts.append(f"Docstring:\n```\n{docstring}\n```\n\n")
 
-        for method in methods:
-            decorators = json.loads(method["decorator_json"] or "[]")
+        parts.append(f"**Methods ({len(methods)}):**\n\n")
+
+        for _, signature, doc_line, decorators, _ in methods:
             if decorators:
-                for dec in decorators:
-                    result_text += f"  @{dec}\n"
+                for dec in decorators.split(DECORATOR_SEPARATOR):
+                    parts.append(f"  @{dec}\n")
 
-            result_text += f"  `{method['signature']}`\n"
+            parts.append(f"  `{signature}`\n")
 
-            if method["docstring"]:
-                first_line = method["docstring"].split("\n")[0]
-                result_text += f"    {first_line}\n"
+            if doc_line:
+                parts.append(f"    {doc_line}\n")
 
-            result_text += "\n"
+            parts.append("\n")
 
-        return CallToolResult(content=[TextContent(type="text", text=result_text)], isError=False)
+        return text_result("".join(parts))
 
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {str(e)}")], isError=True
-        )
+        return text_result(f"Error: {str(e)}", is_error=True)
 
 
 async def list_file_symbols(file_path: str) -> CallToolResult:
     """List all symbols in a specific file."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
+        rows = await fetch_all(
             """
-            SELECT symbol_name, kind, signature, start_line, parent_symbol
-            FROM symbols
-            WHERE file_path LIKE ?
-            ORDER BY start_line
+            SELECT s.symbol_name, s.kind, s.signature, s.start_line, s.parent_symbol
+            FROM symbols_fts f
+            JOIN symbols s ON s.id = f.rowid
+            WHERE f.file_path LIKE ?
+            ORDER BY s.start_line
             LIMIT 100
         """,
             (f"%{file_path}%",),
         )
 
-        rows = cursor.fetchall()
-        conn.close()
-
         if not rows:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"No symbols found in '{file_path}'")],
-                isError=False,
-            )
+            return text_result(f"No symbols found in '{file_path}'")
 
-        result_text = f"Symbols in '{file_path}' ({len(rows)} total):\n\n"
+        parts = [f"Symbols in '{file_path}' ({len(rows)} total):\n\n"]
 
-        for row in rows:
-            indent = "  " if row["parent_symbol"] else ""
-            result_text += (
-                f"{indent}`{row['symbol_name']}` ({row['kind']}, line {row['start_line']})\n"
-            )
+        for name, kind, signature, start_line, parent_symbol in rows:
+            indent = "  " if parent_symbol else ""
+            parts.append(f"{indent}`{name}` ({kind}, line {start_line})\n")
 
-            if row["signature"]:
-                result_text += f"{indent}  Signature: `{row['signature']}`\n"
+            if signature:
+                parts.append(f"{indent}  Signature: `{signature}`\n")
 
-        return CallToolResult(content=[TextContent(type="text", text=result_text)], isError=False)
+        return text_result("".join(parts))
 
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {str(e)}")], isError=True
-        )
+        return text_result(f"Error: {str(e)}", is_error=True)
 
 
 async def find_by_decorator(decorator: str) -> CallToolResult:
-    """Find symbols with specific decorators."""
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
+    """Find symbols with specific decorators.
 
-        cursor.execute(
+    Matches the decorator's dotted name ("app.command") or its last component
+    ("command"); a leading "@" and call arguments in the query are ignored.
+    """
+    try:
+        name = decorator.lstrip("@").split("(", 1)[0]
+        rows = await fetch_all(
             """
-            SELECT file_path, symbol_name, kind, signature, start_line, decorator_json
+            SELECT file_path, symbol_name, kind, signature, start_line, decorators
             FROM symbols
-            WHERE decorator_json LIKE ?
+            WHERE id IN (
+                SELECT symbol_id FROM symbol_decorators WHERE name = ? OR attr = ?
+            )
             ORDER BY kind, symbol_name
             LIMIT 50
         """,
-            (f"%{decorator}%",),
+            (name, name),
         )
 
-        rows = cursor.fetchall()
-        conn.close()
-
         if not rows:
-            return CallToolResult(
-                content=[
-                    TextContent(type="text", text=f"No symbols found with decorator '@{decorator}'")
-                ],
-                isError=False,
-            )
+            return text_result(f"No symbols found with decorator '@{decorator}'")
 
-        result_text = f"Found {len(rows)} symbol(s) with decorator '@{decorator}':\n\n"
+        parts = [f"Found {len(rows)} symbol(s) with decorator '@{decorator}':\n\n"]
 
-        for row in rows:
-            result_text += f"**{row['symbol_name']}** ({row['kind']})\n"
-            result_text += f"  File: {row['file_path']}:{row['start_line']}\n"
+        for file_path, name, kind, signature, start_line, decorators in rows:
+            parts.append(SYMBOL_HEADING.format(name, kind, file_path, start_line))
 
-            decorators = json.loads(row["decorator_json"] or "[]")
-            for dec in decorators:
-                result_text += f"  @{dec}\n"
+            if decorators:
+                for dec in decorators.split(DECORATOR_SEPARATOR):
+                    parts.append(f"  @{dec}\n")
 
-            if row["signature"]:
-                result_text += f"  Signature: `{row['signature']}`\n"
+            if signature:
+                parts.append(f"  Signature: `{signature}`\n")
 
-            result_text += "\n"
+            parts.append("\n")
 
-        return CallToolResult(content=[TextContent(type="text", text=result_text)], isError=False)
+        return text_result("".join(parts))
 
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {str(e)}")], isError=True
-        )
+        return text_result(f"Error: {str(e)}", is_error=True)
 
 
 async def parse_test_output(output: str) -> CallToolResult:
     """Parse pytest output to extract failures and coverage data."""
     try:
         # Extract test counts from summary line
-        passed_match = re.search(r"(\d+)\s+passed", output)
-        failed_match = re.search(r"(\d+)\s+failed", output)
-        error_match = re.search(r"(\d+)\s+error", output)
-        deselected_match = re.search(r"(\d+)\s+deselected", output)
-        skipped_match = re.search(r"(\d+)\s+skipped", output)
-
-        passed_count = int(passed_match.group(1)) if passed_match else 0
-        failed_count = int(failed_match.group(1)) if failed_match else 0
-        error_count = int(error_match.group(1)) if error_match else 0
-        deselected_count = int(deselected_match.group(1)) if deselected_match else 0
-        skipped_count = int(skipped_match.group(1)) if skipped_match else 0
+        # The first count of each kind wins, as with one search per kind
+        counts: dict[str, int] = {}
+        for match in COUNT_RE.finditer(output):
+            counts.setdefault(match[2], int(match[1]))
+            if len(counts) == len(COUNT_KINDS):
+                break
+
+        passed_count = counts.get("passed", 0)
+        failed_count = counts.get("failed", 0)
+        error_count = counts.get("error", 0)
+        deselected_count = counts.get("deselected", 0)
+        skipped_count = counts.get("skipped", 0)
 
         # Extract failed tests and their error messages
-        failed_pattern = r"(FAILED|ERROR)\s+([\w/\-\.]+::\w+)\s*(?:-\s+(.+))?$"
-        failed_tests = []
-        for line in output.split("\n"):
-            match = re.search(failed_pattern, line)
-            if match:
-                status, test_id, error_msg = match.groups()
-                failed_tests.append(
-                    {"status": status, "test_id": test_id, "error": error_msg or ""}
-                )
+        failed_tests = [
+            {"status": match[1], "test_id": match[2], "error": match[3] or ""}
+            for match in FAILED_TEST_RE.finditer(output)
+        ]
 
         # Extract coverage data
-        coverage_match = re.search(r"^TOTAL\s+.*?(\d+\.\d+)%", output, re.MULTILINE)
+        coverage_match = COVERAGE_TOTAL_RE.search(output)
         if not coverage_match:
-            coverage_match = re.search(r"coverage:\s*(\d+\.\d+)%", output)
+            coverage_match = COVERAGE_RE.search(output)
 
         coverage_pct = float(coverage_match.group(1)) if coverage_match else None
 
         # Extract coverage threshold requirement
-        threshold_match = re.search(r"Required test coverage of (\d+(?:\.\d+)?)%", output)
+        threshold_match = THRESHOLD_RE.search(output)
         threshold_pct = float(threshold_match.group(1)) if threshold_match else None
 
         # Format output
@@ -435,13 +499,10 @@ async def parse_test_output(output: str) -> CallToolResult:
             threshold_pct,
         )
 
-        return CallToolResult(content=[TextContent(type="text", text=result_text)], isError=False)
+        return text_result(result_text)
 
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error parsing test output: {str(e)}")],
-            isError=True,
-        )
+        return text_result(f"Error parsing test output: {str(e)}", is_error=True)
 
 
 def format_test_summary(
@@ -455,49 +516,52 @@ def format_test_summary(
     threshold: float | None,
 ) -> str:
     """Format parsed test data as markdown."""
-    result = "## Test Summary\n\n"
+    parts = ["## Test Summary\n\n"]
 
     # Test counts
     total = passed + failed + errors + skipped
-    result += f"**Total Tests:** {total}\n"
-    result += f"✅ Passed: {passed}\n"
+    parts.append(f"**Total Tests:** {total}\n")
+    parts.append(f"✅ Passed: {passed}\n")
 
     if failed > 0:
-        result += f"❌ Failed: {failed}\n"
+        parts.append(f"❌ Failed: {failed}\n")
     if errors > 0:
-        result += f"⚠️ Errors: {errors}\n"
+        parts.append(f"⚠️ Errors: {errors}\n")
     if skipped > 0:
-        result += f"⏭️ Skipped: {skipped}\n"
+        parts.append(f"⏭️ Skipped: {skipped}\n")
     if deselected > 0:
-        result += f"⊘ Deselected: {deselected}\n"
+        parts.append(f"⊘ Deselected: {deselected}\n")
 
-    result += "\n"
+    parts.append("\n")
 
     # Failed tests details
     if failed_tests:
-        result += "### Failed Tests\n\n"
+        parts.append("### Failed Tests\n\n")
         for test in failed_tests:
-            result += f"- **{test['status']}** `{test['test_id']}`\n"
+            parts.append(f"- **{test['status']}** `{test['test_id']}`\n")
             if test["error"]:
-                result += f"  {test['error']}\n"
-        result += "\n"
+                parts.append(f"  {test['error']}\n")
+        parts.append("\n")
 
     # Coverage
     if coverage is not None:
-        result += "### Coverage\n\n"
+        parts.append("### Coverage\n\n")
         if threshold is not None:
             if coverage >= threshold:
-                result += f"✅ Coverage: {coverage}% (meets {threshold}% requirement)\n"
+                parts.append(f"✅ Coverage: {coverage}% (meets {threshold}% requirement)\n")
             else:
-                result += f"❌ Coverage: {coverage}% (below {threshold}% requirement)\n"
+                parts.append(f"❌ Coverage: {coverage}% (below {threshold}% requirement)\n")
         else:
-            result += f"Coverage: {coverage}%\n"
+            parts.append(f"Coverage: {coverage}%\n")
 
-    return result
+    return "".join(parts)
 
 
 async def main() -> None:
     """Run the MCP server."""
+    # The stdio transport is only needed when serving, not when importing the handlers
+    from mcp.server.stdio import stdio_server
+
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
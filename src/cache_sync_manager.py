@@ -1,28 +1,77 @@
 import os
 import logging
 import asyncio
+import hashlib
+import json
+import shutil
 import tempfile
-from datetime import datetime
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional
-from constants import NAMESPACE, CACHE_DIR, VOLUME_CACHE_PATH
+from typing import IO, Dict, Iterator, List, Optional, Union
+from constants import (
+    NAMESPACE,
+    CACHE_DIR,
+    CACHE_FINGERPRINT_MAX_BYTES,
+    CACHE_TARBALL_COMPRESS_PROGRAM,
+    CACHE_TARBALL_DECOMPRESS_PROGRAM,
+    VOLUME_CACHE_PATH,
+)
 from subprocess_utils import run_logged_subprocess
 
+logger = logging.getLogger(f"{NAMESPACE}.{__name__.split('.')[-1]}")
+
+# [mtime, size] plus a content digest for files small enough to hash
+ManifestEntry = List[Union[int, str]]
+
 
 class CacheSyncManager:
     """Manages async fire-and-forget cache synchronization to network volume."""
 
     def __init__(self):
-        self.logger = logging.getLogger(f"{NAMESPACE}.{__name__.split('.')[-1]}")
-        self._should_sync_cached: Optional[bool] = None
+        self.logger = logger
         self._endpoint_id = os.environ.get("RUNPOD_ENDPOINT_ID")
-        self._baseline_time: Optional[float] = None
+        # Serializes tarball writers; a sync requested while one runs is queued for it
+        self._sync_lock = asyncio.Lock()
+        # Oldest baseline still waiting to be archived by the lock holder
+        self._pending_baseline: Optional[float] = None
+        self._sync_enabled: bool = self._compute_should_sync()
+        # zstd frames concatenate, so compressed deltas can still be appended
+        self._use_zstd = self._sync_enabled and shutil.which("zstd") is not None
+        # Volume capacity is fixed for the pod's lifetime; stat it once, not per sync
+        self._volume_total: Optional[int] = None
+        if self._sync_enabled:
+            try:
+                stat = os.statvfs(os.path.dirname(VOLUME_CACHE_PATH))
+                self._volume_total = stat.f_blocks * stat.f_frsize
+            except OSError as e:
+                self.logger.debug(f"Failed to stat volume capacity: {e}")
 
     @property
     def _tarball_path(self) -> str:
         """Get the path to the cache tarball for this endpoint."""
+        suffix = ".tar.zst" if self._use_zstd else ".tar"
+        return f"{VOLUME_CACHE_PATH}/cache-{self._endpoint_id}{suffix}"
+
+    @property
+    def _legacy_tarball_path(self) -> str:
+        """Get the path of the uncompressed tarball written before zstd was available."""
         return f"{VOLUME_CACHE_PATH}/cache-{self._endpoint_id}.tar"
 
+    def _readable_tarball_path(self) -> str:
+        """Get the tarball to read: the current one, or a legacy .tar not yet migrated."""
+        tarball_path = self._tarball_path
+        if self._use_zstd and not os.path.exists(tarball_path):
+            legacy_path = self._legacy_tarball_path
+            if os.path.exists(legacy_path):
+                return legacy_path
+        return tarball_path
+
+    @property
+    def _manifest_path(self) -> str:
+        """Get the path to the manifest of files already in this endpoint's tarball."""
+        return f"{VOLUME_CACHE_PATH}/cache-{self._endpoint_id}.manifest"
+
     @property
     def _hydration_marker_path(self) -> str:
         """Get the path to the cache hydration marker file."""
@@ -36,7 +85,108 @@ class CacheSyncManager:
             except Exception as e:
                 self.logger.debug(f"Failed to clean up {description}: {e}")
 
-    def should_sync(self) -> bool:
+    def _load_manifest(self) -> Dict[str, ManifestEntry]:
+        """Load the archived-file manifest, treating a missing or unreadable one as empty."""
+        try:
+            with open(self._manifest_path) as f:
+                manifest: Dict[str, ManifestEntry] = json.load(f)
+            return manifest
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Ignoring unreadable cache manifest: {e}")
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, ManifestEntry]) -> None:
+        """Atomically replace the archived-file manifest."""
+        temp_path = f"{self._manifest_path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(manifest, f, separators=(",", ":"))
+            os.replace(temp_path, self._manifest_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to write cache manifest: {e}")
+            self._cleanup_temp_file(temp_path, "temp manifest")
+
+    def _iter_delta_files(self, baseline: float) -> Iterator[os.DirEntry[str]]:
+        """
+        Walk CACHE_DIR and yield entries for regular files modified after the baseline.
+
+        Prunes the same paths the old ``find`` invocation excluded: HuggingFace
+        ``refs/`` and ``.no_exist/`` directories and the hydration marker.
+        Unreadable directories are skipped rather than aborting the walk.
+        """
+        pending = deque([CACHE_DIR])
+        while pending:
+            directory = pending.popleft()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in ("refs", ".no_exist"):
+                                pending.append(entry.path)
+                        elif (
+                            entry.is_file(follow_symlinks=False)
+                            and entry.name != ".cache-last-hydrated"
+                            and entry.stat(follow_symlinks=False).st_mtime > baseline
+                        ):
+                            yield entry
+            except OSError as e:
+                self.logger.debug(f"Skipping unreadable cache directory {directory}: {e}")
+
+    def _write_delta_file_list(
+        self,
+        file_list: IO[str],
+        baseline: float,
+        manifest: Dict[str, ManifestEntry],
+        refreshed: Dict[str, ManifestEntry],
+    ) -> Dict[str, ManifestEntry]:
+        """
+        Stream the delta paths into a ``tar -T`` file list.
+
+        Files whose (mtime, size) already match the manifest are in the tarball
+        and are skipped. Mtimes are compared in whole seconds because that is
+        all tar restores on hydration. Small files whose mtime moved but whose
+        size and content digest still match are skipped too; their updated
+        entries are collected in ``refreshed`` so the caller can record them and
+        the next sync skips them on stat alone.
+
+        Returns:
+            Manifest entries, keyed by path relative to CACHE_DIR, for the files written
+        """
+        delta: Dict[str, ManifestEntry] = {}
+        prefix_len = len(CACHE_DIR) + 1
+        for entry in self._iter_delta_files(baseline):
+            stat = entry.stat(follow_symlinks=False)
+            key = entry.path[prefix_len:]
+            fingerprint: ManifestEntry = [int(stat.st_mtime), stat.st_size]
+            archived = manifest.get(key)
+            if archived is not None and archived[:2] == fingerprint:
+                continue
+            if stat.st_size <= CACHE_FINGERPRINT_MAX_BYTES:
+                try:
+                    fingerprint.append(self._file_digest(entry.path))
+                except OSError as e:
+                    self.logger.debug(f"Failed to fingerprint {entry.path}: {e}")
+                else:
+                    if archived is not None and archived[1:] == fingerprint[1:]:
+                        refreshed[key] = fingerprint
+                        continue
+            file_list.write(entry.path)
+            file_list.write("\n")
+            delta[key] = fingerprint
+        return delta
+
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        """Return a content digest of a file for the manifest's staleness test."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _compute_should_sync(self) -> bool:
         """
         Determine if cache sync functionality is available.
 
@@ -45,25 +195,18 @@ class CacheSyncManager:
         - Network volume is mounted
         - Volume cache directory exists or can be created
 
-        Result is cached after first check.
-
         Returns:
             True if sync functionality is available, False otherwise
         """
-        if self._should_sync_cached is not None:
-            return self._should_sync_cached
-
         # Skip if no endpoint ID
         if not self._endpoint_id:
             self.logger.debug("No RUNPOD_ENDPOINT_ID set, skipping cache sync")
-            self._should_sync_cached = False
             return False
 
         # Skip if volume not mounted
         volume_root = os.path.dirname(VOLUME_CACHE_PATH)
         if not os.path.exists(volume_root):
             self.logger.debug(f"Volume {volume_root} not mounted, skipping cache sync")
-            self._should_sync_cached = False
             return False
 
         # Ensure volume cache directory exists
@@ -71,88 +214,142 @@ class CacheSyncManager:
             os.makedirs(VOLUME_CACHE_PATH, exist_ok=True)
         except Exception as e:
             self.logger.warning(f"Failed to create volume cache directory {VOLUME_CACHE_PATH}: {e}")
-            self._should_sync_cached = False
             return False
 
-        self._should_sync_cached = True
         return True
 
-    def mark_baseline(self) -> None:
-        """Mark baseline timestamp before installation."""
-        if not self.should_sync():
-            return
+    @staticmethod
+    def _append_file(src: str, dst: str) -> None:
+        """
+        Append the bytes of src to the end of dst without copying through user space.
+
+        Raises:
+            OSError: If not all of src could be appended; dst is truncated back to
+                its original length so no partial zstd frame is left behind
+        """
+        # copy_file_range rejects O_APPEND targets, so seek to the end instead
+        with open(src, "rb") as source, open(dst, "r+b") as target:
+            src_fd, dst_fd = source.fileno(), target.fileno()
+            size = os.fstat(src_fd).st_size
+            original_end = os.lseek(dst_fd, 0, os.SEEK_END)
+            remaining = size
+            try:
+                try:
+                    # Lets network filesystems copy server-side where supported
+                    while remaining:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                        if not copied:
+                            break
+                        remaining -= copied
+                except OSError:
+                    # Not supported between these filesystems; sendfile still stays in-kernel
+                    while remaining:
+                        copied = os.sendfile(dst_fd, src_fd, None, remaining)
+                        if not copied:
+                            break
+                        remaining -= copied
+                if remaining:
+                    raise OSError(f"Appended only {size - remaining} of {size} bytes from {src}")
+            except BaseException:
+                os.ftruncate(dst_fd, original_end)
+                raise
+
+    def should_sync(self) -> bool:
+        """Whether cache sync is available, as determined once at construction."""
+        return self._sync_enabled
+
+    def mark_baseline(self) -> Optional[float]:
+        """Return the baseline timestamp to diff against after this request's installation."""
+        if not self._sync_enabled:
+            return None
 
         try:
-            tarball_path = self._tarball_path
+            tarball_path = self._readable_tarball_path()
             if os.path.exists(tarball_path):
                 # Subsequent run: use tarball mtime as baseline
-                self._baseline_time = os.path.getmtime(tarball_path)
+                baseline_time = os.path.getmtime(tarball_path)
                 baseline_source = "tarball"
             else:
                 # First run: use current time as baseline
-                self._baseline_time = datetime.now().timestamp()
+                baseline_time = time.time()
                 baseline_source = "current time"
 
             self.logger.debug(
-                f"Baseline ({baseline_source}): {datetime.fromtimestamp(self._baseline_time).strftime('%Y-%m-%d %H:%M:%S')}"
+                f"Baseline ({baseline_source}): {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(baseline_time))}"
             )
+            return baseline_time
         except Exception as e:
             self.logger.warning(f"Failed to mark cache baseline: {e}")
-            self._baseline_time = None
+            return None
+
+    async def sync_to_volume(self, baseline_time: Optional[float]) -> None:
+        """Archive files changed since ``baseline_time`` into the volume tarball.
 
-    async def sync_to_volume(self) -> None:
-        """Background worker to collect delta and create tarball."""
-        if not self.should_sync() or not self._baseline_time:
+        A sync requested while another is running is not dropped: its baseline
+        is queued and the running sync makes another pass from the oldest
+        queued baseline before releasing the lock.
+        """
+        if not self._sync_enabled or baseline_time is None:
             return
 
+        if self._pending_baseline is None or baseline_time < self._pending_baseline:
+            self._pending_baseline = baseline_time
+
+        if self._sync_lock.locked():
+            self.logger.debug("Cache sync already in progress, queued for another pass")
+            return
+
+        async with self._sync_lock:
+            while self._pending_baseline is not None:
+                pending, self._pending_baseline = self._pending_baseline, None
+                await self._sync_delta(pending)
+
+    async def _sync_delta(self, baseline_time: float) -> None:
+        """Collect files newer than the baseline and add them to the volume tarball."""
         try:
-            baseline_time = self._baseline_time
             tarball_path = self._tarball_path
             tarball_exists = os.path.exists(tarball_path)
+            if self._use_zstd and not tarball_exists and os.path.exists(self._legacy_tarball_path):
+                # Carry the pre-zstd cache over; its manifest still describes the contents
+                if not await self._migrate_legacy_tarball():
+                    return
+                tarball_exists = True
 
             self.logger.debug(f"Sync cache to persist from {CACHE_DIR} to {tarball_path}")
 
-            # Format timestamp for find -newermt
-            baseline_str = datetime.fromtimestamp(baseline_time).strftime("%Y-%m-%d %H:%M:%S")
+            # A fresh tarball starts a fresh manifest
+            manifest = await asyncio.to_thread(self._load_manifest) if tarball_exists else {}
 
-            # Find files newer than baseline
-            find_result = await asyncio.to_thread(
-                run_logged_subprocess,
-                command=[
-                    "find",
-                    CACHE_DIR,
-                    "-newermt",
-                    baseline_str,
-                    "-type",
-                    "f",
-                    "-not",
-                    "-path",
-                    "*/refs/*",
-                    "-not",
-                    "-path",
-                    "*/.no_exist/*",
-                    "-not",
-                    "-name",
-                    ".cache-last-hydrated",
-                ],
-                logger=self.logger,
-                operation_name="Finding new cache files",
-                suppress_output=True,
+            # Stream files newer than baseline straight into the tar file list
+            file_list_fd = tempfile.NamedTemporaryFile(
+                prefix=".cache-files-", dir="/tmp", delete=False, mode="w"
             )
-
-            if not find_result.success:
-                self.logger.warning(f"Failed to find cache delta: {find_result.error}")
+            file_list_path = file_list_fd.name
+            refreshed: Dict[str, ManifestEntry] = {}
+            try:
+                with file_list_fd:
+                    delta = await asyncio.to_thread(
+                        self._write_delta_file_list,
+                        file_list_fd,
+                        baseline_time,
+                        manifest,
+                        refreshed,
+                    )
+            except Exception as e:
+                self.logger.warning(f"Failed to collect cache delta: {e}")
+                self._cleanup_temp_file(file_list_path, "file list")
                 return
 
-            # Check if there are any new files
-            new_files = (find_result.stdout or "").strip()
-            if not new_files:
+            if not delta:
                 self.logger.debug("No new cache files to sync")
+                self._cleanup_temp_file(file_list_path, "file list")
+                if refreshed:
+                    # Record new mtimes of unchanged files so they are not hashed again
+                    manifest.update(refreshed)
+                    await asyncio.to_thread(self._write_manifest, manifest)
                 return
 
-            # Log summary instead of full file list
-            file_count = len(new_files.split("\n"))
-            self.logger.debug(f"Found {file_count} new cache files to sync")
+            self.logger.debug(f"Found {len(delta)} new cache files to sync")
 
             # Monitor tarball size if it exists
             if tarball_exists:
@@ -161,13 +358,9 @@ class CacheSyncManager:
                     tarball_mb = tarball_size / (1024 * 1024)
                     self.logger.debug(f"Current tarball size: {tarball_mb:.1f}MB")
 
-                    # Check volume capacity and warn if tarball exceeds 50%
-                    volume_root = os.path.dirname(VOLUME_CACHE_PATH)
-                    stat = os.statvfs(volume_root)
-                    volume_total = stat.f_blocks * stat.f_frsize
-                    threshold = volume_total * 0.75
-
-                    if tarball_size > threshold:
+                    # Warn if tarball exceeds 75% of volume capacity
+                    volume_total = self._volume_total
+                    if volume_total and tarball_size > volume_total * 0.75:
                         volume_total_gb = volume_total / (1024**3)
                         self.logger.warning(
                             f"Tarball size ({tarball_mb:.1f}MB) exceeds 75% of volume capacity ({volume_total_gb:.1f}GB)"
@@ -175,103 +368,117 @@ class CacheSyncManager:
                 except OSError as e:
                     self.logger.debug(f"Failed to check tarball size: {e}")
 
-            # Write file list to temporary file
-            file_list_fd = tempfile.NamedTemporaryFile(
-                prefix=".cache-files-", dir="/tmp", delete=False, mode="w"
-            )
-            file_list_path = file_list_fd.name
-            try:
-                file_list_fd.write(new_files)
-                file_list_fd.close()
-            except Exception as e:
-                self.logger.warning(f"Failed to write file list: {e}")
-                file_list_fd.close()
-                return
-
-            # Always create tarball of new files first
             new_tarball = f"{tarball_path}.new"
-            temp_tarball = f"{tarball_path}.tmp"
 
             try:
-                # Create tarball containing only new files
-                create_result = await asyncio.to_thread(
-                    run_logged_subprocess,
-                    command=["tar", "cf", new_tarball, "-T", file_list_path],
-                    logger=self.logger,
-                    operation_name="Creating tarball of new files",
-                )
-
-                if not create_result.success:
-                    self.logger.warning(
-                        f"Failed to create new files tarball: {create_result.error}"
-                    )
-                    return
-
-                if tarball_exists:
-                    # Move existing tarball to temp location
-                    move_to_temp_result = await asyncio.to_thread(
+                if tarball_exists and not self._use_zstd:
+                    # Append the delta to the existing archive in place
+                    append_result = await asyncio.to_thread(
                         run_logged_subprocess,
-                        command=["mv", tarball_path, temp_tarball],
+                        command=["tar", "rf", tarball_path, "-T", file_list_path],
                         logger=self.logger,
-                        operation_name="Moving existing tarball to temp",
+                        operation_name="Appending new files to tarball",
+                        discard_stdout=True,
                     )
 
-                    if not move_to_temp_result.success:
-                        self.logger.warning(
-                            f"Failed to move tarball to temp: {move_to_temp_result.error}"
-                        )
+                    if not append_result.success:
+                        self.logger.warning(f"Failed to append to tarball: {append_result.error}")
                         return
-
-                    # Concatenate new tarball into temp (faster than append)
-                    concat_result = await asyncio.to_thread(
+                    self.logger.info(f"Successfully appended to cache tarball at {tarball_path}")
+                else:
+                    # Build the delta aside so readers never see a partial archive
+                    create_command = ["tar", "cf", new_tarball, "-T", file_list_path]
+                    if self._use_zstd:
+                        # Options go after the bundled "cf", which tar only parses as argv[1]
+                        create_command.append(
+                            f"--use-compress-program={CACHE_TARBALL_COMPRESS_PROGRAM}"
+                        )
+                    create_result = await asyncio.to_thread(
                         run_logged_subprocess,
-                        command=["tar", "-A", "-f", temp_tarball, new_tarball],
+                        command=create_command,
                         logger=self.logger,
-                        operation_name="Concatenating new files to tarball",
+                        operation_name="Creating tarball of new files",
+                        discard_stdout=True,
                     )
 
-                    if not concat_result.success:
-                        self.logger.warning(f"Failed to concatenate tarball: {concat_result.error}")
+                    if not create_result.success:
+                        self.logger.warning(
+                            f"Failed to create new files tarball: {create_result.error}"
+                        )
                         return
 
-                    # Atomically move temp to final location
-                    rename_result = await asyncio.to_thread(
-                        run_logged_subprocess,
-                        command=["mv", temp_tarball, tarball_path],
-                        logger=self.logger,
-                        operation_name="Moving tarball to final location",
-                    )
-
-                    if rename_result.success:
+                    if tarball_exists:
+                        # Compressed tarballs grow by concatenating the delta's zstd frames
+                        try:
+                            await asyncio.to_thread(self._append_file, new_tarball, tarball_path)
+                        except OSError as e:
+                            self.logger.warning(f"Failed to append to tarball: {e}")
+                            return
                         self.logger.info(
-                            f"Successfully concatenated cache tarball at {tarball_path}"
+                            f"Successfully appended to cache tarball at {tarball_path}"
                         )
-                        self.mark_last_hydrated()
                     else:
-                        self.logger.warning(f"Failed to move tarball: {rename_result.error}")
-                else:
-                    # No existing tarball, just move new one to final location
-                    rename_result = await asyncio.to_thread(
-                        run_logged_subprocess,
-                        command=["mv", new_tarball, tarball_path],
-                        logger=self.logger,
-                        operation_name="Moving tarball to final location",
-                    )
-
-                    if rename_result.success:
+                        os.replace(new_tarball, tarball_path)
                         self.logger.info(f"Successfully created cache tarball at {tarball_path}")
-                        self.mark_last_hydrated()
-                    else:
-                        self.logger.warning(f"Failed to move tarball: {rename_result.error}")
+
+                self.mark_last_hydrated()
+                manifest.update(refreshed)
+                manifest.update(delta)
+                await asyncio.to_thread(self._write_manifest, manifest)
             finally:
                 # Clean up temporary files
                 self._cleanup_temp_file(file_list_path, "file list")
                 self._cleanup_temp_file(new_tarball, "new files tarball")
-                self._cleanup_temp_file(temp_tarball, "temp tarball")
 
         except Exception as e:
             self.logger.error(f"Unexpected error in cache sync: {e}", exc_info=True)
 
+    async def _migrate_legacy_tarball(self) -> bool:
+        """
+        Recompress the legacy .tar cache into the .tar.zst tarball and remove it.
+
+        The legacy mtime is kept so the migrated tarball is not seen as newer than
+        the last hydration.
+
+        Returns:
+            True if the compressed tarball replaced the legacy one
+        """
+        legacy_path = self._legacy_tarball_path
+        tarball_path = self._tarball_path
+        new_tarball = f"{tarball_path}.new"
+
+        result = await asyncio.to_thread(
+            run_logged_subprocess,
+            command=[
+                *CACHE_TARBALL_COMPRESS_PROGRAM.split(),
+                "-q",
+                "-f",
+                "-o",
+                new_tarball,
+                legacy_path,
+            ],
+            logger=self.logger,
+            operation_name="Compressing legacy cache tarball",
+            discard_stdout=True,
+        )
+        if not result.success:
+            self.logger.warning(f"Failed to migrate legacy cache tarball: {result.error}")
+            self._cleanup_temp_file(new_tarball, "migrated tarball")
+            return False
+
+        try:
+            legacy_stat = os.stat(legacy_path)
+            os.utime(new_tarball, ns=(legacy_stat.st_atime_ns, legacy_stat.st_mtime_ns))
+            os.replace(new_tarball, tarball_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to migrate legacy cache tarball: {e}")
+            self._cleanup_temp_file(new_tarball, "migrated tarball")
+            return False
+
+        self._cleanup_temp_file(legacy_path, "legacy tarball")
+        self.logger.info(f"Migrated legacy cache tarball to {tarball_path}")
+        return True
+
     def should_hydrate(self) -> bool:
         """
         Check if cache hydration should run.
@@ -279,10 +486,10 @@ class CacheSyncManager:
         Returns:
             True if tarball exists and is newer than last hydration, False otherwise
         """
-        if not self.should_sync():
+        if not self._sync_enabled:
             return False
 
-        tarball_path = self._tarball_path
+        tarball_path = self._readable_tarball_path()
         if not os.path.exists(tarball_path):
             self.logger.debug(f"Tarball {tarball_path} does not exist, skipping hydration")
             return False
@@ -309,7 +516,7 @@ class CacheSyncManager:
 
     def mark_last_hydrated(self) -> None:
         """Mark timestamp of last hydration."""
-        if not self.should_sync():
+        if not self._sync_enabled:
             return
 
         try:
@@ -324,7 +531,7 @@ class CacheSyncManager:
             return
 
         try:
-            tarball_path = self._tarball_path
+            tarball_path = self._readable_tarball_path()
             self.logger.debug(f"Hydrating cache from {tarball_path} to {CACHE_DIR}")
 
             # Ensure cache directory exists
@@ -334,12 +541,20 @@ class CacheSyncManager:
                 self.logger.warning(f"Failed to create cache directory {CACHE_DIR}: {e}")
                 return
 
-            # Extract tarball to cache directory
+            # Extract tarball to cache directory; a compressed tarball holds one
+            # archive per sync, so read past each end-of-archive marker
+            extract_command = ["tar", "xf", tarball_path, "-C", "/"]
+            if tarball_path.endswith(".zst"):
+                extract_command += [
+                    f"--use-compress-program={CACHE_TARBALL_DECOMPRESS_PROGRAM}",
+                    "--ignore-zeros",
+                ]
             tar_result = await asyncio.to_thread(
                 run_logged_subprocess,
-                command=["tar", "xf", tarball_path, "-C", "/"],
+                command=extract_command,
                 logger=self.logger,
                 operation_name="Extracting cache tarball",
+                discard_stdout=True,
             )
 
             if tar_result.success:
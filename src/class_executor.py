@@ -1,23 +1,87 @@
-import io
+import atexit
+import gc
 import logging
+import os
 import traceback
+import time
 import uuid
 import inspect
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stdout, redirect_stderr
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from runpod_flash.protos.remote_execution import FunctionRequest, FunctionResponse
+from code_cache import CodeCache
+from constants import (
+    CLASS_INSTANCE_MEMORY_LIMIT,
+    CLASS_INSTANCE_TTL,
+    INSTANCE_PERSIST_EXIT_TIMEOUT,
+    MAX_CLASS_INSTANCES,
+)
+from instance_store import InstanceStore
+from output_capture import OutputSink, capture_logs
 from serialization_utils import SerializationUtils
 
+_CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+@dataclass(slots=True)
+class InstanceRec:
+    """A persistent class instance and its usage bookkeeping."""
+
+    obj: Any
+    class_name: str
+    code_key: str  # hash of the class code, which keys the persisted copy
+    created_at: float  # wall-clock seconds, taken once at creation
+    last_used_ns: int  # time.monotonic_ns(), refreshed on every call
+    method_calls: int = 0
+    created_at_iso: str = field(default="", repr=False)  # formatted on first info()
+
+    def info(self) -> Dict[str, Any]:
+        """Return metadata for responses, with timestamps in ISO format."""
+        if not self.created_at_iso:
+            self.created_at_iso = datetime.fromtimestamp(self.created_at).isoformat()
+        idle = (time.monotonic_ns() - self.last_used_ns) / 1_000_000_000
+        last_used = max(self.created_at, time.time() - idle)
+        return {
+            "class_name": self.class_name,
+            "created_at": self.created_at_iso,
+            "method_calls": self.method_calls,
+            "last_used": datetime.fromtimestamp(last_used).isoformat(),
+        }
+
 
 class ClassExecutor:
     """Handles execution of class methods with instance management."""
 
-    def __init__(self):
-        # Instance registry for persistent class instances
-        self.class_instances: Dict[str, Any] = {}
-        self.instance_metadata: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_instances: Optional[int] = None):
+        # Instance registry for persistent class instances, in least recently used order
+        self.instances: "OrderedDict[str, InstanceRec]" = OrderedDict()
+        if max_instances is None:
+            max_instances = int(os.getenv("FLASH_MAX_CLASS_INSTANCES", MAX_CLASS_INSTANCES))
+        self.max_instances = max_instances
+        # Explicit idle TTL in seconds; without one, instances expire only if they can be persisted
+        ttl = os.getenv("FLASH_CLASS_INSTANCE_TTL")
+        self.instance_ttl: Optional[float] = float(ttl) if ttl else None
+        self.memory_limit = CLASS_INSTANCE_MEMORY_LIMIT
+        # Evicted instances are persisted here and restored on a later miss
+        self.instance_store = InstanceStore()
+        # One writer thread keeps pickling and volume I/O off the request path, in order
+        self._store_writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="flash-instance-store"
+        )
+        # Evicted instances queued for saving; the writer skips any removed before it runs
+        self._pending_saves: Dict[str, InstanceRec] = {}
+        self._pending_lock = threading.Lock()
+        # Compiled class bodies keyed by content hash
+        self._code_cache = CodeCache()
+        # Persist live instances on interpreter shutdown so a restarted worker can restore them
+        atexit.register(_persist_on_exit, weakref.ref(self))
 
     async def execute(self, request: FunctionRequest) -> FunctionResponse:
         """Execute class method."""
@@ -27,17 +91,12 @@ class ClassExecutor:
         """
         Execute a class method with instance management.
         """
-        stdout_io = io.StringIO()
-        stderr_io = io.StringIO()
-        log_io = io.StringIO()
+        self.cleanup_instances()
 
-        with redirect_stdout(stdout_io), redirect_stderr(stderr_io):
-            # Setup logging
-            log_handler = logging.StreamHandler(log_io)
-            log_handler.setLevel(logging.DEBUG)
-            logger = logging.getLogger()
-            logger.addHandler(log_handler)
+        # stdout, stderr and logs share one sink so output is combined in write order
+        output = OutputSink()
 
+        with redirect_stdout(output), redirect_stderr(output), capture_logs(output):
             try:
                 # Get or create class instance
                 instance, instance_id = self._get_or_create_instance(request)
@@ -69,7 +128,7 @@ class ClassExecutor:
 
             except Exception as e:
                 # Error handling
-                combined_output = stdout_io.getvalue() + stderr_io.getvalue() + log_io.getvalue()
+                combined_output = output.getvalue()
                 traceback_str = traceback.format_exc()
                 error_message = f"{str(e)}\n{traceback_str}"
 
@@ -79,19 +138,17 @@ class ClassExecutor:
                     stdout=combined_output,
                 )
 
-            finally:
-                logger.removeHandler(log_handler)
-
         # Serialize result
-        serialized_result = SerializationUtils.serialize_result(result)
-        combined_output = stdout_io.getvalue() + stderr_io.getvalue() + log_io.getvalue()
+        serialized_result = await SerializationUtils.serialize_result_async(result)
+        combined_output = output.getvalue()
+        rec = self.instances.get(instance_id)
 
         return FunctionResponse(
             success=True,
             result=serialized_result,
             stdout=combined_output,
             instance_id=instance_id,
-            instance_info=self.instance_metadata.get(instance_id, {}),
+            instance_info=rec.info() if rec is not None else {},
         )
 
     def _get_or_create_instance(self, request: FunctionRequest) -> Tuple[Any, str]:
@@ -100,19 +157,27 @@ class ClassExecutor:
         """
         instance_id = getattr(request, "instance_id", None)
         create_new = getattr(request, "create_new_instance", True)
+        code_key = CodeCache.key(request.class_code or "").hex()
 
         # Check if we should reuse existing instance
-        if not create_new and instance_id and instance_id in self.class_instances:
-            logging.debug(f"Reusing existing instance: {instance_id}")
-            return self.class_instances[instance_id], instance_id
+        if not create_new and instance_id:
+            rec = self.instances.get(instance_id)
+            if rec is not None:
+                logging.debug(f"Reusing existing instance: {instance_id}")
+                self.instances.move_to_end(instance_id)
+                return rec.obj, instance_id
+
+            restored = self._restore_instance(instance_id, code_key)
+            if restored is not None:
+                return restored, instance_id
 
         # Create new instance
         logging.debug(f"Creating new instance of class: {request.class_name}")
 
-        # Execute class code
+        # Execute class code (reused when the code is unchanged)
         namespace: Dict[str, Any] = {}
         if request.class_code:
-            exec(request.class_code, namespace)
+            namespace = self._code_cache.get_namespace(request.class_code)
 
         if request.class_name not in namespace:
             raise ValueError(f"Class '{request.class_name}' not found in the provided code")
@@ -137,19 +202,266 @@ class ClassExecutor:
             instance_id = f"{request.class_name}_{uuid.uuid4().hex[:8]}"
 
         # Store instance
-        self.class_instances[instance_id] = instance
-        self.instance_metadata[instance_id] = {
-            "class_name": request.class_name,
-            "created_at": datetime.now().isoformat(),
-            "method_calls": 0,
-            "last_used": datetime.now().isoformat(),
-        }
+        self._register_instance(instance_id, request.class_name, code_key, instance)
 
         logging.debug(f"Created instance with ID: {instance_id}")
         return instance, instance_id
 
+    def _register_instance(
+        self, instance_id: str, class_name: str, code_key: str, instance: Any
+    ) -> None:
+        """
+        Store an instance, evicting the least recently used ones beyond the cap.
+
+        While the container's memory usage is above memory_limit percent of its
+        cgroup limit, queued saves are dropped first and then older instances,
+        until usage is back under the limit; the new instance is always kept.
+        Pickling them would need memory the container does not have, so they
+        are not persisted.
+        """
+        self.instances[instance_id] = InstanceRec(
+            obj=instance,
+            class_name=class_name,
+            code_key=code_key,
+            created_at=time.time(),
+            last_used_ns=time.monotonic_ns(),
+        )
+        self.instances.move_to_end(instance_id)
+        while len(self.instances) > self.max_instances:
+            self._evict_oldest()
+        usage = _container_memory_percent()
+        if usage is not None and usage > self.memory_limit and self._drop_pending_saves():
+            gc.collect()
+            usage = _container_memory_percent()
+        while usage is not None and usage > self.memory_limit and len(self.instances) > 1:
+            self._evict_oldest(persist=False)
+            # Free the dropped instance's reference cycles before measuring again
+            gc.collect()
+            usage = _container_memory_percent()
+
+    def _evict_oldest(self, persist: bool = True) -> None:
+        """Evict the least recently used instance, persisting it to the instance store."""
+        evicted_id, evicted = self.instances.popitem(last=False)
+        if persist:
+            self._save_in_background(evicted_id, evicted)
+            logging.debug(f"Evicted least recently used instance: {evicted_id}")
+        else:
+            logging.warning(
+                f"Dropped instance {evicted_id} under memory pressure without persisting it"
+            )
+
+    def _save_in_background(self, instance_id: str, rec: InstanceRec) -> None:
+        """Queue a dropped instance for persistence on the store writer thread."""
+        if not self.instance_store.enabled:
+            return
+
+        with self._pending_lock:
+            self._pending_saves[instance_id] = rec
+        self._store_writer.submit(self._write_pending_save, instance_id)
+
+    def _write_pending_save(self, instance_id: str) -> None:
+        """Persist a queued instance unless it was restored or dropped while waiting."""
+        with self._pending_lock:
+            rec = self._pending_saves.get(instance_id)
+        if rec is None:
+            return
+        try:
+            self.instance_store.save(instance_id, rec.code_key, rec.class_name, rec.obj)
+        finally:
+            with self._pending_lock:
+                if self._pending_saves.get(instance_id) is rec:
+                    del self._pending_saves[instance_id]
+
+    def _drop_pending_saves(self) -> int:
+        """Forget queued saves so their instances can be freed; returns how many were dropped."""
+        with self._pending_lock:
+            dropped = len(self._pending_saves)
+            self._pending_saves.clear()
+        if dropped:
+            logging.warning(f"Dropped {dropped} queued instance saves under memory pressure")
+        return dropped
+
+    def flush_instance_store(self) -> None:
+        """Wait for queued instance saves to reach the instance store."""
+        try:
+            self._store_writer.submit(lambda: None).result()
+        except RuntimeError:
+            # Already shut down at interpreter exit, which drains the queue first
+            pass
+
+    def _restore_instance(self, instance_id: str, code_key: str) -> Any:
+        """
+        Restore a previously evicted instance from the instance store.
+
+        Only an instance created from the same class code is restored, so a
+        request that changed the code gets a fresh instance rather than stale state.
+
+        Returns:
+            The restored instance, or None if none was persisted or it failed to load
+        """
+        with self._pending_lock:
+            rec = self._pending_saves.get(instance_id)
+            if rec is not None and rec.code_key == code_key:
+                del self._pending_saves[instance_id]
+            else:
+                rec = None
+        if rec is not None:
+            # A save already running may still land; drop that copy once it has
+            self._store_writer.submit(self.instance_store.discard, instance_id, code_key)
+            self._register_instance(instance_id, rec.class_name, code_key, rec.obj)
+            logging.debug(f"Restored instance from pending save: {instance_id}")
+            return rec.obj
+
+        if not self.instance_store.exists(instance_id, code_key):
+            return None
+
+        try:
+            class_name, instance = self.instance_store.load(instance_id, code_key)
+        except Exception as e:
+            logging.debug(f"Could not restore instance {instance_id}: {e}")
+            return None
+
+        # The instance lives in memory again; its persisted copy would go stale
+        self.instance_store.discard(instance_id, code_key)
+        self._register_instance(instance_id, class_name, code_key, instance)
+        logging.debug(f"Restored persisted instance: {instance_id}")
+        return instance
+
     def _update_instance_metadata(self, instance_id: str):
         """Update metadata for an instance."""
-        if instance_id in self.instance_metadata:
-            self.instance_metadata[instance_id]["method_calls"] += 1
-            self.instance_metadata[instance_id]["last_used"] = datetime.now().isoformat()
+        rec = self.instances.get(instance_id)
+        if rec is not None:
+            rec.method_calls += 1
+            rec.last_used_ns = time.monotonic_ns()
+            self.instances.move_to_end(instance_id)
+
+    def persist_instances(self, timeout: Optional[float] = None) -> int:
+        """
+        Persist live instances to the instance store, most recently used first.
+
+        Classes can opt out by setting __flash_persist__ = False.
+
+        Args:
+            timeout: Seconds after which no further instances are started; None for no limit
+        Returns:
+            Number of instances written
+        """
+        if not self.instance_store.enabled:
+            return 0
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        saved = 0
+        for instance_id, rec in reversed(list(self.instances.items())):
+            if deadline is not None and time.monotonic() >= deadline:
+                logging.debug("Instance persistence time budget spent, skipping the rest")
+                break
+            if self.instance_store.save(instance_id, rec.code_key, rec.class_name, rec.obj):
+                saved += 1
+        if saved:
+            logging.debug(f"Persisted {saved} live instances")
+        return saved
+
+    def cleanup_instances(self, max_age_minutes: Optional[float] = None) -> List[str]:
+        """
+        Drop instances that have not been used within max_age_minutes.
+
+        Dropped instances are persisted to the instance store when available.
+        By default idle instances expire after CLASS_INSTANCE_TTL only when they
+        can be persisted, since a later request may still reuse them; setting
+        FLASH_CLASS_INSTANCE_TTL expires them regardless.
+
+        Args:
+            max_age_minutes: Idle time in minutes after which an instance is dropped,
+                or None for the configured TTL
+        Returns:
+            IDs of the dropped instances
+        """
+        if max_age_minutes is not None:
+            max_age = max_age_minutes * 60
+        elif self.instance_ttl is not None:
+            if self.instance_ttl <= 0:
+                return []
+            max_age = self.instance_ttl
+        elif self.instance_store.enabled:
+            max_age = CLASS_INSTANCE_TTL
+        else:
+            return []
+
+        cutoff_ns = time.monotonic_ns() - int(max_age * 1_000_000_000)
+        expired = []
+        # Instances are kept in last-use order, so stop at the first recent one
+        while self.instances:
+            key, rec = next(iter(self.instances.items()))
+            if rec.last_used_ns >= cutoff_ns:
+                break
+            del self.instances[key]
+            if self.instance_store.enabled:
+                self._save_in_background(key, rec)
+            else:
+                logging.warning(f"Dropped idle instance {key} without persisting it")
+            expired.append(key)
+        return expired
+
+
+def _read_cgroup_int(path: str) -> Optional[int]:
+    """Read an integer cgroup value, or None if it is missing or unlimited ("max")."""
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def _read_cgroup_stat(path: str, key: str) -> int:
+    """Read one counter from a cgroup memory.stat file, defaulting to 0."""
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, value = line.partition(" ")
+                if name == key:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _container_memory_percent() -> Optional[float]:
+    """
+    Return the container's memory working set as a percent of its cgroup limit.
+
+    The working set excludes inactive page cache, which the kernel reclaims before
+    it would OOM-kill the container. Supports cgroup v2 and v1.
+
+    Returns:
+        Usage percent, or None when no cgroup memory limit applies
+    """
+    v2_limit = _read_cgroup_int(f"{_CGROUP_ROOT}/memory.max")
+    if v2_limit is not None:
+        usage = _read_cgroup_int(f"{_CGROUP_ROOT}/memory.current")
+        inactive = _read_cgroup_stat(f"{_CGROUP_ROOT}/memory.stat", "inactive_file")
+        limit = v2_limit
+    else:
+        v1_dir = f"{_CGROUP_ROOT}/memory"
+        v1_limit = _read_cgroup_int(f"{v1_dir}/memory.limit_in_bytes")
+        # v1 reports "no limit" as a huge page-aligned number rather than "max"
+        if v1_limit is None or v1_limit >= 1 << 62:
+            return None
+        usage = _read_cgroup_int(f"{v1_dir}/memory.usage_in_bytes")
+        inactive = _read_cgroup_stat(f"{v1_dir}/memory.stat", "total_inactive_file")
+        limit = v1_limit
+
+    if usage is None or not limit:
+        return None
+    return max(usage - inactive, 0) * 100 / limit
+
+
+def _persist_on_exit(executor_ref: "weakref.ReferenceType[ClassExecutor]") -> None:
+    """Persist the live instances of a ClassExecutor if it is still alive at exit."""
+    executor = executor_ref()
+    if executor is None:
+        return
+    timeout = float(os.getenv("FLASH_INSTANCE_PERSIST_TIMEOUT", INSTANCE_PERSIST_EXIT_TIMEOUT))
+    executor.flush_instance_store()
+    if timeout > 0:
+        executor.persist_instances(timeout=timeout)
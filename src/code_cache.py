@@ -0,0 +1,100 @@
+import hashlib
+import linecache
+import time
+import types
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from constants import MAX_CACHED_CODE
+
+
+class CodeCache:
+    """
+    Caches compiled remote code and its executed namespace by content hash.
+
+    Entries are kept in least-recently-used order; beyond max_entries the least
+    recently used code body is dropped so a stream of distinct sources cannot
+    grow the cache without bound.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_CODE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[types.CodeType, Dict[str, Any]]]" = OrderedDict()
+        # Monotonic last-use time per entry, used for idle eviction
+        self._last_used: Dict[bytes, float] = {}
+
+    @staticmethod
+    def key(code: str) -> bytes:
+        """Return the content hash used to key a code body."""
+        return hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+
+    def get_namespace(self, code: str) -> Dict[str, Any]:
+        """
+        Return a namespace populated by executing the given code.
+
+        The first call for a code body compiles and executes it; later calls with
+        identical source reuse the cached namespace without re-parsing or re-running
+        the module-level statements. The code is compiled under a stable synthetic
+        filename registered with linecache, so tracebacks and profilers show the
+        remote source.
+
+        Args:
+            code: Python source to execute
+
+        Returns:
+            Shallow copy of the namespace produced by executing the code
+        """
+        key = self.key(code)
+        entry = self._entries.get(key)
+        if entry is None:
+            filename = self.filename(key)
+            linecache.cache[filename] = (len(code), None, code.splitlines(True), filename)
+            code_obj = compile(code, filename, "exec")
+            namespace: Dict[str, Any] = {}
+            exec(code_obj, namespace)
+            entry = (code_obj, namespace)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        else:
+            self._entries.move_to_end(key)
+
+        self._last_used[key] = time.monotonic()
+        return dict(entry[1])
+
+    @staticmethod
+    def filename(key: bytes) -> str:
+        """Return the synthetic filename remote code with this key is compiled under."""
+        return f"<remote:{key.hex()}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def evict_idle(self, max_idle: float) -> int:
+        """
+        Drop entries that have not been used for longer than max_idle seconds.
+
+        Args:
+            max_idle: Idle time in seconds after which an entry is dropped
+
+        Returns:
+            Number of entries dropped
+        """
+        cutoff = time.monotonic() - max_idle
+        stale = [key for key, last_used in self._last_used.items() if last_used < cutoff]
+        for key in stale:
+            self._drop(key)
+        return len(stale)
+
+    def _drop(self, key: bytes) -> None:
+        """Remove an entry and its linecache source."""
+        del self._entries[key]
+        del self._last_used[key]
+        linecache.cache.pop(self.filename(key), None)
+
+    def clear(self) -> None:
+        """Drop all cached code objects and namespaces."""
+        for key in self._entries:
+            linecache.cache.pop(self.filename(key), None)
+        self._entries.clear()
+        self._last_used.clear()
@@ -2,6 +2,38 @@
 NAMESPACE = "flash"
 """Application logger namespace for all components."""
 
+# Warm Function Reuse
+FUNCTION_NAMESPACE_TTL = 3600
+"""Seconds an unused function namespace is kept before it is dropped."""
+
+MAX_MEMOIZED_RESULTS = 64
+"""Maximum number of results kept for functions that opt in with __flash_memoize__ = True."""
+
+MAX_CLASS_INSTANCES = 256
+"""Maximum number of persistent class instances kept; the least recently used is evicted.
+Can be overridden via FLASH_MAX_CLASS_INSTANCES environment variable."""
+
+CLASS_INSTANCE_TTL = 3600
+"""Seconds an unused class instance is kept in memory before it is persisted and dropped.
+Only applies when the instance store is available. Can be overridden via
+FLASH_CLASS_INSTANCE_TTL environment variable, which also expires instances that cannot be
+persisted; 0 disables expiry."""
+
+CLASS_INSTANCE_MEMORY_LIMIT = 85.0
+"""Container memory usage, as a percent of the cgroup limit, above which least recently used
+class instances are evicted."""
+
+MAX_CACHED_CODE = 128
+"""Maximum number of compiled code bodies kept per executor; the least recently used is dropped."""
+
+INSTANCE_PERSIST_EXIT_TIMEOUT = 10.0
+"""Seconds worker shutdown may spend persisting live class instances, most recently used first.
+Can be overridden via FLASH_INSTANCE_PERSIST_TIMEOUT environment variable; 0 disables it."""
+
+INSTANCE_STATE_PATH = "/runpod-volume/instances"
+"""Network volume directory where evicted class instances are persisted, one subdirectory
+per RUNPOD_ENDPOINT_ID."""
+
 # System Package Acceleration with Nala
 LARGE_SYSTEM_PACKAGES = [
     "build-essential",
@@ -18,6 +50,19 @@ LARGE_SYSTEM_PACKAGES = [
 ]
 """List of system packages that benefit from nala's accelerated installation."""
 
+INSTALLED_MARKER_DIR = "/tmp/.flash-installed"
+"""Markers for Python package sets already installed in this container.
+
+Kept container-local: installed packages live in the container filesystem, so a
+marker on the network volume would outlive them.
+"""
+
+APT_UPDATE_MARKER = "/tmp/.last_apt_update"
+"""Timestamp file touched after each successful apt-get update."""
+
+APT_UPDATE_MAX_AGE = 300
+"""Seconds after a successful apt-get update during which further updates are skipped."""
+
 # Cache Sync Configuration
 CACHE_DIR = "/root/.cache"
 """Directory containing package and model caches."""
@@ -25,6 +70,18 @@ CACHE_DIR = "/root/.cache"
 VOLUME_CACHE_PATH = "/runpod-volume/.cache"
 """Network volume path for cache tarball storage."""
 
+CACHE_TARBALL_COMPRESS_PROGRAM = "zstd -T0 -3 --long=27"
+"""Compressor tar pipes the cache tarball through when zstd is available."""
+
+CACHE_TARBALL_DECOMPRESS_PROGRAM = "zstd -d --long=27"
+"""Decompressor matching CACHE_TARBALL_COMPRESS_PROGRAM's long-distance window."""
+
+CACHE_FINGERPRINT_MAX_BYTES = 16 * 1024 * 1024
+"""Files up to this size get a content digest in the cache manifest, so touched-but-unchanged files are not re-archived."""
+
+UV_CACHE_DIR = f"{CACHE_DIR}/uv"
+"""uv wheel cache, kept under CACHE_DIR so it is synced to and hydrated from the volume."""
+
 # Volume Unpacking Configuration
 DEFAULT_APP_DIR = "/app"
 """Default application directory for unpacking build artifacts."""
@@ -35,6 +92,9 @@ DEFAULT_ARTIFACT_PATH = "/root/.runpod/artifact.tar.gz"
 Can be overridden via FLASH_BUILD_ARTIFACT_PATH environment variable.
 """
 
+# Environment Variables for Serialization
+# FLASH_PIN_CORES: Set to "1", "true", or "yes" to pin result serializer threads to cores
+
 # Environment Variables for Volume Unpacking
 # FLASH_BUILD_ARTIFACT_PATH: Custom path to build artifact tarball
 # FLASH_DISABLE_UNPACK: Set to "1", "true", or "yes" to disable unpacking
@@ -50,3 +110,5 @@ DEFAULT_TARBALL_UNPACK_ATTEMPTS = 3
 """Number of times the mothership CPU will attempt to unpack the worker-flash tarball from mounted volume"""
 DEFAULT_TARBALL_UNPACK_INTERVAL = 30
 """Time in seconds mothership CPU endpoint will wait between tarball unpack attempts"""
+TARBALL_POLL_INTERVAL = 0.5
+"""Time in seconds between checks for a missing tarball while waiting to retry"""
@@ -1,14 +1,37 @@
 import os
+import json
+import time
+import hashlib
+import shlex
 import logging
 import asyncio
 import platform
-from typing import List
-
+import site
+import sys
+import threading
+import importlib
+import importlib.metadata
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
 from runpod_flash.protos.remote_execution import FunctionResponse
-from constants import LARGE_SYSTEM_PACKAGES, NAMESPACE
+from constants import (
+    APT_UPDATE_MARKER,
+    APT_UPDATE_MAX_AGE,
+    INSTALLED_MARKER_DIR,
+    LARGE_SYSTEM_PACKAGES,
+    NAMESPACE,
+    UV_CACHE_DIR,
+)
 from subprocess_utils import run_logged_subprocess
 
 
+_APT_UPDATE_FAILED = "apt-get update failed"
+# Top-level modules some distributions ship that are never worth importing ahead of use
+_PREIMPORT_SKIPPED_MODULES: FrozenSet[str] = frozenset({"conftest", "test", "tests"})
+
+
 class DependencyInstaller:
     """Handles installation of system and Python dependencies."""
 
@@ -16,6 +39,9 @@ class DependencyInstaller:
         self.logger = logging.getLogger(f"{NAMESPACE}.{__name__.split('.')[-1]}")
         self._nala_available = None  # Cache nala availability check
         self._is_docker = None  # Cache Docker environment detection
+        self._installed_packages: Optional[Dict[str, str]] = None  # Cache installed versions
+        self._installed_signature: Optional[Tuple[int, ...]] = None  # site-packages mtimes
+        self._installed_pins: FrozenSet[str] = frozenset()  # "name==version" of installed set
 
     def install_dependencies(
         self, packages: List[str], accelerate_downloads: bool = True
@@ -33,15 +59,36 @@ class DependencyInstaller:
         if not packages:
             return FunctionResponse(success=True, stdout="No packages to install")
 
+        marker = self._installed_marker_path(packages)
+        if os.path.exists(marker):
+            self.logger.debug("Python dependencies already installed in this container")
+            return FunctionResponse(success=True, stdout="All packages already satisfied")
+
+        packages = self._filter_unsatisfied_packages(packages)
+        if not packages:
+            self.logger.debug("All Python dependencies already satisfied")
+            self._write_installed_marker(marker)
+            return FunctionResponse(success=True, stdout="All packages already satisfied")
+
         self.logger.info(f"Installing Python dependencies: {packages}")
 
+        env = os.environ.copy()
         if self._is_docker_environment():
             if accelerate_downloads:
-                # Packages are installed to the system location where they can be imported
-                command = ["uv", "pip", "install", "--system"] + packages
+                # Packages are installed to the system location where they can be imported.
+                # Reuse wheels from the volume-synced cache and hardlink them into place.
+                command = [
+                    "uv",
+                    "pip",
+                    "install",
+                    "--system",
+                    "--cache-dir",
+                    UV_CACHE_DIR,
+                ] + packages
+                env.setdefault("UV_LINK_MODE", "hardlink")
             else:
-                # Use full path to system python
-                command = ["pip", "install"] + packages
+                # Skip pip's per-run PyPI self-version query
+                command = ["pip", "install", "--disable-pip-version-check"] + packages
         else:
             # Local: Always use uv with current python for consistency
             command = ["uv", "pip", "install", "--python", "python"] + packages
@@ -56,7 +103,7 @@ class DependencyInstaller:
                 logger=self.logger,
                 operation_name=operation_name,
                 timeout=300,
-                env=os.environ.copy(),
+                env=env,
             )
 
             # Check if installation failed due to missing compiler
@@ -91,9 +138,17 @@ class DependencyInstaller:
                     logger=self.logger,
                     operation_name=f"{operation_name} (retry with build tools)",
                     timeout=300,  # Fresh 300s timeout for retry (compilation may take longer)
-                    env=os.environ.copy(),
+                    env=env,
                 )
 
+            if result.success:
+                # Installed set changed; rebuild it on the next check and make the new
+                # packages visible to the import system
+                self._installed_packages = None
+                self._invalidate_site_packages_finders()
+                self._write_installed_marker(marker)
+                self._start_preimport(packages)
+
             return result
 
         except Exception as e:
@@ -148,6 +203,7 @@ class DependencyInstaller:
                     command=["which", "nala"],
                     logger=self.logger,
                     operation_name="Checking nala availability",
+                    discard_stdout=True,
                 )
                 self._nala_available = result.success
             except Exception:
@@ -156,6 +212,197 @@ class DependencyInstaller:
 
         return self._nala_available
 
+    def _get_installed_packages(self) -> Dict[str, str]:
+        """
+        Get installed Python distributions and cache the result.
+
+        The cache is rebuilt when a site-packages directory changes, so packages
+        installed or removed outside this installer (e.g. by user code) are seen.
+
+        Returns:
+            Dict mapping canonical distribution names to installed versions
+        """
+        signature = self._site_packages_signature()
+        if self._installed_packages is None or signature != self._installed_signature:
+            installed: Dict[str, str] = {}
+            for dist in importlib.metadata.distributions():
+                name = dist.metadata["Name"]
+                if name:
+                    installed[canonicalize_name(name)] = dist.version
+            self._installed_packages = installed
+            self._installed_signature = signature
+            self._installed_pins = frozenset(
+                f"{name}=={version}" for name, version in installed.items()
+            )
+            return installed
+
+        return self._installed_packages
+
+    def _site_packages_dirs(self) -> List[str]:
+        """Get the site-packages directories packages are installed into."""
+        directories = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+        if site.ENABLE_USER_SITE:
+            directories.append(site.getusersitepackages())
+        return directories
+
+    def _invalidate_site_packages_finders(self) -> None:
+        """
+        Make newly installed packages importable.
+
+        Only the path finders of the site-packages directories are reset, instead
+        of importlib.invalidate_caches() sweeping every finder on sys.meta_path and
+        every sys.path entry. Negative cache entries for site-packages directories
+        that did not exist yet are dropped so they are probed again.
+        """
+        for directory in self._site_packages_dirs():
+            finder = sys.path_importer_cache.get(directory)
+            if finder is None:
+                sys.path_importer_cache.pop(directory, None)
+            elif hasattr(finder, "invalidate_caches"):
+                finder.invalidate_caches()
+
+    def _start_preimport(self, packages: List[str]) -> None:
+        """
+        Import freshly installed packages on a background thread.
+
+        The import cost of heavy packages then overlaps with the cache sync that
+        follows installation instead of landing on the first user call. Disabled
+        with FLASH_DISABLE_PREIMPORT.
+
+        Args:
+            packages: Package specifications that were just installed
+        """
+        if os.getenv("FLASH_DISABLE_PREIMPORT", "").lower() in {"1", "true", "yes"}:
+            return
+        threading.Thread(
+            target=self._preimport, args=(packages,), name="flash-preimport", daemon=True
+        ).start()
+
+    def _preimport(self, packages: List[str]) -> None:
+        """
+        Import the top-level modules of the distributions the request named.
+
+        A distribution with a module of its own name only has that module
+        imported, which leaves out vendored extras; test suites and
+        underscore-prefixed modules are never imported.
+        """
+        names = set()
+        for package in packages:
+            try:
+                names.add(canonicalize_name(Requirement(package).name))
+            except InvalidRequirement:
+                continue
+
+        try:
+            module_dists = importlib.metadata.packages_distributions()
+        except Exception as e:
+            self.logger.debug(f"Could not map packages to modules: {e}")
+            return
+
+        modules_by_dist: Dict[str, List[str]] = {}
+        for module, dists in module_dists.items():
+            if module in _PREIMPORT_SKIPPED_MODULES or module.startswith("_"):
+                continue
+            for dist in dists:
+                name = canonicalize_name(dist)
+                if name in names:
+                    modules_by_dist.setdefault(name, []).append(module)
+
+        for dist_name, modules in modules_by_dist.items():
+            own = [module for module in modules if canonicalize_name(module) == dist_name]
+            for module in own or modules:
+                if module in sys.modules:
+                    continue
+                try:
+                    importlib.import_module(module)
+                    self.logger.debug(f"Preimported {module}")
+                except Exception as e:
+                    self.logger.debug(f"Could not preimport {module}: {e}")
+
+    def _site_packages_signature(self) -> Tuple[int, ...]:
+        """
+        Get the modification times of the site-packages directories.
+
+        Installing or removing a distribution adds or deletes its .dist-info
+        directory, which changes the mtime of the directory containing it.
+
+        Returns:
+            Tuple of mtimes in nanoseconds (-1 for directories that do not exist)
+        """
+        signature = []
+        for directory in self._site_packages_dirs():
+            try:
+                signature.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                signature.append(-1)
+        return tuple(signature)
+
+    def _installed_marker_path(self, packages: List[str]) -> str:
+        """
+        Get the marker path recording that this exact package set was installed.
+
+        Args:
+            packages: List of package names or package specifications
+
+        Returns:
+            Path of the marker file keyed by a hash of the sorted package list
+        """
+        key = hashlib.blake2b(json.dumps(sorted(packages)).encode(), digest_size=16).hexdigest()
+        return os.path.join(INSTALLED_MARKER_DIR, key)
+
+    def _write_installed_marker(self, marker: str) -> None:
+        """Record a successfully installed package set."""
+        try:
+            os.makedirs(INSTALLED_MARKER_DIR, exist_ok=True)
+            open(marker, "w").close()
+        except OSError as e:
+            self.logger.debug(f"Could not record installed packages: {e}")
+
+    def _filter_unsatisfied_packages(self, packages: List[str]) -> List[str]:
+        """
+        Drop package specifications that the current environment already satisfies.
+
+        Specifications that cannot be checked locally (URLs, extras, unparseable
+        strings) are always kept so the installer resolves them.
+
+        Args:
+            packages: List of package names or package specifications
+
+        Returns:
+            Package specifications that still need to be installed
+        """
+        try:
+            installed = self._get_installed_packages()
+        except Exception as e:
+            self.logger.debug(f"Could not inspect installed packages: {e}")
+            return packages
+
+        # Exact pins of installed versions are settled by one set lookup
+        if self._installed_pins.issuperset(packages):
+            return []
+
+        missing = []
+        for package in packages:
+            try:
+                requirement = Requirement(package)
+            except InvalidRequirement:
+                missing.append(package)
+                continue
+
+            if requirement.marker is not None and not requirement.marker.evaluate():
+                continue
+
+            version = installed.get(canonicalize_name(requirement.name))
+            if (
+                version is None
+                or requirement.url
+                or requirement.extras
+                or not requirement.specifier.contains(version, prereleases=True)
+            ):
+                missing.append(package)
+
+        return missing
+
     def _needs_compilation(self, result: FunctionResponse) -> bool:
         """
         Detect if a package installation failure was due to missing compilation tools.
@@ -246,22 +493,28 @@ class DependencyInstaller:
         """
         Install system packages using nala for accelerated downloads.
 
+        The package list update is skipped when one succeeded within
+        APT_UPDATE_MAX_AGE seconds.
+
         Args:
             packages: System packages to install
 
         Returns:
             FunctionResponse with installation result
         """
-        # Update package list first with nala
-        update_result = run_logged_subprocess(
-            command=["nala", "update"],
-            logger=self.logger,
-            operation_name="Updating package list with nala",
-        )
+        # Update package list first with nala, unless the lists are still fresh
+        if not self._apt_lists_fresh():
+            update_result = run_logged_subprocess(
+                command=["nala", "update"],
+                logger=self.logger,
+                operation_name="Updating package list with nala",
+                discard_stdout=True,
+            )
 
-        if not update_result.success:
-            self.logger.warning("nala update failed, falling back to standard installation")
-            return self._install_system_standard(packages)
+            if not update_result.success:
+                self.logger.warning("nala update failed, falling back to standard installation")
+                return self._install_system_standard(packages)
+            self._mark_apt_lists_fresh()
 
         # Install packages with nala
         install_result = run_logged_subprocess(
@@ -288,6 +541,9 @@ class DependencyInstaller:
         """
         Install system packages using standard apt-get method.
 
+        The package list update and the install run in a single shell process.
+        The update is skipped when one succeeded within APT_UPDATE_MAX_AGE seconds.
+
         Args:
             packages: System packages to install
 
@@ -295,23 +551,20 @@ class DependencyInstaller:
             FunctionResponse with installation result
         """
         try:
-            # Update package list first
-            update_result = run_logged_subprocess(
-                command=["apt-get", "update"],
-                logger=self.logger,
-                operation_name="Updating package list with apt-get",
+            update_needed = not self._apt_lists_fresh()
+            script = shlex.join(
+                ["apt-get", "install", "-y", "--no-install-recommends", "-o", "Dpkg::Use-Pty=0"]
+                + packages
             )
+            if update_needed:
+                # Update package list first, flagging failures so they can be reported apart
+                # Translation indexes are never used by a non-interactive install
+                update = "apt-get update -qq -o Acquire::Languages=none"
+                update = f"{update} || {{ echo '{_APT_UPDATE_FAILED}' >&2; exit 1; }}"
+                script = f"{update}; {script}"
 
-            if not update_result.success:
-                return FunctionResponse(
-                    success=False,
-                    error="Error updating package list",
-                    stdout=update_result.error,
-                )
-
-            # Install the packages
             install_result = run_logged_subprocess(
-                command=["apt-get", "install", "-y", "--no-install-recommends"] + packages,
+                command=["bash", "-c", script],
                 logger=self.logger,
                 operation_name="Installing system packages with apt-get",
                 env={
@@ -320,7 +573,17 @@ class DependencyInstaller:
                 },
             )
 
-            if not install_result.success:
+            update_failed = update_needed and _APT_UPDATE_FAILED in (install_result.error or "")
+            if update_needed and not update_failed:
+                self._mark_apt_lists_fresh()
+
+            if update_failed:
+                return FunctionResponse(
+                    success=False,
+                    error="Error updating package list",
+                    stdout=install_result.error,
+                )
+            elif not install_result.success:
                 return FunctionResponse(
                     success=False,
                     error="Error installing system packages",
@@ -335,6 +598,28 @@ class DependencyInstaller:
         except Exception as e:
             return FunctionResponse(success=False, error=str(e))
 
+    def _apt_lists_fresh(self) -> bool:
+        """
+        Check whether apt-get update succeeded recently enough to be skipped.
+
+        Returns:
+            True if the last successful update is younger than APT_UPDATE_MAX_AGE
+        """
+        try:
+            age = time.time() - os.path.getmtime(APT_UPDATE_MARKER)
+        except OSError:
+            return False
+        return age < APT_UPDATE_MAX_AGE
+
+    def _mark_apt_lists_fresh(self) -> None:
+        """Record a successful apt-get update."""
+        try:
+            with open(APT_UPDATE_MARKER, "a"):
+                pass
+            os.utime(APT_UPDATE_MARKER, None)
+        except OSError as e:
+            self.logger.debug(f"Could not record apt-get update time: {e}")
+
     async def install_system_dependencies_async(
         self, packages: List[str], accelerate_downloads: bool = True
     ) -> FunctionResponse:
@@ -1,17 +1,26 @@
-import io
-import logging
+import hashlib
 import traceback
 import inspect
+from collections import OrderedDict
 from contextlib import redirect_stdout, redirect_stderr
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from runpod_flash.protos.remote_execution import FunctionRequest, FunctionResponse
+from code_cache import CodeCache
+from constants import FUNCTION_NAMESPACE_TTL, MAX_MEMOIZED_RESULTS
+from output_capture import OutputSink, capture_logs
 from serialization_utils import SerializationUtils
 
 
 class FunctionExecutor:
     """Handles execution of individual functions with output capture."""
 
+    def __init__(self):
+        # Executed function namespaces keyed by content hash, reused across warm calls
+        self.function_namespaces = CodeCache()
+        # Serialized results of opted-in functions keyed by code and arguments, in LRU order
+        self._memoized_results: "OrderedDict[bytes, str]" = OrderedDict()
+
     async def execute(self, request: FunctionRequest) -> FunctionResponse:
         """
         Execute a function with full output capture.
@@ -21,23 +30,18 @@ class FunctionExecutor:
         Returns:
             FunctionResponse object with execution result
         """
-        stdout_io = io.StringIO()
-        stderr_io = io.StringIO()
-        log_io = io.StringIO()
+        self.cleanup_namespaces()
 
-        # Capture all stdout, stderr, and logs
-        with redirect_stdout(stdout_io), redirect_stderr(stderr_io):
-            # Setup logging capture
-            log_handler = logging.StreamHandler(log_io)
-            log_handler.setLevel(logging.DEBUG)
-            logger = logging.getLogger()
-            logger.addHandler(log_handler)
+        # stdout, stderr and logs share one sink so output is combined in write order
+        output = OutputSink()
 
+        # Capture all stdout, stderr, and logs
+        with redirect_stdout(output), redirect_stderr(output), capture_logs(output):
             try:
-                # Execute function code in namespace
+                # Execute function code in namespace (reused when the code is unchanged)
                 namespace: Dict[str, Any] = {}
                 if request.function_code:
-                    exec(request.function_code, namespace)
+                    namespace = self.function_namespaces.get_namespace(request.function_code)
 
                 if request.function_name not in namespace:
                     return FunctionResponse(
@@ -47,6 +51,15 @@ class FunctionExecutor:
 
                 func = namespace[request.function_name]
 
+                # Idempotent functions can opt in to returning a cached result
+                memo_key: Optional[bytes] = None
+                if getattr(func, "__flash_memoize__", False) is True:
+                    memo_key = self._memo_key(request)
+                    cached = self._memoized_results.get(memo_key)
+                    if cached is not None:
+                        self._memoized_results.move_to_end(memo_key)
+                        return FunctionResponse(success=True, result=cached)
+
                 # Deserialize arguments
                 args = SerializationUtils.deserialize_args(request.args)
                 kwargs = SerializationUtils.deserialize_kwargs(request.kwargs)
@@ -60,8 +73,7 @@ class FunctionExecutor:
                     result = func(*args, **kwargs)
 
             except Exception as e:
-                # Combine output streams
-                combined_output = stdout_io.getvalue() + stderr_io.getvalue() + log_io.getvalue()
+                combined_output = output.getvalue()
 
                 # Capture full traceback
                 traceback_str = traceback.format_exc()
@@ -73,19 +85,43 @@ class FunctionExecutor:
                     stdout=combined_output,
                 )
 
-            finally:
-                # Clean up logging handler
-                if "logger" in locals() and "log_handler" in locals():
-                    logger.removeHandler(log_handler)
-
         # Serialize result
-        serialized_result = SerializationUtils.serialize_result(result)
+        serialized_result = await SerializationUtils.serialize_result_async(result)
+
+        if memo_key is not None:
+            self._memoized_results[memo_key] = serialized_result
+            while len(self._memoized_results) > MAX_MEMOIZED_RESULTS:
+                self._memoized_results.popitem(last=False)
 
-        # Combine output streams
-        combined_output = stdout_io.getvalue() + stderr_io.getvalue() + log_io.getvalue()
+        combined_output = output.getvalue()
 
         return FunctionResponse(
             success=True,
             result=serialized_result,
             stdout=combined_output,
         )
+
+    @staticmethod
+    def _memo_key(request: FunctionRequest) -> bytes:
+        """Return a content hash of the function code, name and serialized arguments."""
+        digest = hashlib.blake2b(digest_size=16)
+        parts = [request.function_code or "", request.function_name, *request.args]
+        for key in sorted(request.kwargs):
+            parts += [key, request.kwargs[key]]
+        for part in parts:
+            data = part.encode() if isinstance(part, str) else bytes(part)
+            # Length-prefix each part so different splits never hash alike
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.digest()
+
+    def cleanup_namespaces(self, max_idle: float = FUNCTION_NAMESPACE_TTL) -> int:
+        """
+        Drop function namespaces that have not been used recently.
+
+        Args:
+            max_idle: Idle time in seconds after which a namespace is dropped
+        Returns:
+            Number of namespaces dropped
+        """
+        return self.function_namespaces.evict_idle(max_idle)
@@ -1,7 +1,7 @@
 from typing import Dict, Any
 
 from runpod_flash.protos.remote_execution import FunctionRequest, FunctionResponse
-from remote_executor import RemoteExecutor
+from remote_executor import get_executor
 from logger import setup_logging
 from unpack_volume import maybe_unpack
 
@@ -12,6 +12,23 @@ setup_logging()
 # This is a no-op for Live Serverless and local development
 maybe_unpack()
 
+_RESPONSE_FIELDS = tuple(FunctionResponse.model_fields)
+
+
+def response_to_dict(output: FunctionResponse) -> Dict[str, Any]:
+    """
+    Build the handler's return payload from a FunctionResponse.
+
+    Reads the fields directly instead of going through model_dump(), which
+    re-serializes every field through pydantic. Neither copies the result
+    string; this only saves about a microsecond per response. instance_info is
+    copied so the payload never aliases the response, as with model_dump().
+    """
+    payload = {name: getattr(output, name) for name in _RESPONSE_FIELDS}
+    if output.instance_info is not None:
+        payload["instance_info"] = dict(output.instance_info)
+    return payload
+
 
 async def handler(event: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -20,7 +37,7 @@ async def handler(event: Dict[str, Any]) -> Dict[str, Any]:
     output: FunctionResponse
 
     try:
-        executor = RemoteExecutor()
+        executor = get_executor()
         input_data = FunctionRequest(**event.get("input", {}))
         output = await executor.ExecuteFunction(input_data)
 
@@ -30,7 +47,7 @@ async def handler(event: Dict[str, Any]) -> Dict[str, Any]:
             error=f"Error in handler: {str(error)}",
         )
 
-    return output.model_dump()  # type: ignore[no-any-return]
+    return response_to_dict(output)
 
 
 # Start the RunPod serverless handler (only available on RunPod platform)
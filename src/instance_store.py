@@ -0,0 +1,139 @@
+import logging
+import mmap
+import os
+import re
+from typing import Any, List, Optional, Tuple
+
+from constants import INSTANCE_STATE_PATH, NAMESPACE
+from serialization_utils import SerializationUtils
+
+_SAFE_INSTANCE_ID = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$")
+
+
+class InstanceStore:
+    """
+    Persists evicted class instances to the network volume.
+
+    Each instance is written as a protocol 5 pickle stream ({id}.{code_key}.pkl) plus
+    one file per out-of-band buffer ({id}.{code_key}.buf{i}). The code key is the
+    hash of the class code the instance was built from, so a request with changed
+    code never restores state pickled against the old class. Restoring maps the
+    buffer files copy-on-write, so large arrays are paged in on demand instead of
+    being deserialized, and stay writable without touching the files.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.logger = logging.getLogger(f"{NAMESPACE}.{__name__.split('.')[-1]}")
+        if base_dir is None:
+            # Endpoints can share a volume, so each one keeps its instances apart
+            endpoint_id = os.environ.get("RUNPOD_ENDPOINT_ID", "")
+            if _SAFE_INSTANCE_ID.match(endpoint_id):
+                base_dir = f"{INSTANCE_STATE_PATH}/{endpoint_id}"
+            volume_dir = os.path.dirname(INSTANCE_STATE_PATH)
+        else:
+            volume_dir = os.path.dirname(base_dir.rstrip("/"))
+        self.base_dir = base_dir or ""
+        # Only persist for a known endpoint whose volume is mounted
+        self.enabled = bool(base_dir) and os.path.isdir(volume_dir)
+
+    def _path(self, instance_id: str, code_key: str, suffix: str) -> Optional[str]:
+        """Return the file path for an instance, or None if the ID or key is not path-safe."""
+        if not _SAFE_INSTANCE_ID.match(instance_id) or not code_key.isalnum():
+            return None
+        return os.path.join(self.base_dir, f"{instance_id}.{code_key}{suffix}")
+
+    def save(self, instance_id: str, code_key: str, class_name: str, obj: Any) -> bool:
+        """
+        Persist an instance so it can be restored after eviction or restart.
+
+        Instances whose class sets __flash_persist__ = False are never written.
+
+        Args:
+            instance_id: ID the instance is registered under
+            code_key: Hash of the class code the instance was created from
+            class_name: Name of the instance's class
+            obj: The instance
+
+        Returns:
+            True if the instance was written, False if persistence is unavailable,
+            the class opted out, or the instance could not be pickled
+        """
+        stream_path = self._path(instance_id, code_key, ".pkl")
+        if not self.enabled or stream_path is None:
+            return False
+        if getattr(obj, "__flash_persist__", True) is False:
+            return False
+
+        try:
+            data, buffers = SerializationUtils.dumps_with_buffers((class_name, obj))
+            os.makedirs(self.base_dir, exist_ok=True)
+            self.discard(instance_id, code_key)
+            for i, buffer in enumerate(buffers):
+                with open(f"{stream_path[:-4]}.buf{i}", "wb") as f:
+                    f.write(buffer.raw())
+            # Write the stream last so a partial save is never mistaken for a complete one
+            tmp_path = f"{stream_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, stream_path)
+        except Exception as e:
+            self.logger.debug(f"Could not persist instance {instance_id}: {e}")
+            self.discard(instance_id, code_key)
+            return False
+
+        self.logger.debug(f"Persisted instance {instance_id} ({len(buffers)} buffers)")
+        return True
+
+    def exists(self, instance_id: str, code_key: str) -> bool:
+        """Check whether an instance was persisted from the given class code."""
+        stream_path = self._path(instance_id, code_key, ".pkl")
+        return self.enabled and stream_path is not None and os.path.exists(stream_path)
+
+    def load(self, instance_id: str, code_key: str) -> Tuple[str, Any]:
+        """
+        Restore a persisted instance.
+
+        Args:
+            instance_id: ID the instance was saved under
+            code_key: Hash of the class code the instance was saved with
+
+        Returns:
+            Tuple of (class name, instance)
+        """
+        stream_path = self._path(instance_id, code_key, ".pkl")
+        if stream_path is None:
+            raise ValueError(f"Invalid instance ID: {instance_id}")
+
+        with open(stream_path, "rb") as f:
+            data = f.read()
+
+        buffers: List[Any] = []
+        buffer_prefix = f"{stream_path[:-4]}.buf"
+        while os.path.exists(f"{buffer_prefix}{len(buffers)}"):
+            with open(f"{buffer_prefix}{len(buffers)}", "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    buffers.append(bytearray())
+                else:
+                    buffers.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+
+        class_name, obj = SerializationUtils.loads_with_buffers(data, buffers)
+        return class_name, obj
+
+    def discard(self, instance_id: str, code_key: str) -> None:
+        """Remove the persisted files of an instance, if any."""
+        stream_path = self._path(instance_id, code_key, ".pkl")
+        if stream_path is None:
+            return
+
+        try:
+            os.remove(stream_path)
+        except OSError:
+            pass
+
+        index = 0
+        while True:
+            try:
+                os.remove(f"{stream_path[:-4]}.buf{index}")
+            except OSError:
+                break
+            index += 1
@@ -24,12 +24,12 @@ import logging
 import os
 from typing import Any, Dict
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 from logger import setup_logging
 from unpack_volume import maybe_unpack
 from runpod_flash.protos.remote_execution import FunctionRequest, FunctionResponse
-from remote_executor import RemoteExecutor
+from remote_executor import get_executor
 
 # Initialize logging configuration
 setup_logging()
@@ -111,7 +111,7 @@ if not is_mothership:
         return {"status": "healthy"}
 
     @app.post("/execute")
-    async def execute(request: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(request: Dict[str, Any]) -> Response:
         """Execute a remote function via HTTP POST request.
 
         Expects FunctionRequest JSON payload.
@@ -120,7 +120,7 @@ if not is_mothership:
         output: FunctionResponse
 
         try:
-            executor = RemoteExecutor()
+            executor = get_executor()
             # Handle both direct FunctionRequest and RunPod wrapped format
             request_data = request.get("input", request)
             input_data = FunctionRequest(**request_data)
@@ -132,7 +132,9 @@ if not is_mothership:
                 error=f"Error in handler: {str(error)}",
             )
 
-        return output.model_dump()  # type: ignore[no-any-return]
+        # Serialize once with pydantic's JSON encoder instead of model_dump() followed by
+        # FastAPI's generic jsonable_encoder walk
+        return Response(content=output.model_dump_json(), media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+import io
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+
+class OutputSink(io.TextIOBase):
+    """
+    Text stream that accumulates everything written to it as a list of strings.
+
+    One sink is shared by the stdout redirect, the stderr redirect and the log
+    handler of a call, so the combined output is assembled in write order and
+    joined once instead of concatenating several StringIO buffers. Writes only
+    append a reference, with no encoding or position bookkeeping per print.
+    """
+
+    encoding = "utf-8"
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._parts.append(s)
+        return len(s)
+
+    def getvalue(self) -> str:
+        """Return everything written so far."""
+        if len(self._parts) > 1:
+            self._parts[:] = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+
+_log_target: ContextVar[Optional[OutputSink]] = ContextVar("flash_log_target", default=None)
+_log_handler: Optional[logging.Handler] = None
+# Sinks of every capture in progress, for records from threads that do not inherit the context
+_active_sinks: List[OutputSink] = []
+# Name prefix of threads the worker itself starts (store writer, preimport, serializer)
+_WORKER_THREAD_PREFIX = "flash-"
+
+
+class _LogProxyStream(io.TextIOBase):
+    """
+    Stream that forwards writes to the sink registered for the current context.
+
+    Threads started by user code do not inherit the context, so their records go
+    to every capture in progress, as a per-request root handler would deliver them.
+    Records from the worker's own flash-* threads are filtered out before this.
+    """
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        sink = _log_target.get()
+        if sink is not None:
+            sink.write(s)
+        else:
+            for active in tuple(_active_sinks):
+                active.write(s)
+        return len(s)
+
+
+def _is_capturing(record: logging.LogRecord) -> bool:
+    """Check whether a capture in progress should receive the record."""
+    if _log_target.get() is not None:
+        return True
+    # The worker's own background threads log to the worker logger, never into a request
+    return bool(_active_sinks) and not (record.threadName or "").startswith(_WORKER_THREAD_PREFIX)
+
+
+def _get_log_handler() -> logging.Handler:
+    """Return the shared capture handler, mounting it on the root logger if needed."""
+    global _log_handler
+
+    if _log_handler is None:
+        _log_handler = logging.StreamHandler(_LogProxyStream())
+        _log_handler.setLevel(logging.DEBUG)
+        # Reject records before formatting when no capture is active in this context
+        _log_handler.addFilter(_is_capturing)
+
+    root_logger = logging.getLogger()
+    if _log_handler not in root_logger.handlers:
+        root_logger.addHandler(_log_handler)
+    return _log_handler
+
+
+@contextmanager
+def capture_logs(sink: OutputSink) -> Iterator[None]:
+    """
+    Route log records emitted in this context into sink for the duration of the block.
+
+    A single handler stays mounted on the root logger; entering the block only swaps
+    the context-local target instead of adding and removing a handler per request.
+    The target is a ContextVar, so concurrent asyncio tasks each capture only their
+    own records, and records emitted outside any capture are never formatted.
+    """
+    _get_log_handler()
+    token = _log_target.set(sink)
+    _active_sinks.append(sink)
+    try:
+        yield
+    finally:
+        _active_sinks.remove(sink)
+        _log_target.reset(token)
@@ -5,7 +5,6 @@ import json
 import os
 from pathlib import Path
 from typing import List, Any, Optional
-import aiohttp
 from runpod_flash.protos.remote_execution import (
     FunctionRequest,
     FunctionResponse,
@@ -15,6 +14,7 @@ from dependency_installer import DependencyInstaller
 from function_executor import FunctionExecutor
 from class_executor import ClassExecutor
 from log_streamer import start_log_streaming, stop_log_streaming, get_streamed_logs
+from logger import get_log_level
 from cache_sync_manager import CacheSyncManager
 from serialization_utils import SerializationUtils
 from manifest_reconciliation import refresh_manifest_if_stale
@@ -67,8 +67,6 @@ class RemoteExecutor(RemoteExecutorStub):
         """
         # Start log streaming to capture all system logs
         # Use the requested log level, not the root logger level
-        from logger import get_log_level
-
         requested_level = get_log_level()
         start_log_streaming(level=requested_level)
 
@@ -86,36 +84,24 @@ class RemoteExecutor(RemoteExecutorStub):
                 await self.cache_sync.hydrate_from_volume()
 
             # Mark cache baseline before installation
-            self.cache_sync.mark_baseline()
+            baseline_time = self.cache_sync.mark_baseline()
 
             # Install dependencies
             if request.accelerate_downloads:
                 # Run installations in parallel when acceleration is enabled
                 dep_result = await self._install_dependencies_parallel(request)
-                if not dep_result.success:
-                    # Add any buffered logs to the failed response
-                    logs = get_streamed_logs(clear_buffer=True)
-                    if logs:
-                        if dep_result.stdout:
-                            dep_result.stdout += "\n" + logs
-                        else:
-                            dep_result.stdout = logs
-                    return dep_result
             else:
                 # Sequential installation when acceleration is disabled
                 dep_result = await self._install_dependencies_sequential(request)
-                if not dep_result.success:
-                    # Add any buffered logs to the failed response
-                    logs = get_streamed_logs(clear_buffer=True)
-                    if logs:
-                        if dep_result.stdout:
-                            dep_result.stdout += "\n" + logs
-                        else:
-                            dep_result.stdout = logs
-                    return dep_result
+            if not dep_result.success:
+                # Add any buffered logs to the failed response
+                logs = get_streamed_logs(clear_buffer=True)
+                if logs:
+                    dep_result.stdout = "\n".join(filter(None, (dep_result.stdout, logs)))
+                return dep_result
 
             # cache sync after installation
-            await self.cache_sync.sync_to_volume()
+            await self.cache_sync.sync_to_volume(baseline_time)
 
             # Detect execution mode: Flash deployed vs Live Serverless
             has_function_code = bool(getattr(request, "function_code", None))
@@ -251,6 +237,9 @@ class RemoteExecutor(RemoteExecutorStub):
         """
         Install dependencies and cache models sequentially when acceleration is disabled.
 
+        Installs still run one after the other, but in a worker thread so the event
+        loop keeps serving other requests meanwhile.
+
         Args:
             request: FunctionRequest with dependencies to install
 
@@ -259,7 +248,7 @@ class RemoteExecutor(RemoteExecutorStub):
         """
         # Install system dependencies first
         if request.system_dependencies:
-            sys_installed = self.dependency_installer.install_system_dependencies(
+            sys_installed = await self.dependency_installer.install_system_dependencies_async(
                 request.system_dependencies, request.accelerate_downloads
             )
             if not sys_installed.success:
@@ -268,7 +257,7 @@ class RemoteExecutor(RemoteExecutorStub):
 
         # Install Python dependencies next
         if request.dependencies:
-            py_installed = self.dependency_installer.install_dependencies(
+            py_installed = await self.dependency_installer.install_dependencies_async(
                 request.dependencies, request.accelerate_downloads
             )
             if not py_installed.success:
@@ -321,19 +310,18 @@ class RemoteExecutor(RemoteExecutorStub):
         if failures:
             # Some tasks failed
             error_summary = f"Failed tasks: {'; '.join(failures)}"
+            summary = f"Parallel installation: {success_count}/{len(results)} tasks succeeded"
             return FunctionResponse(
                 success=False,
                 error=error_summary,
-                stdout=f"Parallel installation: {success_count}/{len(results)} tasks succeeded\n"
-                + "\n".join(stdout_parts),
+                stdout="\n".join([summary, *stdout_parts]),
             )
 
         # All tasks succeeded
-        return FunctionResponse(
-            success=True,
-            stdout=f"Parallel installation: {success_count}/{len(results)} tasks completed successfully\n"
-            + "\n".join(stdout_parts),
+        summary = (
+            f"Parallel installation: {success_count}/{len(results)} tasks completed successfully"
         )
+        return FunctionResponse(success=True, stdout="\n".join([summary, *stdout_parts]))
 
     async def _execute_flash_function(self, request: FunctionRequest) -> FunctionResponse:
         """Execute pre-deployed Flash function from /app directory.
@@ -397,7 +385,7 @@ class RemoteExecutor(RemoteExecutorStub):
 
             return FunctionResponse(
                 success=True,
-                result=SerializationUtils.serialize_result(result),
+                result=await SerializationUtils.serialize_result_async(result),
             )
 
         except Exception as e:
@@ -441,6 +429,9 @@ class RemoteExecutor(RemoteExecutorStub):
         Returns:
             FunctionResponse with result from target endpoint
         """
+        # Imported here: cross-endpoint routing is the only user of the HTTP client
+        import aiohttp
+
         try:
             # Prepare payload for RunPod API
             payload = {"input": request.model_dump(exclude_none=True)}
@@ -493,3 +484,16 @@ class RemoteExecutor(RemoteExecutorStub):
                 success=False,
                 error=f"Failed to route to endpoint: {str(e)}",
             )
+
+
+# Executor shared by every request this worker serves (either handler), created on first use
+_executor: Optional[RemoteExecutor] = None
+
+
+def get_executor() -> RemoteExecutor:
+    """Return the worker's RemoteExecutor, creating it on first use."""
+    global _executor
+
+    if _executor is None:
+        _executor = RemoteExecutor()
+    return _executor
@@ -1,6 +1,119 @@
-import base64
+import asyncio
+import binascii
+import io
+import itertools
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 import cloudpickle
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Mapping, Sequence, Tuple, Union
+
+PICKLE_PROTOCOL = 5
+"""Pickle protocol used for all payloads (protocol 5 supports out-of-band buffers)."""
+
+_pin_core_index = itertools.count()
+
+
+def _pin_serializer_thread() -> None:
+    """
+    Pin the calling serializer thread to its own core when FLASH_PIN_CORES is set.
+
+    Only the pool threads are pinned: the main thread's affinity is inherited by
+    user threads and install subprocesses, which must keep every core.
+    """
+    if os.getenv("FLASH_PIN_CORES", "").lower() not in {"1", "true", "yes"}:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[next(_pin_core_index) % len(cores)]})
+    except OSError:
+        pass
+
+
+_serialize_pool = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="flash-serialize", initializer=_pin_serializer_thread
+)
+"""Worker threads for result serialization, keeping large pickles off the event loop."""
+
+Payload = Union[str, bytes, bytearray, memoryview]
+"""A serialized value: base64 text from the JSON transport, or raw pickle bytes."""
+
+_PLAIN_SCALARS = frozenset({type(None), bool, int, float, complex, str, bytes, bytearray})
+_PLAIN_CONTAINERS = frozenset({list, tuple, set, frozenset, dict})
+
+
+PLAIN_DATA_SCAN_LIMIT = 1024
+"""Most items _is_plain_data inspects before sending a result to cloudpickle instead."""
+
+
+def _is_plain_data(obj: Any) -> bool:
+    """
+    Check whether obj is built only from builtin scalars and containers.
+
+    Gives up (returns False) once more than PLAIN_DATA_SCAN_LIMIT items would need
+    checking, so large containers go straight to cloudpickle rather than paying a
+    Python-level walk that costs about as much as the pickling it would save.
+    """
+    stack = [obj]
+    seen = set()
+    budget = PLAIN_DATA_SCAN_LIMIT
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        if item_type in _PLAIN_SCALARS:
+            continue
+        if item_type not in _PLAIN_CONTAINERS:
+            return False
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        # Check the size before copying a large container's items onto the stack
+        budget -= 2 * len(item) if item_type is dict else len(item)
+        if budget < 0:
+            return False
+        if item_type is dict:
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        else:
+            stack.extend(item)
+    return True
+
+
+def _dump(obj: Any, file: io.BytesIO) -> None:
+    """Pickle into file with the C pickler for plain data, falling back to cloudpickle."""
+    pickler = pickle.Pickler if _is_plain_data(obj) else cloudpickle.CloudPickler
+    pickler(file, protocol=PICKLE_PROTOCOL).dump(obj)
+
+
+def _decode_payload(payload: Payload) -> Any:
+    """Return raw pickle bytes, skipping base64 when the payload is already binary."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return payload
+    # a2b_base64 takes ASCII text directly; b64decode only wraps it
+    return binascii.a2b_base64(payload)
+
+
+def _loads_payload(payload: Payload) -> Any:
+    """
+    Decode and unpickle a single payload.
+
+    cloudpickle only customizes pickling; its streams reference plain importable
+    callables, so the C unpickler loads them directly (cloudpickle.loads is the
+    same function).
+    """
+    return pickle.loads(_decode_payload(payload))
+
+
+def _loads_payloads(payloads: Sequence[Payload]) -> List[Any]:
+    """
+    Decode and unpickle payloads on the calling thread.
+
+    Base64 decoding and unpickling both hold the GIL, so handing payloads to a
+    thread pool would add submit/wait overhead without decoding any in parallel.
+    """
+    return [_loads_payload(payload) for payload in payloads]
 
 
 class SerializationUtils:
@@ -8,15 +121,48 @@ class SerializationUtils:
 
     @staticmethod
     def serialize_result(result: Any) -> str:
-        """Serialize a result using cloudpickle and base64 encoding."""
-        return base64.b64encode(cloudpickle.dumps(result)).decode("utf-8")
+        """Serialize a result using pickle (cloudpickle for non-plain data) and base64."""
+        # Encode straight from the pickle buffer instead of copying it out first
+        buf = io.BytesIO()
+        _dump(result, buf)
+        return binascii.b2a_base64(buf.getbuffer(), newline=False).decode("ascii")
 
     @staticmethod
-    def deserialize_args(args: List[str]) -> List[Any]:
-        """Deserialize function arguments from base64-encoded cloudpickle."""
-        return [cloudpickle.loads(base64.b64decode(arg)) for arg in args]
+    async def serialize_result_async(result: Any) -> str:
+        """Serialize a result in a worker thread so the event loop stays responsive."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _serialize_pool, SerializationUtils.serialize_result, result
+        )
+
+    @staticmethod
+    def deserialize_args(args: Sequence[Payload]) -> List[Any]:
+        """Deserialize function arguments from base64-encoded or raw cloudpickle."""
+        return _loads_payloads(args)
+
+    @staticmethod
+    def deserialize_kwargs(kwargs: Mapping[str, Payload]) -> Dict[str, Any]:
+        """Deserialize function keyword arguments from base64-encoded or raw cloudpickle."""
+        if not kwargs:
+            return {}
+        return dict(zip(kwargs.keys(), _loads_payloads(list(kwargs.values()))))
+
+    @staticmethod
+    def dumps_with_buffers(obj: Any) -> Tuple[bytes, List[pickle.PickleBuffer]]:
+        """
+        Pickle an object with protocol 5, keeping large buffers out-of-band.
+
+        Contiguous buffers (bytearray, NumPy arrays, tensors) are handed back as
+        PickleBuffer views instead of being copied into the pickle stream.
+
+        Returns:
+            Tuple of (pickle stream, out-of-band buffers in stream order)
+        """
+        buffers: List[pickle.PickleBuffer] = []
+        data = cloudpickle.dumps(obj, protocol=PICKLE_PROTOCOL, buffer_callback=buffers.append)
+        return data, buffers
 
     @staticmethod
-    def deserialize_kwargs(kwargs: Dict[str, str]) -> Dict[str, Any]:
-        """Deserialize function keyword arguments from base64-encoded cloudpickle."""
-        return {k: cloudpickle.loads(base64.b64decode(v)) for k, v in kwargs.items()}
+    def loads_with_buffers(data: bytes, buffers: Sequence[Any]) -> Any:
+        """Unpickle a stream produced by dumps_with_buffers with its out-of-band buffers."""
+        return pickle.loads(data, buffers=buffers)
@@ -23,6 +23,7 @@ def run_logged_subprocess(
     text: bool = True,
     env: Optional[dict[str, str]] = None,
     suppress_output: bool = False,
+    discard_stdout: bool = False,
     **popen_kwargs,
 ) -> FunctionResponse:
     """
@@ -41,7 +42,9 @@ def run_logged_subprocess(
         text: Whether to return strings instead of bytes
         env: Environment variables to pass to subprocess
         suppress_output: If True, only log command execution, not output
-        **popen_kwargs: Additional arguments passed to subprocess.Popen
+        discard_stdout: If True, send stdout to /dev/null instead of buffering it;
+            only stderr is captured (for commands whose output is never read)
+        **popen_kwargs: Additional arguments passed to subprocess.run
 
     Returns:
         FunctionResponse with success status, stdout, and error details
@@ -58,6 +61,8 @@ def run_logged_subprocess(
 
     try:
         # Set default capture settings
+        if discard_stdout:
+            popen_kwargs["stdout"] = subprocess.DEVNULL
         if capture_output:
             popen_kwargs.setdefault("stdout", subprocess.PIPE)
             popen_kwargs.setdefault("stderr", subprocess.PIPE)
@@ -66,18 +71,16 @@ def run_logged_subprocess(
         if env:
             popen_kwargs["env"] = env
 
-        # Execute subprocess
-        process = subprocess.Popen(command, **popen_kwargs)
-
+        # Execute subprocess; run() kills and reaps the child on timeout
         try:
-            stdout, stderr = process.communicate(timeout=timeout)
+            process = subprocess.run(command, timeout=timeout, **popen_kwargs)
         except subprocess.TimeoutExpired:
-            process.kill()
             error_msg = f"Command timed out after {timeout} seconds"
             logger.debug(f"{log_prefix}Error: {error_msg}")
             return FunctionResponse(success=False, error=error_msg)
 
         # Log subprocess output (unless suppressed)
+        stdout, stderr = process.stdout, process.stderr
         if not suppress_output:
             if stdout:
                 logger.debug(f"{log_prefix}Output: {stdout.strip()}")
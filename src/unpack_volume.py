@@ -6,13 +6,14 @@ import sys
 import tarfile
 import threading
 from pathlib import Path
-from time import sleep
+from time import monotonic, sleep
 
 from constants import (
     DEFAULT_APP_DIR,
     DEFAULT_ARTIFACT_PATH,
     DEFAULT_TARBALL_UNPACK_ATTEMPTS,
     DEFAULT_TARBALL_UNPACK_INTERVAL,
+    TARBALL_POLL_INTERVAL,
 )
 from manifest_reconciliation import is_flash_deployment
 
@@ -34,6 +35,34 @@ def _canonical_project_artifact_path() -> Path:
     return Path(os.getenv("FLASH_BUILD_ARTIFACT_PATH", DEFAULT_ARTIFACT_PATH))
 
 
+_UNPACKED_SENTINEL = ".flash-unpacked"
+
+
+def _artifact_signature(artifact: Path) -> str:
+    """Identify an artifact version by its path, size and modification time."""
+    stat = artifact.stat()
+    return f"{artifact}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _already_unpacked(app_dir: Path, signature: str) -> bool:
+    """Check whether this artifact version was fully extracted into app_dir before."""
+    try:
+        return (app_dir / _UNPACKED_SENTINEL).read_text() == signature
+    except OSError:
+        return False
+
+
+def _mark_unpacked(app_dir: Path, signature: str) -> None:
+    """Record a completed extraction, written atomically so a partial one never counts."""
+    sentinel = app_dir / _UNPACKED_SENTINEL
+    tmp = sentinel.with_name(f"{_UNPACKED_SENTINEL}.tmp")
+    try:
+        tmp.write_text(signature)
+        os.replace(tmp, sentinel)
+    except OSError as e:
+        logger.debug("could not record unpacked artifact: %s", e)
+
+
 def unpack_app_from_volume(
     *,
     app_dir: str | Path = DEFAULT_APP_DIR,
@@ -64,16 +93,47 @@ def unpack_app_from_volume(
     if not artifact.exists() or not artifact.is_file():
         raise FileNotFoundError(f"flash build artifact not found at {artifact}")
 
+    # A restarted worker in the same container finds the artifact already extracted
+    signature = _artifact_signature(artifact)
+    if _already_unpacked(app_dir_path, signature):
+        logger.info("build artifact already extracted to %s", app_dir_path)
+        return True
+
     try:
         with tarfile.open(artifact, mode="r:*") as tf:
             _safe_extract_tar(tf, app_dir_path)
     except (OSError, tarfile.TarError, ValueError) as e:
         raise RuntimeError(f"failed to extract flash artifact: {e}") from e
 
+    _mark_unpacked(app_dir_path, signature)
+
     logger.info("successfully extracted build artifact to %s", app_dir_path)
     return True
 
 
+def _wait_for_artifact(timeout: float) -> bool:
+    """Wait until the build artifact appears on the volume.
+
+    Polls at TARBALL_POLL_INTERVAL so a late-mounted or still-uploading
+    artifact is picked up as soon as it lands, instead of after a full
+    retry interval.
+
+    Args:
+        timeout: Maximum time in seconds to wait
+
+    Returns:
+        True if the artifact exists, False if the timeout elapsed first
+    """
+    artifact = _canonical_project_artifact_path()
+    deadline = monotonic() + timeout
+    while not artifact.is_file():
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            return False
+        sleep(min(TARBALL_POLL_INTERVAL, remaining))
+    return True
+
+
 _UNPACKED = False
 _UNPACK_LOCK = threading.Lock()
 
@@ -139,12 +199,17 @@ def maybe_unpack():
                 last_error = e
                 logger.error(
                     "failed to unpack app from volume (attempt %s/%s): %s",
-                    attempt,
+                    attempt + 1,
                     DEFAULT_TARBALL_UNPACK_ATTEMPTS,
                     e,
                     exc_info=True,
                 )
-                if attempt < DEFAULT_TARBALL_UNPACK_ATTEMPTS:
+                if attempt + 1 == DEFAULT_TARBALL_UNPACK_ATTEMPTS:
+                    break
+                if isinstance(e, FileNotFoundError):
+                    # Retry as soon as the artifact shows up
+                    _wait_for_artifact(DEFAULT_TARBALL_UNPACK_INTERVAL)
+                else:
                     sleep(DEFAULT_TARBALL_UNPACK_INTERVAL)
         raise RuntimeError(
             f"failed to unpack app from volume after retries: {last_error}"
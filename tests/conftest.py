@@ -3,7 +3,27 @@ import base64
 import cloudpickle
 from unittest.mock import MagicMock
 from runpod_flash.protos.remote_execution import FunctionRequest
-from handler import RemoteExecutor
+from remote_executor import RemoteExecutor
+
+
+@pytest.fixture(autouse=True)
+def reset_handler_executor(monkeypatch):
+    """Give each test a fresh handler executor so patched RemoteExecutor classes apply."""
+    monkeypatch.setattr("remote_executor._executor", None)
+
+
+@pytest.fixture(autouse=True)
+def ignore_host_memory_pressure(monkeypatch):
+    """Keep class instance eviction independent of the test host's memory usage."""
+    monkeypatch.setattr("class_executor._container_memory_percent", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def isolate_install_markers(tmp_path, monkeypatch):
+    """Keep install markers out of /tmp and skip background preimports of mocked installs."""
+    monkeypatch.setattr("dependency_installer.APT_UPDATE_MARKER", str(tmp_path / "apt-update"))
+    monkeypatch.setattr("dependency_installer.INSTALLED_MARKER_DIR", str(tmp_path / "installed"))
+    monkeypatch.setenv("FLASH_DISABLE_PREIMPORT", "1")
 
 
 @pytest.fixture
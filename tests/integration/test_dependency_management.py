@@ -37,22 +37,19 @@ class TestDependencyManagement:
         executor = RemoteExecutor()
 
         with patch("dependency_installer.run_logged_subprocess") as mock_subprocess:
-            # Mock successful apt-get update and install
-            mock_subprocess.side_effect = [
-                FunctionResponse(success=True, stdout="update success"),
-                FunctionResponse(
-                    success=True,
-                    stdout="Reading package lists...\nInstalling nano...\nDone.",
-                ),
-            ]
+            # Mock successful combined apt-get update and install
+            mock_subprocess.return_value = FunctionResponse(
+                success=True,
+                stdout="Reading package lists...\nInstalling nano...\nDone.",
+            )
 
             result = executor.dependency_installer.install_system_dependencies(["nano", "vim"])
 
             assert result.success is True
             assert "nano" in result.stdout or "vim" in result.stdout
 
-            # Verify both commands were called
-            assert mock_subprocess.call_count == 2
+            # Verify update and install ran in a single process
+            assert mock_subprocess.call_count == 1
 
     @pytest.mark.integration
     @pytest.mark.asyncio
@@ -142,7 +139,7 @@ def test_with_deps():
             # Mock failed update
             mock_subprocess.return_value = FunctionResponse(
                 success=False,
-                error="E: Could not get lock /var/lib/apt/lists/lock",
+                error="E: Could not get lock /var/lib/apt/lists/lock\napt-get update failed",
                 stdout="E: Could not get lock /var/lib/apt/lists/lock",
             )
 
@@ -224,19 +221,20 @@ def test_with_deps():
             mock_subprocess.assert_called()
 
         with patch("dependency_installer.run_logged_subprocess") as mock_subprocess:
-            # Mock successful update and install processes
-            mock_subprocess.side_effect = [
-                FunctionResponse(success=True, stdout=""),
-                FunctionResponse(success=True, stdout="success"),
-            ]
+            # Mock successful combined update and install process
+            mock_subprocess.return_value = FunctionResponse(success=True, stdout="success")
 
             # Test system dependency command
             executor.dependency_installer.install_system_dependencies(
                 ["pkg1", "pkg2"], accelerate_downloads=False
             )
 
-            # Verify subprocess utility was called for both operations
-            assert mock_subprocess.call_count == 2
+            # Verify update and install ran as one shell command
+            assert mock_subprocess.call_count == 1
+            command = mock_subprocess.call_args.kwargs["command"]
+            assert command[:2] == ["bash", "-c"]
+            assert "apt-get update" in command[2]
+            assert command[2].endswith("pkg1 pkg2")
 
     @pytest.mark.integration
     @patch("platform.system")
@@ -274,7 +272,6 @@ def test_with_deps():
             # Mock nala not available, then successful apt-get operations
             mock_subprocess.side_effect = [
                 FunctionResponse(success=False, error="which: nala: not found"),
-                FunctionResponse(success=True, stdout="Reading package lists..."),
                 FunctionResponse(success=True, stdout="Successfully installed gcc"),
             ]
 
@@ -286,7 +283,7 @@ def test_with_deps():
             assert "Installed with nala" not in result.stdout
 
             # Verify all operations were called
-            assert mock_subprocess.call_count == 3
+            assert mock_subprocess.call_count == 2
 
     @pytest.mark.integration
     @patch("platform.system")
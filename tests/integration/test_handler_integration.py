@@ -4,7 +4,8 @@ import base64
 import cloudpickle
 from pathlib import Path
 
-from handler import handler, RemoteExecutor
+from handler import handler
+from remote_executor import RemoteExecutor
 from runpod_flash.protos.remote_execution import FunctionRequest
 
 
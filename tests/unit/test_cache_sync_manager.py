@@ -1,4 +1,9 @@
+import asyncio
+import errno
 import os
+import tarfile
+import threading
+import time
 import pytest
 from unittest.mock import patch
 from pathlib import Path
@@ -6,6 +11,9 @@ from cache_sync_manager import CacheSyncManager
 from runpod_flash.protos.remote_execution import FunctionResponse
 
 
+MOCK_DELTA = {"file1": [1234567891, 10], "file2": [1234567891, 20]}
+
+
 @pytest.fixture
 def cache_sync():
     """Create a CacheSyncManager instance for testing."""
@@ -25,17 +33,14 @@ class TestShouldSync:
             cache_sync_new = CacheSyncManager()
             assert cache_sync_new.should_sync() is False
 
-    def test_should_sync_volume_not_mounted(self, cache_sync, mock_env):
+    def test_should_sync_volume_not_mounted(self, mock_env):
         """Test that sync is skipped when /runpod-volume is not mounted."""
         with patch("os.path.exists") as mock_exists:
             mock_exists.return_value = False
-            assert cache_sync.should_sync() is False
+            assert CacheSyncManager().should_sync() is False
 
     def test_should_sync_success(self, mock_env):
         """Test that sync proceeds when conditions are met."""
-        # Create cache_sync after environment is set
-        cache_sync = CacheSyncManager()
-
         with (
             patch("os.path.exists") as mock_exists,
             patch("os.makedirs") as mock_makedirs,
@@ -47,15 +52,17 @@ class TestShouldSync:
                 return False
 
             mock_exists.side_effect = exists_side_effect
+            cache_sync = CacheSyncManager()
             assert cache_sync.should_sync() is True
             mock_makedirs.assert_called_once_with("/runpod-volume/.cache", exist_ok=True)
 
-    def test_should_sync_cached_result(self, mock_env):
-        """Test that should_sync caches its result."""
-        # Create cache_sync after environment is set
-        cache_sync = CacheSyncManager()
-
-        with patch("os.path.exists") as mock_exists, patch("os.makedirs"):
+    def test_should_sync_computed_once(self, mock_env):
+        """Test that sync availability is computed once at construction."""
+        with (
+            patch("os.path.exists") as mock_exists,
+            patch("os.makedirs"),
+            patch("shutil.which", return_value=None),
+        ):
 
             def exists_side_effect(path):
                 if path == "/runpod-volume":
@@ -63,49 +70,54 @@ class TestShouldSync:
                 return False
 
             mock_exists.side_effect = exists_side_effect
+            cache_sync = CacheSyncManager()
 
-            # First call
-            result1 = cache_sync.should_sync()
-            # Second call should use cached result
-            result2 = cache_sync.should_sync()
-
-            assert result1 is True
-            assert result2 is True
-            # os.path.exists should be called only once (cached on second call)
-            assert mock_exists.call_count <= 1
+            assert cache_sync.should_sync() is True
+            assert cache_sync.should_sync() is True
+            # Only the constructor probes the volume
+            assert mock_exists.call_count == 1
 
 
 class TestMarkBaseline:
     def test_mark_baseline_skips_when_should_not_sync(self, cache_sync):
         """Test that mark_baseline skips when should_sync returns False."""
-        with patch.object(cache_sync, "should_sync", return_value=False):
-            cache_sync.mark_baseline()
-            assert cache_sync._baseline_time is None
+        with patch.object(cache_sync, "_sync_enabled", False):
+            assert cache_sync.mark_baseline() is None
 
-    def test_mark_baseline_stores_timestamp(self, cache_sync, mock_env):
-        """Test that mark_baseline stores current timestamp."""
+    def test_mark_baseline_returns_timestamp(self, cache_sync, mock_env):
+        """Test that mark_baseline returns the current timestamp on a first run."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
-            patch("cache_sync_manager.datetime") as mock_datetime,
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch("os.path.exists", return_value=False),
+            patch("cache_sync_manager.time") as mock_time,
         ):
-            # Mock datetime.now().timestamp()
-            mock_now = mock_datetime.now.return_value
-            mock_now.timestamp.return_value = 1234567890.0
-
-            cache_sync.mark_baseline()
+            mock_time.time.return_value = 1234567890.0
 
-            assert cache_sync._baseline_time == 1234567890.0
+            assert cache_sync.mark_baseline() == 1234567890.0
 
     def test_mark_baseline_handles_exception(self, cache_sync, mock_env):
         """Test that mark_baseline handles exceptions gracefully."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
-            patch("cache_sync_manager.datetime") as mock_datetime,
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch("cache_sync_manager.time") as mock_time,
         ):
-            mock_datetime.now.side_effect = Exception("Time error")
+            mock_time.time.side_effect = Exception("Time error")
+
+            assert cache_sync.mark_baseline() is None
 
-            cache_sync.mark_baseline()
-            assert cache_sync._baseline_time is None
+    def test_mark_baseline_uses_unmigrated_legacy_tarball(self, cache_sync, tmp_path):
+        """Test that a pre-zstd .tar still sets the baseline before it is migrated."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+        legacy = tmp_path / "cache-test-endpoint-123.tar"
+        legacy.write_bytes(b"tar")
+        os.utime(legacy, (1500.0, 1500.0))
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch("cache_sync_manager.VOLUME_CACHE_PATH", str(tmp_path)),
+        ):
+            assert cache_sync.mark_baseline() == 1500.0
 
 
 class TestSyncToVolumeAsync:
@@ -113,54 +125,308 @@ class TestSyncToVolumeAsync:
     async def test_sync_skips_when_should_not_sync(self, cache_sync):
         """Test that sync_to_volume skips when should_sync returns False."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=False),
+            patch.object(cache_sync, "_sync_enabled", False),
             patch("asyncio.to_thread") as mock_to_thread,
         ):
-            await cache_sync.sync_to_volume()
+            await cache_sync.sync_to_volume(1234567890.0)
             # Verify no subprocess operations were attempted
             mock_to_thread.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_sync_skips_without_baseline(self, cache_sync):
+        """Test that a request whose baseline could not be marked does not sync."""
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch.object(cache_sync, "_sync_delta") as mock_sync_delta,
+        ):
+            await cache_sync.sync_to_volume(None)
+            mock_sync_delta.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sync_requested_in_flight_gets_another_pass(self, cache_sync):
+        """Test that syncs requested mid-run are replayed from the oldest baseline."""
+        calls = []
+        release = asyncio.Event()
+
+        async def fake_sync_delta(baseline_time):
+            calls.append(baseline_time)
+            if len(calls) == 1:
+                await release.wait()
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch.object(cache_sync, "_sync_delta", side_effect=fake_sync_delta),
+        ):
+            first = asyncio.create_task(cache_sync.sync_to_volume(300.0))
+            await asyncio.sleep(0)
+            # Both return immediately; the running sync owns their baselines now
+            await cache_sync.sync_to_volume(200.0)
+            await cache_sync.sync_to_volume(250.0)
+            release.set()
+            await first
+
+        assert calls == [300.0, 200.0]
+        assert cache_sync._pending_baseline is None
+
+    @pytest.mark.asyncio
+    async def test_in_flight_sync_archives_late_files(self, cache_sync, tmp_path):
+        """Test that files installed while a sync runs still reach the tarball."""
+        cache_dir = tmp_path / "cache"
+        volume_dir = tmp_path / "volume"
+        cache_dir.mkdir()
+        volume_dir.mkdir()
+        (cache_dir / "a_file").write_bytes(b"a")
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = False
+        scanned = threading.Event()
+        resume = threading.Event()
+        original = cache_sync._write_delta_file_list
+
+        def write_delta_file_list(*args):
+            delta = original(*args)
+            if not scanned.is_set():
+                scanned.set()
+                resume.wait(timeout=5)
+            return delta
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch("cache_sync_manager.CACHE_DIR", str(cache_dir)),
+            patch("cache_sync_manager.VOLUME_CACHE_PATH", str(volume_dir)),
+            patch.object(cache_sync, "_write_delta_file_list", side_effect=write_delta_file_list),
+        ):
+            first = asyncio.create_task(cache_sync.sync_to_volume(0.0))
+            await asyncio.to_thread(scanned.wait, 5)
+
+            # A second request installs after the first scan, then asks for a sync
+            second_baseline = time.time() - 1
+            (cache_dir / "b_file").write_bytes(b"b")
+            await cache_sync.sync_to_volume(second_baseline)
+
+            resume.set()
+            await first
+
+        with tarfile.open(volume_dir / "cache-test-endpoint-123.tar") as tar:
+            names = {os.path.basename(name) for name in tar.getnames()}
+        assert names == {"a_file", "b_file"}
+
+
+class TestIterDeltaFiles:
+    def test_yields_only_files_newer_than_baseline(self, cache_sync, tmp_path):
+        """Test that the walk applies the same filters as the old find command."""
+        old_file = tmp_path / "old.bin"
+        new_file = tmp_path / "hub" / "blobs" / "new.bin"
+        skipped = [
+            tmp_path / "hub" / "refs" / "main",
+            tmp_path / "hub" / ".no_exist" / "abc" / "config.json",
+            tmp_path / ".cache-last-hydrated",
+        ]
+        for path in [old_file, new_file, *skipped]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+        os.utime(old_file, (1000.0, 1000.0))
+
+        with patch("cache_sync_manager.CACHE_DIR", str(tmp_path)):
+            assert [entry.path for entry in cache_sync._iter_delta_files(2000.0)] == [str(new_file)]
+
+    def test_write_delta_file_list_returns_entries(self, cache_sync, tmp_path):
+        """Test that delta paths are streamed newline-terminated into the file list."""
+        cache_dir = tmp_path / "cache"
+        (cache_dir / "sub").mkdir(parents=True)
+        (cache_dir / "a").write_text("x")
+        (cache_dir / "sub" / "b").write_text("xy")
+        os.utime(cache_dir / "a", (3000.5, 3000.5))
+        os.utime(cache_dir / "sub" / "b", (3000.5, 3000.5))
+        file_list = tmp_path / "files.txt"
+
+        with (
+            patch("cache_sync_manager.CACHE_DIR", str(cache_dir)),
+            open(file_list, "w") as f,
+        ):
+            delta = cache_sync._write_delta_file_list(f, 0.0, {}, {})
+
+        assert delta == {
+            "a": [3000, 1, CacheSyncManager._file_digest(str(cache_dir / "a"))],
+            "sub/b": [3000, 2, CacheSyncManager._file_digest(str(cache_dir / "sub" / "b"))],
+        }
+        assert sorted(file_list.read_text().splitlines()) == [
+            str(cache_dir / "a"),
+            str(cache_dir / "sub" / "b"),
+        ]
+
+    def test_write_delta_file_list_skips_archived_files(self, cache_sync, tmp_path):
+        """Test that files matching their manifest fingerprint are not re-archived."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        (cache_dir / "same").write_text("x")
+        (cache_dir / "changed").write_text("xy")
+        for name in ("same", "changed"):
+            os.utime(cache_dir / name, (3000.0, 3000.0))
+        manifest = {"same": [3000, 1], "changed": [3000, 1]}
+        file_list = tmp_path / "files.txt"
+
+        with (
+            patch("cache_sync_manager.CACHE_DIR", str(cache_dir)),
+            open(file_list, "w") as f,
+        ):
+            delta = cache_sync._write_delta_file_list(f, 0.0, manifest, {})
+
+        assert delta == {
+            "changed": [3000, 2, CacheSyncManager._file_digest(str(cache_dir / "changed"))]
+        }
+        assert file_list.read_text() == f"{cache_dir / 'changed'}\n"
+
+    def test_write_delta_file_list_skips_touched_unchanged_files(self, cache_sync, tmp_path):
+        """Test that a file whose mtime moved but content did not is not re-archived."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        (cache_dir / "touched").write_text("x")
+        (cache_dir / "edited").write_text("y")
+        os.utime(cache_dir / "touched", (4000.0, 4000.0))
+        os.utime(cache_dir / "edited", (4000.0, 4000.0))
+        touched_digest = CacheSyncManager._file_digest(str(cache_dir / "touched"))
+        manifest = {
+            "touched": [3000, 1, touched_digest],
+            "edited": [3000, 1, touched_digest],
+        }
+        refreshed = {}
+        file_list = tmp_path / "files.txt"
+
+        with (
+            patch("cache_sync_manager.CACHE_DIR", str(cache_dir)),
+            open(file_list, "w") as f,
+        ):
+            delta = cache_sync._write_delta_file_list(f, 0.0, manifest, refreshed)
+
+        assert list(delta) == ["edited"]
+        assert file_list.read_text() == f"{cache_dir / 'edited'}\n"
+        # The skipped file's new mtime is reported for the manifest
+        assert refreshed == {"touched": [4000, 1, touched_digest]}
+
+
+class TestManifest:
+    def test_manifest_round_trip(self, cache_sync, tmp_path):
+        """Test that a written manifest loads back unchanged."""
+        manifest_path = str(tmp_path / "cache.manifest")
+
+        with patch.object(CacheSyncManager, "_manifest_path", manifest_path):
+            cache_sync._write_manifest(MOCK_DELTA)
+            assert cache_sync._load_manifest() == MOCK_DELTA
+        assert not os.path.exists(f"{manifest_path}.tmp")
+
+    def test_load_manifest_missing_or_corrupt(self, cache_sync, tmp_path):
+        """Test that a missing or unreadable manifest loads as empty."""
+        manifest_path = tmp_path / "cache.manifest"
+
+        with patch.object(CacheSyncManager, "_manifest_path", str(manifest_path)):
+            assert cache_sync._load_manifest() == {}
+            manifest_path.write_text("{not json")
+            assert cache_sync._load_manifest() == {}
+
+
+class TestAppendFile:
+    def test_append_file_concatenates(self, tmp_path):
+        """Test that the source bytes land after the existing target bytes."""
+        src, dst = tmp_path / "delta", tmp_path / "tarball"
+        src.write_bytes(b"delta")
+        dst.write_bytes(b"base-")
+
+        CacheSyncManager._append_file(str(src), str(dst))
+
+        assert dst.read_bytes() == b"base-delta"
+
+    def test_append_file_falls_back_to_sendfile(self, tmp_path):
+        """Test that an unsupported copy_file_range falls back to sendfile."""
+        src, dst = tmp_path / "delta", tmp_path / "tarball"
+        src.write_bytes(b"delta")
+        dst.write_bytes(b"base-")
+
+        with patch("os.copy_file_range", side_effect=OSError(errno.EXDEV, "cross-device")):
+            CacheSyncManager._append_file(str(src), str(dst))
+
+        assert dst.read_bytes() == b"base-delta"
+
+    def test_append_file_short_copy_restores_target(self, tmp_path):
+        """Test that a copy ending early raises and leaves no partial frame in the target."""
+        src, dst = tmp_path / "delta", tmp_path / "tarball"
+        src.write_bytes(b"delta")
+        dst.write_bytes(b"base-")
+        real_copy_file_range = os.copy_file_range
+
+        def copy_two_bytes_then_stop(src_fd, dst_fd, count):
+            if os.lseek(src_fd, 0, os.SEEK_CUR):
+                return 0
+            return real_copy_file_range(src_fd, dst_fd, 2)
+
+        with (
+            patch("os.copy_file_range", side_effect=copy_two_bytes_then_stop),
+            pytest.raises(OSError, match="2 of 5 bytes"),
+        ):
+            CacheSyncManager._append_file(str(src), str(dst))
+
+        assert dst.read_bytes() == b"base-"
+
 
 class TestCollectAndTarball:
     @pytest.mark.asyncio
     async def test_sync_to_volume_no_new_files(self, cache_sync, mock_env):
         """Test that sync_to_volume handles no new files."""
         cache_sync._endpoint_id = "test-endpoint-123"
-        cache_sync._baseline_time = 1234567890.0
-
-        mock_find_result = FunctionResponse(success=True, stdout="")
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=True),
             patch("os.path.getmtime", return_value=1234567890.0),
-            patch("asyncio.to_thread", side_effect=[mock_find_result]) as mock_to_thread,
+            patch("asyncio.to_thread", side_effect=[{}, {}]) as mock_to_thread,
         ):
-            await cache_sync.sync_to_volume()
+            await cache_sync.sync_to_volume(1234567890.0)
 
-            # Only find command should be called, tar should be skipped
-            assert mock_to_thread.call_count == 1
+            # Only the manifest load and delta walk should run, tar should be skipped
+            assert mock_to_thread.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_to_volume_records_refreshed_entries(self, cache_sync, mock_env):
+        """Test that refreshed manifest entries are written even when nothing is archived."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        manifest = {"touched": [1000, 1, "digest"]}
+
+        def to_thread(func, *args):
+            if func == cache_sync._load_manifest:
+                return manifest
+            if func == cache_sync._write_delta_file_list:
+                args[3]["touched"] = [2000, 1, "digest"]
+                return {}
+            return None
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch("os.path.exists", return_value=True),
+            patch("asyncio.to_thread", side_effect=to_thread) as mock_to_thread,
+        ):
+            await cache_sync.sync_to_volume(1234567890.0)
+
+            # No tar run, but the refreshed mtime reaches the manifest
+            assert mock_to_thread.call_count == 3
+            mock_to_thread.assert_called_with(
+                cache_sync._write_manifest, {"touched": [2000, 1, "digest"]}
+            )
 
     @pytest.mark.asyncio
     async def test_sync_to_volume_success_new(self, cache_sync, mock_env):
         """Test successful tarball creation when no tarball exists (uses baseline_time)."""
         cache_sync._endpoint_id = "test-endpoint-123"
-        cache_sync._baseline_time = 1234567890.0
 
-        mock_find_result = FunctionResponse(
-            success=True, stdout="/root/.cache/file1\n/root/.cache/file2"
-        )
         mock_create_result = FunctionResponse(success=True, stdout="")
-        mock_mv_result = FunctionResponse(success=True, stdout="")
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch(
                 "asyncio.to_thread",
-                side_effect=[mock_find_result, mock_create_result, mock_mv_result],
+                side_effect=[MOCK_DELTA, mock_create_result, None],
             ) as mock_to_thread,
             patch("os.path.exists") as mock_exists,
             patch("os.remove") as mock_remove,
+            patch("os.replace") as mock_replace,
             patch("tempfile.NamedTemporaryFile") as mock_tempfile,
             patch.object(cache_sync, "mark_last_hydrated") as mock_mark,
         ):
@@ -168,54 +434,53 @@ class TestCollectAndTarball:
             mock_file_list = mock_tempfile.return_value
             mock_file_list.name = "/tmp/.cache-files-abc123"
 
-            # Tarball doesn't exist initially, but temp files exist
+            # Tarball doesn't exist initially; the file list still needs cleanup
             def exists_side_effect(path):
-                if path == "/runpod-volume/.cache/cache-test-endpoint-123.tar":
-                    return False
-                elif path.endswith(".new") or path.endswith(".tmp"):
-                    return True
-                elif path.startswith("/tmp/.cache-files-"):
+                if path.startswith("/tmp/.cache-files-"):
                     return True
                 return False
 
             mock_exists.side_effect = exists_side_effect
 
-            await cache_sync.sync_to_volume()
+            await cache_sync.sync_to_volume(1234567890.0)
 
-            # find, tar cf (create new), and mv should be called
+            # delta walk, tar cf (create new) and manifest write should be called
             assert mock_to_thread.call_count == 3
-            # File list and temp files should be cleaned up (3 calls)
-            assert mock_remove.call_count == 3
+            assert mock_to_thread.call_args_list[1].kwargs["command"] == [
+                "tar",
+                "cf",
+                "/runpod-volume/.cache/cache-test-endpoint-123.tar.new",
+                "-T",
+                "/tmp/.cache-files-abc123",
+            ]
+            # New tarball is renamed into place
+            mock_replace.assert_called_once_with(
+                "/runpod-volume/.cache/cache-test-endpoint-123.tar.new",
+                "/runpod-volume/.cache/cache-test-endpoint-123.tar",
+            )
+            # Only the file list is left to clean up
+            assert mock_remove.call_count == 1
             # mark_last_hydrated should be called after successful sync
             mock_mark.assert_called_once()
+            # A fresh tarball's manifest holds just this delta
+            mock_to_thread.assert_called_with(cache_sync._write_manifest, MOCK_DELTA)
 
     @pytest.mark.asyncio
     async def test_sync_to_volume_success_append(self, cache_sync, mock_env):
-        """Test successful tarball concatenation when tarball already exists (uses baseline_time)."""
+        """Test successful in-place append when tarball already exists (uses baseline_time)."""
         cache_sync._endpoint_id = "test-endpoint-123"
-        cache_sync._baseline_time = 1234567890.0
 
-        mock_find_result = FunctionResponse(
-            success=True, stdout="/root/.cache/file3\n/root/.cache/file4"
-        )
-        mock_create_result = FunctionResponse(success=True, stdout="")
-        mock_mv_to_temp_result = FunctionResponse(success=True, stdout="")
-        mock_concat_result = FunctionResponse(success=True, stdout="")
-        mock_mv_to_final_result = FunctionResponse(success=True, stdout="")
+        mock_manifest = {"old": [1000, 1]}
+        mock_append_result = FunctionResponse(success=True, stdout="")
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch(
                 "asyncio.to_thread",
-                side_effect=[
-                    mock_find_result,
-                    mock_create_result,
-                    mock_mv_to_temp_result,
-                    mock_concat_result,
-                    mock_mv_to_final_result,
-                ],
+                side_effect=[mock_manifest, MOCK_DELTA, mock_append_result, None],
             ) as mock_to_thread,
             patch("os.path.exists") as mock_exists,
+            patch("os.path.getsize", return_value=1024),
             patch("os.remove") as mock_remove,
             patch("tempfile.NamedTemporaryFile") as mock_tempfile,
             patch.object(cache_sync, "mark_last_hydrated") as mock_mark,
@@ -224,50 +489,141 @@ class TestCollectAndTarball:
             mock_file_list = mock_tempfile.return_value
             mock_file_list.name = "/tmp/.cache-files-abc123"
 
-            # Tarball exists initially, plus temp files
+            # Tarball exists initially, plus the file list
             def exists_side_effect(path):
                 if path == "/runpod-volume/.cache/cache-test-endpoint-123.tar":
                     return True
-                elif path.endswith(".new") or path.endswith(".tmp"):
-                    return True
                 elif path.startswith("/tmp/.cache-files-"):
                     return True
                 return False
 
             mock_exists.side_effect = exists_side_effect
 
-            await cache_sync.sync_to_volume()
-
-            # find, tar cf (create new), mv (to temp), tar -A (concat), mv (to final)
-            assert mock_to_thread.call_count == 5
-            # File list and temp files should be cleaned up (3 calls)
-            assert mock_remove.call_count == 3
+            await cache_sync.sync_to_volume(1234567890.0)
+
+            # manifest load, delta walk, a single tar rf (append in place), manifest write
+            assert mock_to_thread.call_count == 4
+            assert mock_to_thread.call_args_list[2].kwargs["command"] == [
+                "tar",
+                "rf",
+                "/runpod-volume/.cache/cache-test-endpoint-123.tar",
+                "-T",
+                "/tmp/.cache-files-abc123",
+            ]
+            # Only the file list is left to clean up
+            assert mock_remove.call_count == 1
             # mark_last_hydrated should be called after successful sync
             mock_mark.assert_called_once()
+            # The delta is merged into the existing manifest
+            mock_to_thread.assert_called_with(
+                cache_sync._write_manifest, {"old": [1000, 1], **MOCK_DELTA}
+            )
+
+    @pytest.mark.asyncio
+    async def test_sync_to_volume_zstd_append(self, cache_sync, mock_env):
+        """Test that a compressed delta is built aside and concatenated onto the tarball."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+        tarball = "/runpod-volume/.cache/cache-test-endpoint-123.tar.zst"
+
+        mock_create_result = FunctionResponse(success=True, stdout="")
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch(
+                "asyncio.to_thread",
+                side_effect=[{}, MOCK_DELTA, mock_create_result, None, None],
+            ) as mock_to_thread,
+            patch("os.path.exists", side_effect=lambda path: path == tarball),
+            patch("os.path.getsize", return_value=1024),
+            patch("tempfile.NamedTemporaryFile") as mock_tempfile,
+            patch.object(cache_sync, "mark_last_hydrated") as mock_mark,
+        ):
+            mock_tempfile.return_value.name = "/tmp/.cache-files-abc123"
+
+            await cache_sync.sync_to_volume(1234567890.0)
+
+            create_call, append_call = mock_to_thread.call_args_list[2:4]
+            assert create_call.kwargs["command"] == [
+                "tar",
+                "cf",
+                f"{tarball}.new",
+                "-T",
+                "/tmp/.cache-files-abc123",
+                "--use-compress-program=zstd -T0 -3 --long=27",
+            ]
+            assert append_call.args == (cache_sync._append_file, f"{tarball}.new", tarball)
+            mock_mark.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_sync_to_volume_move_to_temp_failure(self, cache_sync, mock_env):
-        """Test handling of move to temp failure when concatenating."""
+    async def test_sync_to_volume_zstd_append_failure_skips_manifest(self, cache_sync, mock_env):
+        """Test that a failed append records nothing, so the delta is retried next sync."""
         cache_sync._endpoint_id = "test-endpoint-123"
-        cache_sync._baseline_time = 1234567890.0
+        cache_sync._use_zstd = True
+        tarball = "/runpod-volume/.cache/cache-test-endpoint-123.tar.zst"
 
-        mock_find_result = FunctionResponse(
-            success=True, stdout="/root/.cache/file3\n/root/.cache/file4"
-        )
         mock_create_result = FunctionResponse(success=True, stdout="")
-        mock_mv_to_temp_result = FunctionResponse(success=False, error="Move to temp failed")
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch(
+                "asyncio.to_thread",
+                side_effect=[{}, MOCK_DELTA, mock_create_result, OSError("short copy")],
+            ) as mock_to_thread,
+            patch("os.path.exists", side_effect=lambda path: path == tarball),
+            patch("os.path.getsize", return_value=1024),
+            patch("tempfile.NamedTemporaryFile") as mock_tempfile,
+            patch.object(cache_sync, "mark_last_hydrated") as mock_mark,
+        ):
+            mock_tempfile.return_value.name = "/tmp/.cache-files-abc123"
+
+            await cache_sync.sync_to_volume(1234567890.0)
+
+            # manifest load, delta walk, tar cf and the failed append; no manifest write
+            assert mock_to_thread.call_count == 4
+            mock_mark.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sync_to_volume_warns_with_cached_volume_capacity(self, cache_sync, mock_env):
+        """Test that the capacity warning uses the capacity stat'd at construction."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._volume_total = 1000
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch(
+                "asyncio.to_thread",
+                side_effect=[{}, MOCK_DELTA, FunctionResponse(success=True), None],
+            ),
+            patch("os.path.exists", return_value=True),
+            patch("os.path.getsize", return_value=900),
+            patch("os.remove"),
+            patch("os.statvfs") as mock_statvfs,
+            patch("tempfile.NamedTemporaryFile"),
+            patch.object(cache_sync, "mark_last_hydrated"),
+            patch.object(cache_sync.logger, "warning") as mock_warning,
+        ):
+            await cache_sync.sync_to_volume(1234567890.0)
+
+            mock_statvfs.assert_not_called()
+            assert "exceeds 75% of volume capacity" in mock_warning.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_sync_to_volume_append_failure(self, cache_sync, mock_env):
+        """Test handling of a failed in-place append."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+
+        mock_append_result = FunctionResponse(success=False, error="Append failed")
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
             patch(
                 "asyncio.to_thread",
-                side_effect=[
-                    mock_find_result,
-                    mock_create_result,
-                    mock_mv_to_temp_result,
-                ],
+                side_effect=[{}, MOCK_DELTA, mock_append_result],
             ) as mock_to_thread,
             patch("os.path.exists") as mock_exists,
+            patch("tempfile.NamedTemporaryFile"),
+            patch.object(cache_sync, "mark_last_hydrated") as mock_mark,
         ):
             # Tarball exists initially
             def exists_side_effect(path):
@@ -277,54 +633,120 @@ class TestCollectAndTarball:
 
             mock_exists.side_effect = exists_side_effect
 
-            await cache_sync.sync_to_volume()
+            await cache_sync.sync_to_volume(1234567890.0)
 
-            # find, tar cf (create new), and mv to temp should be called
+            # manifest load, delta walk and tar rf; no manifest write after a failure
             assert mock_to_thread.call_count == 3
+            mock_mark.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_sync_to_volume_find_failure(self, cache_sync, mock_env):
-        """Test handling of find command failure."""
+    async def test_sync_to_volume_delta_walk_failure(self, cache_sync, mock_env):
+        """Test handling of a failure while collecting the cache delta."""
         cache_sync._endpoint_id = "test-endpoint-123"
-        cache_sync._baseline_time = 1234567890.0
 
-        mock_find_result = FunctionResponse(success=False, error="Find failed")
+        mock_delta_error = OSError("Disk error")
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=True),
-            patch("asyncio.to_thread", side_effect=[mock_find_result]) as mock_to_thread,
+            patch("asyncio.to_thread", side_effect=[{}, mock_delta_error]) as mock_to_thread,
         ):
-            await cache_sync.sync_to_volume()
+            await cache_sync.sync_to_volume(1234567890.0)
 
-            # Only find should be attempted, tar should be skipped
-            assert mock_to_thread.call_count == 1
+            # Only the manifest load and delta walk should be attempted, tar should be skipped
+            assert mock_to_thread.call_count == 2
 
     @pytest.mark.asyncio
     async def test_sync_to_volume_handles_exception(self, cache_sync, mock_env):
         """Test that sync_to_volume handles unexpected exceptions."""
         cache_sync._endpoint_id = "test-endpoint-123"
-        cache_sync._baseline_time = 1234567890.0
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=True),
             patch("asyncio.to_thread", side_effect=Exception("Unexpected error")),
         ):
             # Should not raise exception
-            await cache_sync.sync_to_volume()
+            await cache_sync.sync_to_volume(1234567890.0)
+
+
+class TestMigrateLegacyTarball:
+    @pytest.mark.asyncio
+    async def test_migrate_replaces_legacy_tarball(self, cache_sync, tmp_path):
+        """Test that the legacy .tar is recompressed in place of the .tar.zst and removed."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+        legacy = tmp_path / "cache-test-endpoint-123.tar"
+        tarball = tmp_path / "cache-test-endpoint-123.tar.zst"
+        legacy.write_bytes(b"tar")
+        os.utime(legacy, (1500.0, 1500.0))
+
+        def compress(func, *, command, **kwargs):
+            Path(command[command.index("-o") + 1]).write_bytes(b"zst")
+            return FunctionResponse(success=True, stdout="")
+
+        with (
+            patch("cache_sync_manager.VOLUME_CACHE_PATH", str(tmp_path)),
+            patch("asyncio.to_thread", side_effect=compress) as mock_to_thread,
+        ):
+            assert await cache_sync._migrate_legacy_tarball() is True
+
+        command = mock_to_thread.call_args.kwargs["command"]
+        assert command[:4] == ["zstd", "-T0", "-3", "--long=27"]
+        assert command[-1] == str(legacy)
+        assert not legacy.exists()
+        assert tarball.read_bytes() == b"zst"
+        # Keeps the legacy mtime so the migration alone does not trigger rehydration
+        assert os.path.getmtime(tarball) == 1500.0
+
+    @pytest.mark.asyncio
+    async def test_migrate_failure_keeps_legacy_tarball(self, cache_sync, tmp_path):
+        """Test that a failed recompression leaves the legacy tarball in place."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+        legacy = tmp_path / "cache-test-endpoint-123.tar"
+        legacy.write_bytes(b"tar")
+
+        with (
+            patch("cache_sync_manager.VOLUME_CACHE_PATH", str(tmp_path)),
+            patch(
+                "asyncio.to_thread",
+                return_value=FunctionResponse(success=False, error="zstd failed"),
+            ),
+        ):
+            assert await cache_sync._migrate_legacy_tarball() is False
+
+        assert legacy.exists()
+        assert not (tmp_path / "cache-test-endpoint-123.tar.zst").exists()
+
+    @pytest.mark.asyncio
+    async def test_sync_skips_when_migration_fails(self, cache_sync, mock_env):
+        """Test that no compressed delta is started beside an unmigrated legacy tarball."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+        legacy = "/runpod-volume/.cache/cache-test-endpoint-123.tar"
+
+        with (
+            patch.object(cache_sync, "_sync_enabled", True),
+            patch("os.path.exists", side_effect=lambda path: path == legacy),
+            patch.object(cache_sync, "_migrate_legacy_tarball", return_value=False),
+            patch("asyncio.to_thread") as mock_to_thread,
+        ):
+            await cache_sync.sync_to_volume(1234567890.0)
+
+            mock_to_thread.assert_not_called()
 
 
 class TestShouldHydrate:
     def test_should_hydrate_when_should_sync_false(self, cache_sync):
         """Test that hydration skips when should_sync returns False."""
-        with patch.object(cache_sync, "should_sync", return_value=False):
+        with patch.object(cache_sync, "_sync_enabled", False):
             assert cache_sync.should_hydrate() is False
 
     def test_should_hydrate_when_no_tarball(self, cache_sync, mock_env):
         """Test that hydration skips when tarball doesn't exist."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=False),
         ):
             assert cache_sync.should_hydrate() is False
@@ -334,7 +756,7 @@ class TestShouldHydrate:
         cache_sync._endpoint_id = "test-endpoint-123"
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists") as mock_exists,
         ):
 
@@ -351,7 +773,7 @@ class TestShouldHydrate:
         cache_sync._endpoint_id = "test-endpoint-123"
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=True),
             patch("os.path.getmtime") as mock_getmtime,
         ):
@@ -369,7 +791,7 @@ class TestShouldHydrate:
         cache_sync._endpoint_id = "test-endpoint-123"
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=True),
             patch("os.path.getmtime") as mock_getmtime,
         ):
@@ -387,7 +809,7 @@ class TestShouldHydrate:
         cache_sync._endpoint_id = "test-endpoint-123"
 
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch("os.path.exists", return_value=True),
             patch("os.path.getmtime", side_effect=OSError("Permission denied")),
         ):
@@ -429,6 +851,52 @@ class TestHydrateFromVolume:
             # Hydration marker should be set
             mock_mark.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_hydrate_zstd_reads_every_appended_archive(self, cache_sync, mock_env):
+        """Test that compressed tarballs are decompressed and read past each archive end."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+
+        mock_tar_result = FunctionResponse(success=True, stdout="")
+
+        with (
+            patch.object(cache_sync, "should_hydrate", return_value=True),
+            patch("os.makedirs"),
+            patch("asyncio.to_thread", return_value=mock_tar_result) as mock_to_thread,
+            patch.object(cache_sync, "mark_last_hydrated"),
+        ):
+            await cache_sync.hydrate_from_volume()
+
+            assert mock_to_thread.call_args.kwargs["command"] == [
+                "tar",
+                "xf",
+                "/runpod-volume/.cache/cache-test-endpoint-123.tar.zst",
+                "-C",
+                "/",
+                "--use-compress-program=zstd -d --long=27",
+                "--ignore-zeros",
+            ]
+
+    @pytest.mark.asyncio
+    async def test_hydrate_falls_back_to_legacy_tarball(self, cache_sync, mock_env):
+        """Test that an endpoint's pre-zstd .tar is hydrated until it is migrated."""
+        cache_sync._endpoint_id = "test-endpoint-123"
+        cache_sync._use_zstd = True
+        legacy = "/runpod-volume/.cache/cache-test-endpoint-123.tar"
+
+        mock_tar_result = FunctionResponse(success=True, stdout="")
+
+        with (
+            patch.object(cache_sync, "should_hydrate", return_value=True),
+            patch("os.makedirs"),
+            patch("os.path.exists", side_effect=lambda path: path == legacy),
+            patch("asyncio.to_thread", return_value=mock_tar_result) as mock_to_thread,
+            patch.object(cache_sync, "mark_last_hydrated"),
+        ):
+            await cache_sync.hydrate_from_volume()
+
+            assert mock_to_thread.call_args.kwargs["command"] == ["tar", "xf", legacy, "-C", "/"]
+
     @pytest.mark.asyncio
     async def test_hydrate_tar_failure(self, cache_sync, mock_env):
         """Test handling of tar extraction failure."""
@@ -480,7 +948,7 @@ class TestMarkLastHydrated:
     def test_mark_last_hydrated_skips_when_should_not_sync(self, cache_sync):
         """Test that mark_last_hydrated skips when should_sync returns False."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=False),
+            patch.object(cache_sync, "_sync_enabled", False),
             patch.object(Path, "touch") as mock_touch,
         ):
             cache_sync.mark_last_hydrated()
@@ -490,7 +958,7 @@ class TestMarkLastHydrated:
     def test_mark_last_hydrated_creates_marker(self, cache_sync, mock_env):
         """Test that mark_last_hydrated creates a marker file."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch.object(Path, "touch") as mock_touch,
         ):
             cache_sync.mark_last_hydrated()
@@ -501,7 +969,7 @@ class TestMarkLastHydrated:
     def test_mark_last_hydrated_handles_exception(self, cache_sync, mock_env):
         """Test that mark_last_hydrated handles exceptions gracefully."""
         with (
-            patch.object(cache_sync, "should_sync", return_value=True),
+            patch.object(cache_sync, "_sync_enabled", True),
             patch.object(Path, "touch", side_effect=OSError("Permission denied")),
         ):
             # Should not raise exception
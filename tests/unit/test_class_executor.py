@@ -1,10 +1,15 @@
 """Tests for ClassExecutor component."""
 
 import base64
+import threading
+import weakref
 import cloudpickle
 from datetime import datetime
+from unittest.mock import patch
 
-from class_executor import ClassExecutor
+from class_executor import ClassExecutor, _container_memory_percent, _persist_on_exit
+from code_cache import CodeCache
+from instance_store import InstanceStore
 from runpod_flash.protos.remote_execution import FunctionRequest
 
 
@@ -185,7 +190,7 @@ class Counter:
 
         assert response.success is True
         assert response.instance_id is not None
-        assert response.instance_id in self.executor.class_instances
+        assert response.instance_id in self.executor.instances
 
         # Check metadata
         metadata = response.instance_info
@@ -269,7 +274,7 @@ class TestClass:
         await self.executor.execute_class_method(request)
 
         # Check metadata updates
-        metadata = self.executor.instance_metadata[instance_id]
+        metadata = self.executor.instances[instance_id].info()
         assert metadata["method_calls"] == 2
         assert metadata["class_name"] == "TestClass"
 
@@ -321,6 +326,362 @@ class OtherClass:
         assert "MissingClass" in response.error
         assert "not found" in response.error
 
+    async def test_cleanup_instances(self):
+        """Test that idle instances are dropped and recent ones kept."""
+        request = FunctionRequest(
+            execution_type="class",
+            class_name="TestClass",
+            class_code="""
+class TestClass:
+    def test_method(self):
+        return "test"
+""",
+            method_name="test_method",
+            args=[],
+            kwargs={},
+        )
+        stale = await self.executor.execute_class_method(request)
+        fresh = await self.executor.execute_class_method(request)
+        self.executor.instances[stale.instance_id].last_used_ns -= 7200 * 1_000_000_000
+
+        expired = self.executor.cleanup_instances(max_age_minutes=60)
+
+        assert expired == [stale.instance_id]
+        assert list(self.executor.instances) == [fresh.instance_id]
+
+    async def test_execute_drops_idle_instances(self, tmp_path):
+        """Test that serving a request persists and drops instances idle beyond the TTL."""
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        request = FunctionRequest(
+            execution_type="class",
+            class_name="TestClass",
+            class_code="""
+class TestClass:
+    def test_method(self):
+        return "test"
+""",
+            method_name="test_method",
+            args=[],
+            kwargs={},
+        )
+        stale = await self.executor.execute_class_method(request)
+        self.executor.instances[stale.instance_id].last_used_ns -= 7200 * 1_000_000_000
+
+        fresh = await self.executor.execute_class_method(request)
+        self.executor.flush_instance_store()
+
+        assert list(self.executor.instances) == [fresh.instance_id]
+        code_key = CodeCache.key(request.class_code).hex()
+        assert self.executor.instance_store.exists(stale.instance_id, code_key)
+
+    def test_idle_instances_kept_when_they_cannot_be_persisted(self):
+        """Test that without an instance store idle instances only expire by explicit TTL."""
+        self.executor._register_instance("a", "A", "code", object())
+        self.executor.instances["a"].last_used_ns -= 7200 * 1_000_000_000
+
+        assert self.executor.cleanup_instances() == []
+        assert list(self.executor.instances) == ["a"]
+
+    def test_instance_ttl_from_environment(self, monkeypatch, caplog):
+        """Test that FLASH_CLASS_INSTANCE_TTL expires instances even without a store."""
+        monkeypatch.setenv("FLASH_CLASS_INSTANCE_TTL", "60")
+        executor = ClassExecutor()
+        executor._register_instance("a", "A", "code", object())
+        executor._register_instance("b", "B", "code", object())
+        executor.instances["a"].last_used_ns -= 120 * 1_000_000_000
+
+        assert executor.cleanup_instances() == ["a"]
+        assert list(executor.instances) == ["b"]
+        assert "Dropped idle instance a without persisting it" in caplog.text
+
+        monkeypatch.setenv("FLASH_CLASS_INSTANCE_TTL", "0")
+        executor = ClassExecutor()
+        executor._register_instance("a", "A", "code", object())
+        executor.instances["a"].last_used_ns -= 120 * 1_000_000_000
+        assert executor.cleanup_instances() == []
+
+    async def test_least_recently_used_instance_evicted(self):
+        """Test that exceeding max_instances evicts the least recently used instance."""
+        self.executor.max_instances = 2
+        request = FunctionRequest(
+            execution_type="class",
+            class_name="TestClass",
+            class_code="""
+class TestClass:
+    def test_method(self):
+        return "test"
+""",
+            method_name="test_method",
+            args=[],
+            kwargs={},
+        )
+        first = await self.executor.execute_class_method(request)
+        second = await self.executor.execute_class_method(request)
+
+        # Touch the first instance so the second becomes least recently used
+        reuse = request.model_copy(
+            update={"instance_id": first.instance_id, "create_new_instance": False}
+        )
+        await self.executor.execute_class_method(reuse)
+        third = await self.executor.execute_class_method(request)
+
+        assert list(self.executor.instances) == [first.instance_id, third.instance_id]
+        assert second.instance_id not in self.executor.instances
+
+    def test_instance_info_created_at_stable(self):
+        """Test that created_at is formatted once and reported consistently."""
+        self.executor._register_instance("a", "A", "code", object())
+        rec = self.executor.instances["a"]
+
+        first = rec.info()
+        second = rec.info()
+
+        assert first["created_at"] == second["created_at"] == rec.created_at_iso
+        assert abs(datetime.fromisoformat(first["created_at"]).timestamp() - rec.created_at) < 1e-3
+        assert first["last_used"] >= first["created_at"]
+
+    def test_max_instances_from_environment(self, monkeypatch):
+        """Test that the instance cap can be configured through the environment."""
+        monkeypatch.setenv("FLASH_MAX_CLASS_INSTANCES", "16")
+
+        assert ClassExecutor().max_instances == 16
+        assert ClassExecutor(max_instances=4).max_instances == 4
+
+    def test_memory_pressure_evicts_until_under_limit(self):
+        """Test that eviction under memory pressure stops once usage drops below the limit."""
+        for name in ("a", "b", "c"):
+            self.executor._register_instance(name, name.upper(), "code", object())
+
+        readings = iter([95.0, 90.0, 80.0])
+        with patch("class_executor._container_memory_percent", lambda: next(readings)):
+            self.executor._register_instance("d", "D", "code", object())
+
+        assert list(self.executor.instances) == ["c", "d"]
+
+    def test_memory_pressure_keeps_evicting_while_usage_lags(self, tmp_path):
+        """Test that pressure eviction drops instances unpersisted until usage falls."""
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        for name in ("a", "b", "c"):
+            self.executor._register_instance(name, name.upper(), "code", {"name": name})
+
+        readings = iter([95.0, 95.0, 80.0])
+        with (
+            patch("class_executor._container_memory_percent", lambda: next(readings)),
+            patch("class_executor.gc.collect") as mock_collect,
+        ):
+            self.executor._register_instance("d", "D", "code", {"name": "d"})
+        self.executor.flush_instance_store()
+
+        assert list(self.executor.instances) == ["c", "d"]
+        assert mock_collect.call_count == 2
+        assert not self.executor._pending_saves
+        assert not self.executor.instance_store.exists("a", "code")
+        assert not self.executor.instance_store.exists("b", "code")
+
+    def test_memory_pressure_drops_queued_saves_first(self, tmp_path):
+        """Test that queued saves are dropped under pressure before live instances."""
+        self.executor.max_instances = 1
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        gate = threading.Event()
+        self.executor._store_writer.submit(gate.wait)
+        self.executor._register_instance("a", "A", "code", {"n": 1})
+
+        readings = iter([95.0, 80.0])
+        with patch("class_executor._container_memory_percent", lambda: next(readings)):
+            self.executor._register_instance("b", "B", "code", {"n": 2})
+        gate.set()
+        self.executor.flush_instance_store()
+
+        assert list(self.executor.instances) == ["b"]
+        assert not self.executor._pending_saves
+        assert not self.executor.instance_store.exists("a", "code")
+
+    def test_memory_pressure_keeps_the_new_instance(self):
+        """Test that the instance being registered survives sustained memory pressure."""
+        for name in ("a", "b", "c"):
+            self.executor._register_instance(name, name.upper(), "code", object())
+
+        with patch("class_executor._container_memory_percent", return_value=95.0):
+            self.executor._register_instance("d", "D", "code", object())
+
+        assert list(self.executor.instances) == ["d"]
+
+    def test_container_memory_percent_cgroup_v2(self, tmp_path, monkeypatch):
+        """Test that usage is the cgroup working set over the cgroup limit."""
+        (tmp_path / "memory.max").write_text("1000\n")
+        (tmp_path / "memory.current").write_text("700\n")
+        (tmp_path / "memory.stat").write_text("anon 400\ninactive_file 200\n")
+        monkeypatch.setattr("class_executor._CGROUP_ROOT", str(tmp_path))
+
+        assert _container_memory_percent() == 50.0
+
+        (tmp_path / "memory.max").write_text("max\n")
+        assert _container_memory_percent() is None
+
+    async def test_evicted_instance_restored_from_store(self, tmp_path):
+        """Test that an evicted instance is persisted and restored on reuse."""
+        self.executor.max_instances = 1
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        request = FunctionRequest(
+            execution_type="class",
+            class_name="Counter",
+            class_code="""
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def increment(self):
+        self.count += 1
+        return self.count
+""",
+            method_name="increment",
+            args=[],
+            kwargs={},
+        )
+        first = await self.executor.execute_class_method(request)
+        await self.executor.execute_class_method(request)  # evicts the first instance
+        assert first.instance_id not in self.executor.instances
+
+        reuse = request.model_copy(
+            update={"instance_id": first.instance_id, "create_new_instance": False}
+        )
+        code_key = CodeCache.key(request.class_code).hex()
+        self.executor.flush_instance_store()
+        assert self.executor.instance_store.exists(first.instance_id, code_key)
+        response = await self.executor.execute_class_method(reuse)
+
+        assert response.success is True
+        assert cloudpickle.loads(base64.b64decode(response.result)) == 2
+        assert not self.executor.instance_store.exists(first.instance_id, code_key)
+
+    async def test_changed_class_code_not_restored_from_store(self, tmp_path):
+        """Test that state persisted under old class code is not restored for new code."""
+        self.executor.max_instances = 1
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        request = FunctionRequest(
+            execution_type="class",
+            class_name="Counter",
+            class_code="""
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def increment(self):
+        self.count += 1
+        return self.count
+""",
+            method_name="increment",
+            args=[],
+            kwargs={},
+        )
+        first = await self.executor.execute_class_method(request)
+        await self.executor.execute_class_method(request)  # evicts the first instance
+        self.executor.flush_instance_store()
+
+        changed = request.model_copy(
+            update={
+                "instance_id": first.instance_id,
+                "create_new_instance": False,
+                "class_code": request.class_code.replace("self.count += 1", "self.count += 10"),
+            }
+        )
+        response = await self.executor.execute_class_method(changed)
+
+        assert response.success is True
+        assert cloudpickle.loads(base64.b64decode(response.result)) == 10
+        old_key = CodeCache.key(request.class_code).hex()
+        assert self.executor.instance_store.exists(first.instance_id, old_key)
+
+    def test_eviction_saves_off_the_calling_thread(self, tmp_path):
+        """Test that an evicted instance is pickled on the store writer thread."""
+        self.executor.max_instances = 1
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        save_threads = []
+        original_save = self.executor.instance_store.save
+
+        def recording_save(*args):
+            save_threads.append(threading.current_thread())
+            return original_save(*args)
+
+        with patch.object(self.executor.instance_store, "save", recording_save):
+            self.executor._register_instance("a", "A", "code", {"n": 1})
+            self.executor._register_instance("b", "B", "code", {"n": 2})
+            self.executor.flush_instance_store()
+
+        assert len(save_threads) == 1
+        assert save_threads[0] is not threading.current_thread()
+        assert self.executor.instance_store.exists("a", "code")
+
+    def test_restore_takes_back_instance_with_save_in_flight(self, tmp_path):
+        """Test that an instance requested while its save is queued is restored from memory."""
+        self.executor.max_instances = 1
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        evicted = {"n": 1}
+        gate = threading.Event()
+        self.executor._store_writer.submit(gate.wait)
+
+        self.executor._register_instance("a", "A", "code", evicted)
+        self.executor._register_instance("b", "B", "code", {"n": 2})
+        assert self.executor._restore_instance("a", "code") is evicted
+        gate.set()
+        self.executor.flush_instance_store()
+
+        assert list(self.executor.instances) == ["a"]
+        assert not self.executor.instance_store.exists("a", "code")
+        assert self.executor.instance_store.exists("b", "code")
+
+    async def test_persist_instances_skips_opted_out_classes(self, tmp_path):
+        """Test that live instances are persisted unless their class opts out."""
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        code = """
+class Kept:
+    pass
+
+class Skipped:
+    __flash_persist__ = False
+"""
+        kept = await self.executor.execute_class_method(
+            FunctionRequest(
+                execution_type="class", class_name="Kept", class_code=code, method_name="__init__"
+            )
+        )
+        skipped = await self.executor.execute_class_method(
+            FunctionRequest(
+                execution_type="class",
+                class_name="Skipped",
+                class_code=code,
+                method_name="__init__",
+            )
+        )
+
+        code_key = CodeCache.key(code).hex()
+        assert self.executor.persist_instances() == 1
+        assert self.executor.instance_store.exists(kept.instance_id, code_key)
+        assert not self.executor.instance_store.exists(skipped.instance_id, code_key)
+
+    def test_persist_instances_stops_at_time_budget(self, tmp_path):
+        """Test that persistence starts with the most recent instance and stops at the budget."""
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        for name in ("a", "b", "c"):
+            self.executor._register_instance(name, name.upper(), "code", {"name": name})
+
+        # Deadline set at 0.0 + 5; the first check passes, the second is past it
+        with patch("class_executor.time.monotonic", side_effect=[0.0, 1.0, 6.0]):
+            assert self.executor.persist_instances(timeout=5) == 1
+
+        assert self.executor.instance_store.exists("c", "code")
+        assert not self.executor.instance_store.exists("b", "code")
+
+    def test_persist_on_exit_disabled_by_zero_timeout(self, tmp_path, monkeypatch):
+        """Test that FLASH_INSTANCE_PERSIST_TIMEOUT=0 skips persistence at shutdown."""
+        monkeypatch.setenv("FLASH_INSTANCE_PERSIST_TIMEOUT", "0")
+        self.executor.instance_store = InstanceStore(str(tmp_path / "instances"))
+        self.executor._register_instance("a", "A", "code", {"n": 1})
+
+        _persist_on_exit(weakref.ref(self.executor))
+
+        assert not self.executor.instance_store.exists("a", "code")
+
 
 class TestAsyncMethodSupport:
     """Test async method execution support."""
@@ -0,0 +1,107 @@
+"""Tests for CodeCache component."""
+
+import linecache
+import traceback
+
+import pytest
+
+from code_cache import CodeCache
+
+
+class TestCodeCache:
+    """Test compiled code caching."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        self.cache = CodeCache()
+
+    def test_namespace_contains_definitions(self):
+        """Test that executing code exposes its definitions."""
+        namespace = self.cache.get_namespace("def hello():\n    return 'hi'")
+
+        assert namespace["hello"]() == "hi"
+        assert len(self.cache) == 1
+
+    def test_identical_code_executes_once(self):
+        """Test that identical code reuses the cached namespace."""
+        code = "calls = []\ncalls.append(1)\ndef f():\n    return len(calls)"
+
+        first = self.cache.get_namespace(code)
+        second = self.cache.get_namespace(code)
+
+        assert first["f"]() == 1
+        assert second["f"] is first["f"]
+        assert len(self.cache) == 1
+
+    def test_returned_namespace_is_a_copy(self):
+        """Test that callers cannot mutate the cached namespace."""
+        code = "x = 1"
+
+        self.cache.get_namespace(code)["x"] = 2
+
+        assert self.cache.get_namespace(code)["x"] == 1
+
+    def test_different_code_gets_separate_entries(self):
+        """Test that different code bodies are cached separately."""
+        self.cache.get_namespace("x = 1")
+        self.cache.get_namespace("x = 2")
+
+        assert len(self.cache) == 2
+
+    def test_failed_code_is_not_cached(self):
+        """Test that code raising during execution is not cached."""
+        with pytest.raises(ZeroDivisionError):
+            self.cache.get_namespace("x = 1 / 0")
+
+        assert len(self.cache) == 0
+
+    def test_traceback_shows_remote_source(self):
+        """Test that tracebacks from cached code include the source lines."""
+        code = "def boom():\n    raise ValueError('bad')\n"
+        namespace = self.cache.get_namespace(code)
+
+        try:
+            namespace["boom"]()
+        except ValueError:
+            formatted = traceback.format_exc()
+
+        assert CodeCache.filename(CodeCache.key(code)) in formatted
+        assert "raise ValueError('bad')" in formatted
+
+    def test_evict_removes_linecache_entry(self):
+        """Test that evicted code no longer holds linecache lines."""
+        code = "x = 1"
+        self.cache.get_namespace(code)
+        filename = CodeCache.filename(CodeCache.key(code))
+        assert filename in linecache.cache
+
+        self.cache.evict_idle(-1)
+
+        assert filename not in linecache.cache
+
+    def test_evict_idle(self):
+        """Test that entries idle longer than the limit are dropped."""
+        self.cache.get_namespace("x = 1")
+
+        assert self.cache.evict_idle(3600) == 0
+        assert self.cache.evict_idle(-1) == 1
+        assert len(self.cache) == 0
+
+    def test_least_recently_used_entry_dropped_at_capacity(self):
+        """Test that the cache drops the least recently used code beyond its cap."""
+        cache = CodeCache(max_entries=2)
+        cache.get_namespace("x = 1")
+        cache.get_namespace("x = 2")
+        cache.get_namespace("x = 1")
+        cache.get_namespace("x = 3")
+
+        assert len(cache) == 2
+        assert CodeCache.filename(CodeCache.key("x = 2")) not in linecache.cache
+        assert CodeCache.filename(CodeCache.key("x = 1")) in linecache.cache
+
+    def test_clear(self):
+        """Test clearing the cache."""
+        self.cache.get_namespace("x = 1")
+        self.cache.clear()
+
+        assert len(self.cache) == 0
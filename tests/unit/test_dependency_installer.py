@@ -1,6 +1,8 @@
 """Tests for DependencyInstaller component."""
 
-from unittest.mock import patch
+import importlib.metadata
+import sys
+from unittest.mock import Mock, patch
 
 from dependency_installer import DependencyInstaller
 from runpod_flash.protos.remote_execution import FunctionResponse
@@ -19,18 +21,34 @@ class TestSystemDependencies:
         """Test successful system dependency installation with small packages (no nala acceleration)."""
         mock_platform.return_value = "Linux"
 
-        # Mock successful responses for apt-get update and install
-        mock_subprocess.side_effect = [
-            FunctionResponse(success=True, stdout="Updated"),
-            FunctionResponse(success=True, stdout="Installed packages"),
-        ]
+        # Mock successful response for combined apt-get update and install
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="Installed packages")
 
         # Use small packages that won't trigger nala acceleration
         result = self.installer.install_system_dependencies(["nano", "vim"])
 
         assert result.success is True
         assert "Installed packages" in result.stdout
-        assert mock_subprocess.call_count == 2
+        assert mock_subprocess.call_count == 1
+        script = mock_subprocess.call_args.kwargs["command"][-1]
+        assert "apt-get update -qq -o Acquire::Languages=none" in script
+        assert "apt-get install -y --no-install-recommends" in script
+        assert script.endswith("nano vim")
+
+    @patch("platform.system")
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_system_dependencies_skips_recent_update(self, mock_subprocess, mock_platform):
+        """Test that apt-get update is skipped after a recent successful update."""
+        mock_platform.return_value = "Linux"
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="Installed")
+
+        self.installer.install_system_dependencies(["nano"])
+        self.installer.install_system_dependencies(["vim"])
+
+        first_script = mock_subprocess.call_args_list[0].kwargs["command"][-1]
+        second_script = mock_subprocess.call_args_list[1].kwargs["command"][-1]
+        assert "apt-get update" in first_script
+        assert "apt-get update" not in second_script
 
     @patch("platform.system")
     @patch("dependency_installer.run_logged_subprocess")
@@ -39,7 +57,9 @@ class TestSystemDependencies:
         mock_platform.return_value = "Linux"
 
         # Mock failed apt-get update
-        mock_subprocess.return_value = FunctionResponse(success=False, error="Update failed")
+        mock_subprocess.return_value = FunctionResponse(
+            success=False, error="E: Update failed\napt-get update failed"
+        )
 
         result = self.installer.install_system_dependencies(["curl"])
 
@@ -123,13 +143,27 @@ class TestSystemPackageAcceleration:
         assert "Installed with nala" in result.stdout
         assert mock_subprocess.call_count == 2
 
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_system_with_nala_skips_recent_update(self, mock_subprocess):
+        """Test that nala update is skipped after a recent successful update."""
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+
+        self.installer._install_system_with_nala(["build-essential"])
+        self.installer._install_system_with_nala(["cmake"])
+
+        commands = [call.kwargs["command"] for call in mock_subprocess.call_args_list]
+        assert commands == [
+            ["nala", "update"],
+            ["nala", "install", "-y", "build-essential"],
+            ["nala", "install", "-y", "cmake"],
+        ]
+
     @patch("dependency_installer.run_logged_subprocess")
     def test_install_system_with_nala_update_failure_fallback(self, mock_subprocess):
         """Test nala installation fallback when update fails."""
         # Mock failed nala update, then successful apt-get operations for fallback
         mock_subprocess.side_effect = [
             FunctionResponse(success=False, error="Update failed"),
-            FunctionResponse(success=True, stdout="Updated"),
             FunctionResponse(success=True, stdout="Installed"),
         ]
 
@@ -161,11 +195,8 @@ class TestSystemPackageAcceleration:
     @patch("dependency_installer.run_logged_subprocess")
     def test_install_system_dependencies_without_acceleration(self, mock_subprocess):
         """Test system dependency installation with acceleration disabled."""
-        # Mock successful apt-get operations
-        mock_subprocess.side_effect = [
-            FunctionResponse(success=True, stdout="Updated"),
-            FunctionResponse(success=True, stdout="Installed"),
-        ]
+        # Mock successful apt-get operation
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="Installed")
 
         result = self.installer.install_system_dependencies(
             ["build-essential"], accelerate_downloads=False
@@ -177,11 +208,8 @@ class TestSystemPackageAcceleration:
     @patch("dependency_installer.run_logged_subprocess")
     def test_install_system_dependencies_no_large_packages(self, mock_subprocess):
         """Test system dependency installation when no large packages are present."""
-        # Mock successful apt-get operations (should fallback to standard)
-        mock_subprocess.side_effect = [
-            FunctionResponse(success=True, stdout="Updated"),
-            FunctionResponse(success=True, stdout="Installed"),
-        ]
+        # Mock successful apt-get operation (should fallback to standard)
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="Installed")
 
         result = self.installer.install_system_dependencies(
             ["nano", "vim"], accelerate_downloads=True
@@ -286,6 +314,198 @@ class TestPythonDependencies:
         assert result.success is False
         assert "timed out after 300 seconds" in result.error
 
+    @patch.object(DependencyInstaller, "_invalidate_site_packages_finders")
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_already_satisfied(self, mock_subprocess, mock_invalidate):
+        """Test that satisfied requirements skip the installer and import cache reset."""
+        result = self.installer.install_dependencies(["cloudpickle>=1.0", "pytest"])
+
+        assert result.success is True
+        assert "already satisfied" in result.stdout
+        mock_subprocess.assert_not_called()
+        mock_invalidate.assert_not_called()
+
+    @patch.object(DependencyInstaller, "_invalidate_site_packages_finders")
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_invalidates_import_caches(self, mock_subprocess, mock_invalidate):
+        """Test that import caches are reset only after a successful install."""
+        mock_subprocess.return_value = FunctionResponse(success=False, error="Package not found")
+        self.installer.install_dependencies(["nonexistent-test-package-12345"])
+        mock_invalidate.assert_not_called()
+
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+        self.installer.install_dependencies(["nonexistent-test-package-12345"])
+        mock_invalidate.assert_called_once()
+
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_only_missing_subset(self, mock_subprocess):
+        """Test that only unsatisfied requirements are passed to the installer."""
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+
+        self.installer.install_dependencies(
+            ["cloudpickle", "cloudpickle<0.1", "nonexistent-test-package-12345"]
+        )
+
+        command = mock_subprocess.call_args.kwargs["command"]
+        assert "cloudpickle" not in command
+        assert "cloudpickle<0.1" in command
+        assert "nonexistent-test-package-12345" in command
+
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_uses_persistent_uv_cache(self, mock_subprocess):
+        """Test that Docker installs point uv at the volume-synced cache."""
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+        self.installer._is_docker = True
+
+        self.installer.install_dependencies(["nonexistent-test-package-12345"])
+
+        kwargs = mock_subprocess.call_args.kwargs
+        command = kwargs["command"]
+        assert command[command.index("--cache-dir") + 1] == "/root/.cache/uv"
+        assert "--no-cache-dir" not in command
+        assert kwargs["env"]["UV_LINK_MODE"]
+
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_single_resolver_call(self, mock_subprocess):
+        """Test that all missing packages are resolved by one installer invocation."""
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+        self.installer._is_docker = True
+
+        self.installer.install_dependencies(["pkg-a-12345", "pkg-b-12345"], False)
+
+        mock_subprocess.assert_called_once()
+        command = mock_subprocess.call_args.kwargs["command"]
+        assert command[:2] == ["pip", "install"]
+        assert "--disable-pip-version-check" in command
+        assert command[-2:] == ["pkg-a-12345", "pkg-b-12345"]
+
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_skips_recorded_package_set(self, mock_subprocess):
+        """Test that a package set installed earlier in this container is not re-resolved."""
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+
+        self.installer.install_dependencies(["pkg-b-12345", "pkg-a-12345"])
+        result = self.installer.install_dependencies(["pkg-a-12345", "pkg-b-12345"])
+
+        assert result.success is True
+        assert "already satisfied" in result.stdout
+        mock_subprocess.assert_called_once()
+
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_failure_not_recorded(self, mock_subprocess):
+        """Test that failed installs are retried on the next request."""
+        mock_subprocess.return_value = FunctionResponse(success=False, error="boom")
+
+        self.installer.install_dependencies(["pkg-a-12345"])
+        self.installer.install_dependencies(["pkg-a-12345"])
+
+        assert mock_subprocess.call_count == 2
+
+    @patch("dependency_installer.run_logged_subprocess")
+    def test_install_dependencies_refreshes_installed_cache(self, mock_subprocess):
+        """Test that a successful install invalidates the installed package cache."""
+        mock_subprocess.return_value = FunctionResponse(success=True, stdout="ok")
+
+        self.installer.install_dependencies(["nonexistent-test-package-12345"])
+
+        assert self.installer._installed_packages is None
+
+    def test_filter_exact_pins_skips_requirement_parsing(self):
+        """Test that exact pins of installed versions are settled without parsing."""
+        version = importlib.metadata.version("cloudpickle")
+
+        with patch("dependency_installer.Requirement") as mock_requirement:
+            missing = self.installer._filter_unsatisfied_packages([f"cloudpickle=={version}"])
+
+        assert missing == []
+        mock_requirement.assert_not_called()
+
+    def test_invalidate_only_site_packages_finders(self, tmp_path):
+        """Test that only site-packages finders are reset after an install."""
+        site_dir = str(tmp_path / "site-packages")
+        missing_dir = str(tmp_path / "user-site")
+        other_dir = str(tmp_path / "other")
+        site_finder = Mock()
+        other_finder = Mock()
+
+        with (
+            patch.object(
+                self.installer, "_site_packages_dirs", return_value=[site_dir, missing_dir]
+            ),
+            patch.dict(
+                "sys.path_importer_cache",
+                {site_dir: site_finder, missing_dir: None, other_dir: other_finder},
+            ),
+        ):
+            self.installer._invalidate_site_packages_finders()
+
+            assert missing_dir not in sys.path_importer_cache
+
+        site_finder.invalidate_caches.assert_called_once()
+        other_finder.invalidate_caches.assert_not_called()
+
+    def test_preimport_loads_installed_modules(self):
+        """Test that preimport imports the top-level modules of installed distributions."""
+        with (
+            patch.dict("sys.modules"),
+            patch(
+                "importlib.metadata.packages_distributions",
+                return_value={"json": ["My_Package"], "csv": ["other"]},
+            ),
+            patch("importlib.import_module") as mock_import,
+        ):
+            sys.modules.pop("json", None)
+            sys.modules.pop("csv", None)
+            self.installer._preimport(["my-package>=1.0", "not a valid spec!"])
+
+        mock_import.assert_called_once_with("json")
+
+    def test_preimport_skips_tests_private_and_vendored_modules(self):
+        """Test that only a distribution's own module is preimported when it has one."""
+        with (
+            patch(
+                "importlib.metadata.packages_distributions",
+                return_value={
+                    "my_package": ["my-package"],
+                    "vendored_helper": ["my-package"],
+                    "_my_package_vendor": ["my-package"],
+                    "tests": ["my-package", "other-package"],
+                    "other_module": ["other-package"],
+                    "unrequested": ["unrequested-package"],
+                },
+            ),
+            patch("importlib.import_module") as mock_import,
+        ):
+            self.installer._preimport(["My_Package==1.0", "other-package"])
+
+        imported = sorted(call.args[0] for call in mock_import.call_args_list)
+        assert imported == ["my_package", "other_module"]
+
+    @patch("threading.Thread")
+    def test_preimport_disabled_by_environment(self, mock_thread, monkeypatch):
+        """Test that FLASH_DISABLE_PREIMPORT skips the background import thread."""
+        monkeypatch.setenv("FLASH_DISABLE_PREIMPORT", "true")
+        self.installer._start_preimport(["pkg"])
+        mock_thread.assert_not_called()
+
+        monkeypatch.setenv("FLASH_DISABLE_PREIMPORT", "")
+        self.installer._start_preimport(["pkg"])
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_installed_packages_cached_until_site_packages_change(self):
+        """Test that the installed package scan is reused until site-packages changes."""
+        with patch.object(
+            self.installer, "_site_packages_signature", return_value=(1,)
+        ) as mock_signature:
+            with patch("importlib.metadata.distributions", return_value=[]) as mock_dists:
+                self.installer._get_installed_packages()
+                self.installer._get_installed_packages()
+                assert mock_dists.call_count == 1
+
+                mock_signature.return_value = (2,)
+                self.installer._get_installed_packages()
+                assert mock_dists.call_count == 2
+
 
 class TestCompilationAutoRetry:
     """Test automatic build-essential installation when compilation needed."""
@@ -357,14 +577,12 @@ class TestCompilationAutoRetry:
 
         # First call: pip install fails with gcc error
         # Second call: nala check (not available)
-        # Third call: apt-get update
-        # Fourth call: apt-get install build-essential
-        # Fifth call: pip install retry (succeeds)
+        # Third call: apt-get update and install build-essential
+        # Fourth call: pip install retry (succeeds)
         mock_subprocess.side_effect = [
             FunctionResponse(success=False, error="error: command 'gcc' failed: No such file"),
             FunctionResponse(success=False),  # nala not available
-            FunctionResponse(success=True, stdout="Updated"),  # apt-get update
-            FunctionResponse(success=True, stdout="Installed build-essential"),  # apt-get install
+            FunctionResponse(success=True, stdout="Installed build-essential"),  # apt-get
             FunctionResponse(success=True, stdout="Successfully installed package"),
         ]
 
@@ -372,7 +590,7 @@ class TestCompilationAutoRetry:
 
         assert result.success is True
         assert "Successfully installed package" in result.stdout
-        assert mock_subprocess.call_count == 5
+        assert mock_subprocess.call_count == 4
 
     @patch("dependency_installer.run_logged_subprocess")
     def test_auto_retry_no_retry_for_non_compilation_errors(self, mock_subprocess):
@@ -446,17 +664,15 @@ class TestCompilationAutoRetry:
 
         # First call: pip install fails with gcc error
         # Second call: nala check (not available)
-        # Third call: apt-get update
-        # Fourth call: apt-get install build-essential
-        # Fifth call: pip install retry (succeeds but has warning mentioning gcc)
+        # Third call: apt-get update and install build-essential
+        # Fourth call: pip install retry (succeeds but has warning mentioning gcc)
         mock_subprocess.side_effect = [
             FunctionResponse(
                 success=False,
                 error="error: command 'gcc' failed: No such file or directory",
             ),
             FunctionResponse(success=False),  # nala not available
-            FunctionResponse(success=True, stdout="Updated"),  # apt-get update
-            FunctionResponse(success=True, stdout="Installed build-essential"),  # apt-get install
+            FunctionResponse(success=True, stdout="Installed build-essential"),  # apt-get
             FunctionResponse(
                 success=True,
                 stdout="Successfully installed package\nWarning: gcc was used for compilation",
@@ -468,5 +684,5 @@ class TestCompilationAutoRetry:
         assert result.success is True
         assert "Successfully installed package" in result.stdout
         assert "Warning: gcc was used" in result.stdout
-        # Should only be called 5 times (no infinite retry loop)
-        assert mock_subprocess.call_count == 5
+        # Should only be called 4 times (no infinite retry loop)
+        assert mock_subprocess.call_count == 4
@@ -236,3 +236,81 @@ class TestErrorHandling:
         # Verify error was captured
         assert response.success is False
         assert "test error" in response.error
+
+
+class TestNamespaceReuse:
+    """Test reuse of function namespaces across warm calls."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        self.executor = FunctionExecutor()
+
+    async def test_module_level_code_runs_once(self):
+        """Test that identical code reuses the namespace instead of re-executing it."""
+        request = FunctionRequest(
+            function_name="count",
+            function_code="state = []\ndef count():\n    state.append(1)\n    return len(state)",
+            args=[],
+            kwargs={},
+        )
+
+        first = await self.executor.execute(request)
+        second = await self.executor.execute(request)
+
+        assert cloudpickle.loads(base64.b64decode(first.result)) == 1
+        assert cloudpickle.loads(base64.b64decode(second.result)) == 2
+        assert len(self.executor.function_namespaces) == 1
+
+    async def test_cleanup_namespaces(self):
+        """Test that idle namespaces are swept."""
+        request = FunctionRequest(
+            function_name="hello",
+            function_code="def hello():\n    return 'hello'",
+            args=[],
+            kwargs={},
+        )
+        await self.executor.execute(request)
+
+        assert self.executor.cleanup_namespaces(max_idle=-1) == 1
+        assert len(self.executor.function_namespaces) == 0
+
+
+class TestResultMemoization:
+    """Test opt-in result memoization."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        self.executor = FunctionExecutor()
+
+    def make_request(self, memoize: bool, arg: int) -> FunctionRequest:
+        """Build a request for a call-counting function."""
+        code = (
+            "calls = []\n"
+            "def count(x):\n"
+            "    calls.append(x)\n"
+            "    return len(calls)\n"
+            f"count.__flash_memoize__ = {memoize}\n"
+        )
+        return FunctionRequest(
+            function_name="count",
+            function_code=code,
+            args=[base64.b64encode(cloudpickle.dumps(arg)).decode("utf-8")],
+            kwargs={},
+        )
+
+    async def test_opted_in_function_reuses_result(self):
+        """Test that identical calls to an opted-in function return the cached result."""
+        first = await self.executor.execute(self.make_request(True, 1))
+        second = await self.executor.execute(self.make_request(True, 1))
+        other = await self.executor.execute(self.make_request(True, 2))
+
+        assert second.result == first.result
+        assert cloudpickle.loads(base64.b64decode(other.result)) == 2
+
+    async def test_functions_not_memoized_by_default(self):
+        """Test that functions without the opt-in run on every call."""
+        first = await self.executor.execute(self.make_request(False, 1))
+        second = await self.executor.execute(self.make_request(False, 1))
+
+        assert cloudpickle.loads(base64.b64decode(first.result)) == 1
+        assert cloudpickle.loads(base64.b64decode(second.result)) == 2
@@ -4,7 +4,8 @@ import pytest
 import base64
 import cloudpickle
 from unittest.mock import patch, AsyncMock
-from handler import handler
+import handler as handler_module
+from handler import handler, response_to_dict
 from runpod_flash.protos.remote_execution import FunctionResponse
 
 
@@ -23,7 +24,7 @@ class TestHandler:
             }
         }
 
-        with patch("handler.RemoteExecutor") as mock_executor_class:
+        with patch("remote_executor.RemoteExecutor") as mock_executor_class:
             mock_executor = AsyncMock()
             mock_executor_class.return_value = mock_executor
             mock_executor.ExecuteFunction.return_value = FunctionResponse(
@@ -76,7 +77,7 @@ class TestHandler:
             }
         }
 
-        with patch("handler.RemoteExecutor") as mock_executor_class:
+        with patch("remote_executor.RemoteExecutor") as mock_executor_class:
             mock_executor_class.side_effect = Exception("Executor initialization failed")
 
             result = await handler(event)
@@ -98,7 +99,7 @@ class TestHandler:
         }
 
         test_data = {"data": "test"}
-        with patch("handler.RemoteExecutor") as mock_executor_class:
+        with patch("remote_executor.RemoteExecutor") as mock_executor_class:
             mock_executor = AsyncMock()
             mock_executor_class.return_value = mock_executor
             mock_executor.ExecuteFunction.return_value = FunctionResponse(
@@ -128,7 +129,7 @@ class TestHandler:
             }
         }
 
-        with patch("handler.RemoteExecutor") as mock_executor_class:
+        with patch("remote_executor.RemoteExecutor") as mock_executor_class:
             mock_executor = AsyncMock()
             mock_executor_class.return_value = mock_executor
             mock_executor.ExecuteFunction.return_value = FunctionResponse(
@@ -143,3 +144,56 @@ class TestHandler:
             assert result["success"] is True
             assert "instance_id" in result
             assert "instance_info" in result
+
+
+class TestResponseToDict:
+    """Test conversion of FunctionResponse to the handler payload."""
+
+    def test_matches_model_dump(self):
+        """Test that the payload has the same content as model_dump()."""
+        output = FunctionResponse(
+            success=True,
+            result="cmVzdWx0",
+            stdout="out",
+            instance_id="Counter_1234",
+            instance_info={"method_calls": 1},
+        )
+
+        assert response_to_dict(output) == output.model_dump()
+
+    def test_defaults_included(self):
+        """Test that unset optional fields are present as None."""
+        payload = response_to_dict(FunctionResponse(success=False, error="boom"))
+
+        assert payload == FunctionResponse(success=False, error="boom").model_dump()
+        assert payload["result"] is None
+
+    def test_instance_info_not_shared(self):
+        """Test that mutating the payload leaves the response's instance_info intact."""
+        output = FunctionResponse(success=True, instance_info={"method_calls": 1})
+
+        payload = response_to_dict(output)
+        payload["instance_info"]["method_calls"] = 2
+
+        assert output.instance_info == {"method_calls": 1}
+
+
+class TestExecutorReuse:
+    """Test that the handler reuses one executor across invocations."""
+
+    @pytest.mark.asyncio
+    async def test_executor_created_once(self):
+        """Test that warm invocations do not construct a new RemoteExecutor."""
+        event = {"input": {"function_name": "test_func", "function_code": "def test_func(): pass"}}
+
+        with patch("remote_executor.RemoteExecutor") as mock_executor_class:
+            mock_executor = AsyncMock()
+            mock_executor_class.return_value = mock_executor
+            mock_executor.ExecuteFunction.return_value = FunctionResponse(success=True)
+
+            await handler(event)
+            await handler(event)
+
+            mock_executor_class.assert_called_once()
+            assert mock_executor.ExecuteFunction.await_count == 2
+            assert handler_module.get_executor() is mock_executor
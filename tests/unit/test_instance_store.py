@@ -0,0 +1,98 @@
+"""Tests for InstanceStore component."""
+
+import pickle
+import threading
+from unittest.mock import patch
+
+from instance_store import InstanceStore
+
+CODE_KEY = "abc123"
+
+
+class Holder:
+    """Simple instance with a large buffer attribute."""
+
+    def __init__(self, data):
+        self.data = data
+
+
+class TestInstanceStore:
+    """Test persisting and restoring class instances."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a saved instance is restored with its state."""
+        store = InstanceStore(str(tmp_path / "instances"))
+
+        assert store.save("Holder_1", CODE_KEY, "Holder", Holder({"count": 3})) is True
+        assert store.exists("Holder_1", CODE_KEY)
+
+        class_name, obj = store.load("Holder_1", CODE_KEY)
+        assert class_name == "Holder"
+        assert obj.data == {"count": 3}
+
+    def test_out_of_band_buffers_are_mapped_copy_on_write(self, tmp_path):
+        """Test that buffers restore from separate files and stay writable."""
+        store = InstanceStore(str(tmp_path / "instances"))
+        payload = pickle.PickleBuffer(bytearray(b"abc" * 1000))
+
+        store.save("Holder_1", CODE_KEY, "Holder", Holder(payload))
+        buffer_file = tmp_path / "instances" / "Holder_1.abc123.buf0"
+        assert buffer_file.read_bytes() == b"abc" * 1000
+
+        _, obj = store.load("Holder_1", CODE_KEY)
+        obj.data[0:3] = b"xyz"
+
+        assert bytes(obj.data[:6]) == b"xyzabc"
+        assert buffer_file.read_bytes() == b"abc" * 1000
+
+    def test_discard(self, tmp_path):
+        """Test that discarding removes all persisted files."""
+        store = InstanceStore(str(tmp_path / "instances"))
+        store.save("Holder_1", CODE_KEY, "Holder", Holder(pickle.PickleBuffer(bytearray(10))))
+
+        store.discard("Holder_1", CODE_KEY)
+
+        assert not store.exists("Holder_1", CODE_KEY)
+        assert list((tmp_path / "instances").iterdir()) == []
+
+    def test_unsafe_instance_id_not_persisted(self, tmp_path):
+        """Test that IDs which would escape the store directory are rejected."""
+        store = InstanceStore(str(tmp_path / "instances"))
+
+        assert store.save("../escape", CODE_KEY, "Holder", Holder(1)) is False
+        assert store.exists("../escape", CODE_KEY) is False
+
+    def test_unpicklable_instance(self, tmp_path):
+        """Test that instances which cannot be pickled are skipped."""
+        store = InstanceStore(str(tmp_path / "instances"))
+
+        assert store.save("Holder_1", CODE_KEY, "Holder", Holder(threading.Lock())) is False
+        assert not store.exists("Holder_1", CODE_KEY)
+
+    def test_disabled_without_volume(self, tmp_path):
+        """Test that the store is a no-op when its parent directory is not mounted."""
+        store = InstanceStore(str(tmp_path / "missing" / "instances"))
+
+        assert store.enabled is False
+        assert store.save("Holder_1", CODE_KEY, "Holder", Holder(1)) is False
+
+    def test_default_path_scoped_by_endpoint(self, tmp_path, monkeypatch):
+        """Test that endpoints sharing a volume persist into separate directories."""
+        monkeypatch.setattr("instance_store.INSTANCE_STATE_PATH", str(tmp_path / "instances"))
+
+        monkeypatch.setenv("RUNPOD_ENDPOINT_ID", "endpoint-a")
+        store_a = InstanceStore()
+        monkeypatch.setenv("RUNPOD_ENDPOINT_ID", "endpoint-b")
+        store_b = InstanceStore()
+
+        assert store_a.base_dir == str(tmp_path / "instances" / "endpoint-a")
+        assert store_a.save("Holder_1", CODE_KEY, "Holder", Holder(1)) is True
+        assert not store_b.exists("Holder_1", CODE_KEY)
+
+    def test_default_path_disabled_without_endpoint(self, tmp_path, monkeypatch):
+        """Test that nothing is persisted when the endpoint is unknown."""
+        monkeypatch.setattr("instance_store.INSTANCE_STATE_PATH", str(tmp_path / "instances"))
+        monkeypatch.delenv("RUNPOD_ENDPOINT_ID", raising=False)
+
+        with patch("os.path.isdir", return_value=True):
+            assert InstanceStore().enabled is False
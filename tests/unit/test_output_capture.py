@@ -0,0 +1,130 @@
+"""Tests for OutputSink component."""
+
+import asyncio
+import logging
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+
+from output_capture import OutputSink, capture_logs
+
+
+class TestOutputSink:
+    """Test combined output capture."""
+
+    def test_combines_streams_in_write_order(self):
+        """Test that stdout, stderr and logs share one buffer in write order."""
+        sink = OutputSink()
+        handler = logging.StreamHandler(sink)
+        logger = logging.getLogger("test_output_capture.sink")
+        logger.addHandler(handler)
+        logger.propagate = False
+
+        try:
+            with redirect_stdout(sink), redirect_stderr(sink):
+                print("first")
+                logger.warning("second")
+                sys.stderr.write("third\n")
+        finally:
+            logger.removeHandler(handler)
+
+        assert sink.getvalue() == "first\nsecond\nthird\n"
+
+    def test_unicode_round_trip(self):
+        """Test that non-ASCII text survives the byte buffer."""
+        sink = OutputSink()
+        sink.write("héllo ✓")
+
+        assert sink.getvalue() == "héllo ✓"
+
+    def test_getvalue_repeatable(self):
+        """Test that reading the value does not disturb later writes."""
+        sink = OutputSink()
+        sink.write("a")
+        sink.write("b")
+
+        assert sink.getvalue() == "ab"
+        sink.write("c")
+        assert sink.getvalue() == "abc"
+
+    def test_empty(self):
+        """Test that a fresh sink is empty."""
+        assert OutputSink().getvalue() == ""
+
+
+class TestCaptureLogs:
+    """Test the shared log capture handler."""
+
+    def test_routes_logs_to_active_sink(self):
+        """Test that records inside the block land in the sink and later ones do not."""
+        sink = OutputSink()
+        logger = logging.getLogger("test_capture_logs")
+        logger.setLevel(logging.INFO)
+
+        with capture_logs(sink):
+            logger.info("inside")
+        logger.info("outside")
+
+        assert "inside" in sink.getvalue()
+        assert "outside" not in sink.getvalue()
+
+    def test_handler_mounted_once(self):
+        """Test that repeated captures reuse a single root handler."""
+        root = logging.getLogger()
+
+        with capture_logs(OutputSink()):
+            count = len(root.handlers)
+        with capture_logs(OutputSink()):
+            assert len(root.handlers) == count
+
+    async def test_concurrent_tasks_capture_separately(self):
+        """Test that concurrent tasks only capture their own records."""
+        logger = logging.getLogger("test_capture_logs_tasks")
+        logger.setLevel(logging.INFO)
+
+        async def run(name: str) -> str:
+            sink = OutputSink()
+            with capture_logs(sink):
+                logger.info(f"{name}-before")
+                await asyncio.sleep(0)
+                logger.info(f"{name}-after")
+            return sink.getvalue()
+
+        first, second = await asyncio.gather(run("a"), run("b"))
+
+        assert "a-before" in first and "a-after" in first
+        assert "b-" not in first
+        assert "b-before" in second and "b-after" in second
+        assert "a-" not in second
+
+    def test_captures_logs_from_user_threads(self):
+        """Test that records from threads started inside the block are captured."""
+        sink = OutputSink()
+        logger = logging.getLogger("test_capture_logs_threads")
+        logger.setLevel(logging.INFO)
+
+        with capture_logs(sink):
+            worker = threading.Thread(target=logger.info, args=("from-thread",))
+            worker.start()
+            worker.join()
+        worker = threading.Thread(target=logger.info, args=("after-capture",))
+        worker.start()
+        worker.join()
+
+        assert "from-thread" in sink.getvalue()
+        assert "after-capture" not in sink.getvalue()
+
+    def test_worker_threads_not_captured(self):
+        """Test that records from the worker's own flash-* threads stay out of captures."""
+        sink = OutputSink()
+        logger = logging.getLogger("test_capture_logs_worker_threads")
+        logger.setLevel(logging.INFO)
+
+        with capture_logs(sink):
+            worker = threading.Thread(
+                target=logger.info, args=("from-worker",), name="flash-preimport"
+            )
+            worker.start()
+            worker.join()
+
+        assert "from-worker" not in sink.getvalue()
@@ -176,8 +176,7 @@ class TestRemoteExecutor:
         assert hasattr(self.executor, "class_executor")
 
         # Test class executor attributes through component
-        assert hasattr(self.executor.class_executor, "class_instances")
-        assert hasattr(self.executor.class_executor, "instance_metadata")
+        assert hasattr(self.executor.class_executor, "instances")
 
     @pytest.mark.asyncio
     async def test_hydration_before_installation_with_dependencies(self):
@@ -216,6 +215,7 @@ class TestRemoteExecutor:
 
             mock_deps.return_value = FunctionResponse(success=True, stdout="Deps installed")
             mock_execute.return_value = Mock(success=True, result="encoded_result")
+            mock_baseline.return_value = 1234567890.0
 
             await self.executor.ExecuteFunction(request)
 
@@ -223,8 +223,47 @@ class TestRemoteExecutor:
             mock_hydrate.assert_called_once()
             # Verify baseline was marked
             mock_baseline.assert_called_once()
-            # Verify sync was called after installation
-            mock_sync.assert_called_once()
+            # Verify sync was called after installation with this request's baseline
+            mock_sync.assert_called_once_with(1234567890.0)
+
+    @pytest.mark.asyncio
+    async def test_sequential_install_runs_off_event_loop(self):
+        """Test that non-accelerated installs use the threaded installer wrappers in order."""
+        from runpod_flash.protos.remote_execution import FunctionResponse
+
+        request = FunctionRequest(
+            function_name="test_func",
+            function_code="def test_func(): return 'test'",
+            dependencies=["requests"],
+            system_dependencies=["curl"],
+            accelerate_downloads=False,
+        )
+        order = []
+
+        async def install_system(*args):
+            order.append("system")
+            return FunctionResponse(success=True, stdout="system")
+
+        async def install_python(*args):
+            order.append("python")
+            return FunctionResponse(success=True, stdout="python")
+
+        with (
+            patch.object(
+                self.executor.dependency_installer,
+                "install_system_dependencies_async",
+                side_effect=install_system,
+            ),
+            patch.object(
+                self.executor.dependency_installer,
+                "install_dependencies_async",
+                side_effect=install_python,
+            ),
+        ):
+            result = await self.executor._install_dependencies_sequential(request)
+
+        assert result.success is True
+        assert order == ["system", "python"]
 
     @pytest.mark.asyncio
     async def test_no_hydration_without_dependencies(self):
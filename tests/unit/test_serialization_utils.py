@@ -1,7 +1,11 @@
 """Tests for SerializationUtils component."""
 
 import base64
+import pickle
 import cloudpickle
+from unittest.mock import patch
+
+import serialization_utils
 from serialization_utils import SerializationUtils
 
 
@@ -110,3 +114,110 @@ class TestSerializationUtils:
         assert deserialized_result == result
         assert deserialized_args == args
         assert deserialized_kwargs == kwargs
+
+    def test_serialize_result_plain_data_uses_stdlib_pickle(self):
+        """Test that plain builtin data is pickled without cloudpickle."""
+        result = {"a": [1, 2.5, None], "b": ("x", b"y"), "c": {True}}
+
+        serialized = SerializationUtils.serialize_result(result)
+
+        assert base64.b64decode(serialized) == pickle.dumps(result, protocol=5)
+
+    def test_serialize_result_large_container_skips_plain_data_scan(self):
+        """Test that containers beyond the scan limit go to cloudpickle without a full walk."""
+        result = list(range(serialization_utils.PLAIN_DATA_SCAN_LIMIT + 1))
+
+        with patch("serialization_utils.pickle.Pickler") as mock_pickler:
+            serialized = SerializationUtils.serialize_result(result)
+
+        mock_pickler.assert_not_called()
+        assert cloudpickle.loads(base64.b64decode(serialized)) == result
+
+    def test_serialize_result_falls_back_to_cloudpickle(self):
+        """Test that closures inside containers are still serialized."""
+        offset = 3
+        result = [lambda x: x + offset]
+
+        serialized = SerializationUtils.serialize_result(result)
+
+        assert cloudpickle.loads(base64.b64decode(serialized))[0](1) == 4
+
+    def test_serialize_result_self_referencing_container(self):
+        """Test that cyclic containers do not loop forever."""
+        result: list = [1]
+        result.append(result)
+
+        deserialized = cloudpickle.loads(
+            base64.b64decode(SerializationUtils.serialize_result(result))
+        )
+
+        assert deserialized[1] is deserialized
+
+    async def test_serialize_result_async(self):
+        """Test that threaded serialization matches synchronous serialization."""
+        result = {"numbers": list(range(10)), "text": "hello"}
+
+        serialized = await SerializationUtils.serialize_result_async(result)
+
+        assert serialized == SerializationUtils.serialize_result(result)
+        assert cloudpickle.loads(base64.b64decode(serialized)) == result
+
+    def test_deserialize_many_payloads_preserves_order(self):
+        """Test that decoding several arguments preserves argument order and keys."""
+        values = [list(range(i)) for i in range(20)]
+        encoded = [base64.b64encode(cloudpickle.dumps(v)).decode("utf-8") for v in values]
+
+        args = SerializationUtils.deserialize_args(encoded)
+        kwargs = SerializationUtils.deserialize_kwargs({f"k{i}": e for i, e in enumerate(encoded)})
+
+        assert args == values
+        assert kwargs == {f"k{i}": v for i, v in enumerate(values)}
+
+    def test_buffers_round_trip(self):
+        """Test out-of-band buffer serialization round-trip."""
+        payload = {"blob": pickle.PickleBuffer(bytearray(b"x" * 1024)), "meta": 1}
+
+        data, buffers = SerializationUtils.dumps_with_buffers(payload)
+
+        # Buffer contents stay out of the pickle stream
+        assert len(buffers) == 1
+        assert len(data) < 1024
+
+        restored = SerializationUtils.loads_with_buffers(data, buffers)
+        assert bytes(restored["blob"]) == b"x" * 1024
+        assert restored["meta"] == 1
+
+    def test_deserialize_raw_bytes_payloads(self):
+        """Test raw pickle bytes are accepted without base64 decoding."""
+        args = [cloudpickle.dumps(1), bytearray(cloudpickle.dumps("two"))]
+        kwargs = {"three": memoryview(cloudpickle.dumps([3]))}
+
+        assert SerializationUtils.deserialize_args(args) == [1, "two"]
+        assert SerializationUtils.deserialize_kwargs(kwargs) == {"three": [3]}
+
+
+class TestCorePinning:
+    """Test opt-in pinning of serializer threads."""
+
+    def test_not_pinned_by_default(self, monkeypatch):
+        """Test that threads keep their affinity unless FLASH_PIN_CORES is set."""
+        monkeypatch.delenv("FLASH_PIN_CORES", raising=False)
+
+        with patch("os.sched_setaffinity", create=True) as mock_setaffinity:
+            serialization_utils._pin_serializer_thread()
+
+        mock_setaffinity.assert_not_called()
+
+    def test_pinned_to_single_core_when_enabled(self, monkeypatch):
+        """Test that each serializer thread is pinned to one allowed core."""
+        monkeypatch.setenv("FLASH_PIN_CORES", "1")
+
+        with (
+            patch("os.sched_getaffinity", create=True, return_value={2, 3}),
+            patch("os.sched_setaffinity", create=True) as mock_setaffinity,
+        ):
+            serialization_utils._pin_serializer_thread()
+
+        pid, cores = mock_setaffinity.call_args.args
+        assert pid == 0
+        assert len(cores) == 1 and cores <= {2, 3}
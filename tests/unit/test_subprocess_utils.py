@@ -0,0 +1,43 @@
+"""Tests for subprocess utilities."""
+
+import sys
+
+from subprocess_utils import run_logged_subprocess
+
+
+class TestRunLoggedSubprocess:
+    """Test run_logged_subprocess output handling."""
+
+    def test_captures_stdout(self):
+        """Test that stdout is captured by default."""
+        result = run_logged_subprocess([sys.executable, "-c", "print('hello')"])
+
+        assert result.success is True
+        assert result.stdout.strip() == "hello"
+
+    def test_discard_stdout_keeps_stderr(self):
+        """Test that discarded stdout is not buffered while stderr is still reported."""
+        code = "import sys; print('noise'); sys.stderr.write('boom'); sys.exit(1)"
+
+        result = run_logged_subprocess([sys.executable, "-c", code], discard_stdout=True)
+
+        assert result.success is False
+        assert result.error == "boom"
+
+    def test_discard_stdout_success(self):
+        """Test that a successful command with discarded stdout reports no output."""
+        result = run_logged_subprocess(
+            [sys.executable, "-c", "print('noise')"], discard_stdout=True
+        )
+
+        assert result.success is True
+        assert not result.stdout
+
+    def test_timeout_reports_error(self):
+        """Test that a command exceeding its timeout is killed and reported."""
+        result = run_logged_subprocess(
+            [sys.executable, "-c", "import time; time.sleep(10)"], timeout=1
+        )
+
+        assert result.success is False
+        assert "timed out after 1 seconds" in result.error
@@ -12,6 +12,7 @@ from unpack_volume import (
     _canonical_project_artifact_path,
     _safe_extract_tar,
     _should_unpack_from_volume,
+    _wait_for_artifact,
     maybe_unpack,
     unpack_app_from_volume,
 )
@@ -147,6 +148,26 @@ class TestUnpackAppFromVolume:
         assert (app_dir / "app.py").exists()
         assert (app_dir / "app.py").read_text() == "print('hello from app')"
 
+    def test_unpack_app_from_volume_skips_already_extracted_artifact(self, tmp_path):
+        """Test that an unchanged artifact is not extracted twice into the same directory."""
+        artifact_path = tmp_path / "artifact.tar.gz"
+        with tarfile.open(artifact_path, mode="w:gz") as tar:
+            test_file = tmp_path / "app.py"
+            test_file.write_text("print('hello from app')")
+            tar.add(test_file, arcname="app.py")
+        app_dir = tmp_path / "app"
+
+        with patch("unpack_volume._canonical_project_artifact_path", return_value=artifact_path):
+            unpack_app_from_volume(app_dir=app_dir)
+            with patch("unpack_volume.tarfile.open") as mock_open:
+                assert unpack_app_from_volume(app_dir=app_dir) is True
+                mock_open.assert_not_called()
+
+                # A replaced artifact is extracted again
+                os.utime(artifact_path, ns=(0, 0))
+                unpack_app_from_volume(app_dir=app_dir)
+                mock_open.assert_called_once()
+
     def test_unpack_app_from_volume_adds_to_syspath(self, tmp_path):
         """Test that app directory is added to sys.path."""
         # Create a mock artifact
@@ -396,10 +417,10 @@ class TestMaybeUnpack:
         mock_should_unpack.assert_called_once()
         mock_unpack.assert_not_called()
 
-    @patch("unpack_volume.sleep")
+    @patch("unpack_volume._wait_for_artifact")
     @patch("unpack_volume._should_unpack_from_volume")
     @patch("unpack_volume.unpack_app_from_volume")
-    def test_maybe_unpack_propagates_exceptions(self, mock_unpack, mock_should_unpack, mock_sleep):
+    def test_maybe_unpack_propagates_exceptions(self, mock_unpack, mock_should_unpack, mock_wait):
         """Test that exceptions during unpacking are propagated."""
         mock_should_unpack.return_value = True
         mock_unpack.side_effect = FileNotFoundError("Artifact not found")
@@ -407,6 +428,42 @@ class TestMaybeUnpack:
         with pytest.raises(RuntimeError, match="failed to unpack app from volume"):
             maybe_unpack()
 
+        # Missing artifacts are waited for between attempts, not after the last one
+        assert mock_wait.call_count == 2
+
+    @patch("unpack_volume.sleep")
+    @patch("unpack_volume._should_unpack_from_volume")
+    @patch("unpack_volume.unpack_app_from_volume")
+    def test_maybe_unpack_no_sleep_after_last_attempt(
+        self, mock_unpack, mock_should_unpack, mock_sleep
+    ):
+        """Test that the retry interval is only slept between attempts."""
+        mock_should_unpack.return_value = True
+        mock_unpack.side_effect = RuntimeError("Extraction failed")
+
+        with pytest.raises(RuntimeError, match="failed to unpack app from volume"):
+            maybe_unpack()
+
+        assert mock_unpack.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    def test_wait_for_artifact_returns_when_present(self, tmp_path):
+        """Test that waiting ends immediately once the artifact exists."""
+        artifact = tmp_path / "artifact.tar.gz"
+        artifact.write_bytes(b"data")
+
+        with patch.dict(os.environ, {"FLASH_BUILD_ARTIFACT_PATH": str(artifact)}):
+            with patch("unpack_volume.sleep") as mock_sleep:
+                assert _wait_for_artifact(30) is True
+            mock_sleep.assert_not_called()
+
+    def test_wait_for_artifact_times_out(self, tmp_path):
+        """Test that waiting gives up after the timeout."""
+        artifact = tmp_path / "missing.tar.gz"
+
+        with patch.dict(os.environ, {"FLASH_BUILD_ARTIFACT_PATH": str(artifact)}):
+            assert _wait_for_artifact(0.01) is False
+
     @patch("unpack_volume._should_unpack_from_volume")
     @patch("unpack_volume.unpack_app_from_volume")
     @patch("unpack_volume.logger")